@@ -0,0 +1,50 @@
+"""
+Compares direct hashing of every candidate against prefix (midstate) reuse, for every algorithm in HashTypes.
+
+    python -m benchmarks.midstate --candidates 200000
+"""
+import argparse
+import time
+
+from common.config.HashesTypes import HashTypes
+from common.hashing import get_hashlib_func
+from minion.cracking_engine.scanners import DIRECT_STRATEGY, MIDSTATE_STRATEGY, get_scanner
+
+DEFAULT_START = 527500000
+
+
+def measure(strategy: str, hash_type: HashTypes, start: int, end: int, repeats: int) -> float:
+    """returns the best candidates per second out of `repeats` runs"""
+    scanner = get_scanner(strategy)
+    hash_func = get_hashlib_func(hash_type)
+    # a target that is never found, so the whole range is scanned
+    targets = {b"\x00" * hash_func().digest_size: "never"}
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        scanner([(hash_func, dict(targets))], start, end)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return (end - start + 1) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="direct vs midstate hashing benchmark")
+    parser.add_argument('--candidates', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    start = DEFAULT_START
+    end = start + args.candidates - 1
+
+    print(f"{'Algorithm':<10} {'direct c/s':>14} {'midstate c/s':>14} {'gain':>8}")
+    print("-" * 50)
+    for hash_type in HashTypes:
+        direct = measure(DIRECT_STRATEGY, hash_type, start, end, args.repeats)
+        midstate = measure(MIDSTATE_STRATEGY, hash_type, start, end, args.repeats)
+        gain = (midstate / direct - 1) * 100
+        print(f"{hash_type.value:<10} {direct:>14,.0f} {midstate:>14,.0f} {gain:>7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+Micro-benchmarks of the hot paths of the master and the minion, with JSON baselines.
+
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json
+    python -m benchmarks.suite compare baseline.json current.json --threshold 10
+
+`compare` exits with status 1 if any benchmark got slower than the baseline by more than threshold percent.
+Baselines are only comparable on the same machine.
+"""
+import argparse
+import contextlib
+import datetime
+import functools
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, ContextManager, Dict, List, NamedTuple, Optional
+
+from common.config.HashesTypes import HashTypes
+from common.crack_objects import PhoneNumberValidator, PhoneRange
+from common.crack_objects.PhoneNumber import int_to_phone_number
+from common.hashing import get_hashlib_func
+from common.keyspace import Keyspace
+from common.phone_ranges import _ranges_for_jobs_generator, efficient_phone_num_range
+from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface
+from master.scheduler_state.SchedulerState import SchedulerState
+from minion.MinionCracker import MinionCracker
+
+DEFAULT_THRESHOLD = 10  # percent
+START_PHONE = 527500000
+
+
+class Benchmark(NamedTuple):
+    # runs the benchmark once and returns the number of units it processed, func(scale) or func(scale, fixture)
+    func: Callable[..., int]
+    # setup(scale) is a context manager whose value is passed to func, building it is not timed
+    setup: Optional[Callable[[float], ContextManager]] = None
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, setup: Callable[[float], ContextManager] = None):
+    def register(func):
+        BENCHMARKS[name] = Benchmark(func, setup)
+        return func
+    return register
+
+
+@functools.lru_cache(maxsize=None)
+def _never_found(hash_type: HashTypes, count: int) -> List[str]:
+    """hashes no candidate has, so the whole range is scanned (cached, generating them is not part of a benchmark)"""
+    digest_size = get_hashlib_func(hash_type)().digest_size
+    return [f"{i:0{digest_size * 2}x}" for i in range(count)]
+
+
+@benchmark("phone_validator.range")
+def bench_phone_range(scale: float) -> int:
+    count = int(200000 * scale)
+    start = PhoneNumberValidator(phone_number=int_to_phone_number(START_PHONE))
+    end = PhoneNumberValidator(phone_number=int_to_phone_number(START_PHONE + count - 1))
+    for _ in PhoneNumberValidator.range(start, end):
+        pass
+    return count
+
+
+@benchmark("phone_validator.split_to_sub_ranges")
+def bench_split_to_sub_ranges(scale: float) -> int:
+    ranges = 0
+    for _ in PhoneNumberValidator.split_to_sub_ranges(
+        start=PhoneNumberValidator(phone_number="050-0000000"),
+        end=PhoneNumberValidator(phone_number="059-9999999"),
+        sub_ranges_size=int(100000 / scale)
+    ):
+        ranges += 1
+    return ranges
+
+
+@benchmark("phone_range.split")
+def bench_phone_range_split(scale: float) -> int:
+    ranges = 0
+    for _ in PhoneRange.parse("050-0000000", "059-9999999").split(int(100000 / scale)):
+        ranges += 1
+    return ranges
+
+
+@benchmark("phone_ranges.ranges_for_jobs_generator")
+def bench_ranges_for_jobs_generator(scale: float) -> int:
+    ranges = 0
+    for _ in _ranges_for_jobs_generator(password_ranges=efficient_phone_num_range,
+                                        passwords_per_job=int(100000 / scale)):
+        ranges += 1
+    return ranges
+
+
+@contextlib.contextmanager
+def _minion_cracker(start_worker_pool: bool = False):
+    """a minion with its own db (and the numpy self check done), starting the processes is not part of a job"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        minion = MinionCracker(db_path=os.path.join(work_dir, "MinionCracker.db"))
+        if not start_worker_pool:
+            yield minion
+            return
+        minion.worker_pool.start()
+        try:
+            yield minion
+        finally:
+            minion.shutdown()
+
+
+def _register_minion_benchmarks():
+    for hash_type in HashTypes:
+        for target_count in (1, 100, 10000):
+            def bench_batch(scale: float, minion: MinionCracker, hash_type=hash_type, target_count=target_count) -> int:
+                count = int(100000 * scale)
+                start = START_PHONE
+                minion.process_password_batch(start, start + count - 1, _never_found(hash_type, target_count),
+                                              hash_type=hash_type.value)
+                return count
+            benchmark(f"minion.process_password_batch[{hash_type.value},{target_count}]",
+                      setup=lambda scale: _minion_cracker())(bench_batch)
+
+    for hash_type in (HashTypes.MD5, HashTypes.SHA256):
+        for target_count in (1, 10000):
+            def bench_job(scale: float, minion: MinionCracker, hash_type=hash_type, target_count=target_count) -> int:
+                count = int(1000000 * scale)
+                start = START_PHONE
+                hashes = _never_found(hash_type, target_count)
+                minion.multi_processing_job(
+                    start_phone=start, end_phone=start + count - 1, needed_hashes=hashes,
+                    hash_types={hash_value: hash_type for hash_value in hashes}
+                )
+                return count
+            benchmark(f"minion.multi_processing_job[{hash_type.value},{target_count}]",
+                      setup=lambda scale: _minion_cracker(start_worker_pool=True))(bench_job)
+
+
+_register_minion_benchmarks()
+
+
+@contextlib.contextmanager
+def _master_db(scale: float):
+    """an empty master db with its tables and one minion"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        db = MasterCrackerDbInterface(db_path=os.path.join(work_dir, "MasterCracker.db"))
+        db.create_tables()
+        minion_id = db.register_new_minion("127.0.0.1", 8000)
+        yield db, minion_id, Keyspace()
+
+
+@benchmark("master_db.scheduling", setup=_master_db)
+def bench_master_db_scheduling(scale: float, master_db) -> int:
+    """the db calls of adding hashes, dispatching their jobs to minions and completing them"""
+    db, minion_id, keyspace = master_db
+    hash_count = max(1, int(20 * scale))
+    calls = 0
+    for i in range(hash_count):
+        db.add_new_hash(f"{i:032x}")
+        calls += 1
+    db.start_scheduled_hashes()
+    calls += 1
+    for _ in range(hash_count * 10):
+        db.get_all_available_minions()
+        db.get_scheduled_job_assignments(limit=1)
+        hash_type, position, _ = db.get_pending_sweeps(keyspace.size)[0]
+        start_range = keyspace.number_at(position % keyspace.size)
+        job_id = db.claim_sweep_range(hash_type, position, position + 100000, start_range, start_range + 99999,
+                                      keyspace.size)
+        db.get_sweep_targets(hash_type, position, keyspace.size)
+        db.update_job_assignment(job_id, minion_id, keyspace.size)
+        db.complete_job_assignment(db.get_job_assignment_by_id(job_id), keyspace.size)
+        calls += 8
+    return calls
+
+
+@contextlib.contextmanager
+def _scheduler_state(scale: float):
+    """the scheduler state of a master db with one minion and scheduled jobs of one hash"""
+    with _master_db(scale) as (db, minion_id, keyspace):
+        hash_id = db.add_new_hash(f"{0:032x}")
+        db.batch_create_job_assignments([(hash_id, START_PHONE + i * 1000, START_PHONE + i * 1000 + 999)
+                                         for i in range(max(1, int(2000 * scale)))])
+        state = SchedulerState(db)
+        state.load()
+        yield state, minion_id, db.get_hash_by_id(hash_id), keyspace
+
+
+@benchmark("scheduler_state.dispatch", setup=_scheduler_state)
+def bench_scheduler_state_dispatch(scale: float, scheduler_state) -> int:
+    """the scheduling calls of sending a job to a minion and completing it, their db writes are queued behind them"""
+    state, minion_id, hash_entry, keyspace = scheduler_state
+    calls = 0
+    while True:
+        state.get_available_minions()
+        jobs = state.take_scheduled_jobs(limit=1)
+        if not jobs:
+            return calls
+        state.job_sent(jobs[0].Id, minion_id, time.time() + 60, keyspace.size, minion_busy=False)
+        job = state.find_job(hash_entry, jobs[0].StartRange, jobs[0].EndRange)
+        state.complete_job(job, keyspace.size)
+        calls += 5
+
+
+def run_benchmarks(names: List[str], scale: float, repeats: int) -> Dict[str, dict]:
+    results = {}
+    for name in names:
+        best = None
+        units = 0
+        func, setup = BENCHMARKS[name]
+        for _ in range(repeats):
+            with setup(scale) if setup else contextlib.nullcontext() as fixture:
+                started = time.perf_counter()
+                units = func(scale, fixture) if setup else func(scale)
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {"seconds": best, "units": units, "per_second": units / best}
+        print(f"{name:<55} {units / best:>16,.0f} /s")
+    return results
+
+
+def compare_results(baseline: Dict[str, dict], current: Dict[str, dict], threshold: float) -> List[str]:
+    """prints the change of every benchmark in both runs, returns the names that regressed beyond threshold"""
+    regressions = []
+    print(f"{'Benchmark':<55} {'baseline /s':>14} {'current /s':>14} {'change':>8}")
+    print("-" * 94)
+    for name in sorted(set(baseline) & set(current)):
+        before = baseline[name]["per_second"]
+        after = current[name]["per_second"]
+        change = (after / before - 1) * 100
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<55} {before:>14,.0f} {after:>14,.0f} {change:>7.1f}%{'  REGRESSION' if regressed else ''}")
+    missing = set(baseline) - set(current)
+    if missing:
+        print(f"({len(missing)} benchmarks of the baseline were not run)")
+    return regressions
+
+
+def _load(path: str) -> Dict[str, dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hot path micro-benchmarks with JSON baselines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument('--output', type=str, help='JSON file to write the results to')
+    run_parser.add_argument('--filter', type=str, default="", help='only run benchmarks whose name contains this')
+    run_parser.add_argument('--scale', type=float, default=1.0, help='multiplies the work done by every benchmark')
+    run_parser.add_argument('--repeats', type=int, default=3)
+    run_parser.add_argument('--compare', type=str, help='baseline JSON file to compare the results with')
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument('baseline', type=str)
+    compare_parser.add_argument('current', type=str)
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='percent of slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    if args.command == "run":
+        names = [name for name in BENCHMARKS if args.filter in name]
+        results = run_benchmarks(names, args.scale, args.repeats)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({
+                    "meta": {
+                        "timestamp": datetime.datetime.now().isoformat(),
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "cpu_count": multiprocessing.cpu_count(),
+                        "scale": args.scale,
+                    },
+                    "results": results
+                }, f, indent=2)
+        if not args.compare:
+            return
+        baseline, current = _load(args.compare), results
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    print()
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed by more than {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
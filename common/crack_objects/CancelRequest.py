@@ -0,0 +1,6 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class CancelRequest(BaseModel):
+    hashes: List[str]
@@ -1,12 +1,22 @@
-from typing import List
+from typing import Dict, List
 from pydantic import BaseModel
-from .PhoneNumber import PhoneNumberValidator
+from .PhoneNumber import PhoneNumber
 from common.config.HashesTypes import HashTypes
 
 
 class CrackRequest(BaseModel):
     hashes: List[str]
-    start_range: PhoneNumberValidator
-    end_range: PhoneNumberValidator
-    hash_type: HashTypes=HashTypes.MD5.value
+    start_range: PhoneNumber
+    end_range: PhoneNumber
+    hash_type: HashTypes = HashTypes.MD5
+    # per hash override of hash_type, lets one job carry targets of several algorithms
+    hash_types: Dict[str, HashTypes] = {}
 
+    def hash_type_of(self, hash_value: str) -> HashTypes:
+        return self.hash_types.get(hash_value, self.hash_type)
+
+    def targets_by_hash_type(self) -> Dict[str, List[str]]:
+        targets = {}
+        for hash_value in self.hashes:
+            targets.setdefault(self.hash_type_of(hash_value).value, []).append(hash_value)
+        return targets
@@ -1,8 +1,8 @@
 from typing import Dict, Union
 from pydantic import BaseModel
-from common.crack_objects.PhoneNumber import PhoneNumberValidator
+from common.crack_objects.PhoneNumber import PhoneNumber
 
 class CrackResult(BaseModel):
-    range_start: PhoneNumberValidator
-    range_end: PhoneNumberValidator
+    range_start: PhoneNumber
+    range_end: PhoneNumber
     results: Dict[str, Union[str, bool]]
\ No newline at end of file
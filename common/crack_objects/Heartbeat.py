@@ -0,0 +1,10 @@
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+from common.crack_objects.PhoneNumber import PhoneNumber
+
+
+class Heartbeat(BaseModel):
+    port: int
+    ip: Optional[str] = None  # the master takes the address the heartbeat came from if it isn't given
+    # (start, end) of every job the minion still holds: running, queued or with a result it couldn't report yet
+    ranges: List[Tuple[PhoneNumber, PhoneNumber]] = []
@@ -4,11 +4,13 @@ from typing import Optional
 @dataclass
 class Job:
     Id: int
-    StartRange: str
-    EndRange: str
+    StartRange: int
+    EndRange: int
     Status: str
     HashId: Optional[int] = None
     HashValue: Optional[str] = None
+    Checkpoint: Optional[int] = None
+    HashType: Optional[str] = None
     
     def is_finished(self) -> bool:
         return self.Status == "Completed"
@@ -23,7 +25,9 @@ class Job:
             "EndRange": self.EndRange,
             "Status": self.Status,
             "HashId": self.HashId,
-            "HashValue": self.HashValue
+            "HashValue": self.HashValue,
+            "Checkpoint": self.Checkpoint,
+            "HashType": self.HashType
         }
     
     @classmethod
@@ -34,5 +38,7 @@ class Job:
             EndRange=data["EndRange"],
             Status=data["Status"],
             HashId=data.get("HashId"),
-            HashValue=data.get("HashValue")
+            HashValue=data.get("HashValue"),
+            Checkpoint=data.get("Checkpoint"),
+            HashType=data.get("HashType")
         )
\ No newline at end of file
@@ -1,16 +1,46 @@
 import re
-from typing import TypeVar, Tuple
-from pydantic import BaseModel
+from typing import Annotated, TypeVar, Tuple, Union
+from pydantic import BaseModel, BeforeValidator
 
 C = TypeVar("C",bound="PhoneNumberValidator")
 
+PHONE_NUMBER_PATTERN = re.compile(r"^05\d-\d{7}$|^05\d\d{7}$")
+
+# phone numbers are handled as the integer value of their digits (052-7500000 -> 527500000),
+# the leading "0" is implied.
+MIN_PHONE_NUMBER = 500000000
+MAX_PHONE_NUMBER = 599999999
+
+
+def phone_number_to_int(phone_number: str) -> int:
+    return int(str(phone_number).replace('-', ''))
+
+
+def int_to_phone_number(number: int) -> str:
+    num_str = f"0{number}"
+    return f"{num_str[:3]}-{num_str[3:]}"
+
+
+def parse_phone_number(value: Union[int, str]) -> int:
+    """validates a phone number given as its integer value (also as a string, from url paths) or like 052-7500000"""
+    if isinstance(value, str) and PhoneNumberValidator.is_valid(value):
+        return phone_number_to_int(value)
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and MIN_PHONE_NUMBER <= value <= MAX_PHONE_NUMBER:
+        return value
+    raise ValueError(f"Invalid phone number format: {value}")
+
+
+# the wire format of phone numbers, validated once when a request or result is parsed
+PhoneNumber = Annotated[int, BeforeValidator(parse_phone_number)]
+
 
 class PhoneNumberValidator(BaseModel): #todo: figure out why i need to write the key-argument "phone_number"
     phone_number: str
 
     @classmethod
     def is_valid(cls, phone_number: str) -> bool:
-        PHONE_NUMBER_PATTERN = re.compile(r"^05\d-\d{7}$|^05\d\d{7}$")
         return bool(PHONE_NUMBER_PATTERN.match(phone_number))
 
     def model_post_init(self, __context) -> None:
@@ -23,14 +53,17 @@ class PhoneNumberValidator(BaseModel): #todo: figure out why i need to write the
     def __str__(self):
         return self.phone_number
 
+    def __int__(self):
+        return phone_number_to_int(self.phone_number)
+
     @classmethod
     def range(cls, start: C, end: C):
         start_num = int(start.phone_number.replace('-', ''))
         end_num = int(end.phone_number.replace('-', ''))
-        
+
         if start_num > end_num:
             start_num, end_num = end_num, start_num
-        
+
         for num in range(start_num, end_num + 1):
             num_str = "0" + str(num)
             if num_str.startswith('05') and len(num_str) == 10: # todo: how can we save on ifs
@@ -63,4 +96,4 @@ if __name__ == '__main__':
     phone2 = PhoneNumberValidator(phone_number="051-1000300")
 
     for phones in PhoneNumberValidator.split_to_sub_ranges(phone2, phone1, 10000):
-        print(f"{phones[0]}, {phones[1]}")
\ No newline at end of file
+        print(f"{phones[0]}, {phones[1]}")
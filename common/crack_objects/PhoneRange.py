@@ -0,0 +1,50 @@
+from typing import Iterator
+
+from common.crack_objects.PhoneNumber import int_to_phone_number, phone_number_to_int
+
+
+class PhoneRange:
+    """
+    Inclusive range of phone numbers as the integer value of their digits (052-7500000 -> 527500000).
+    Unpacks like a (start, end) tuple. It isn't validated, ranges coming from outside are parsed
+    by the PhoneNumber fields of the request objects.
+    """
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int):
+        if start > end:
+            start, end = end, start
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, start: str, end: str) -> "PhoneRange":
+        return cls(phone_number_to_int(start), phone_number_to_int(end))
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+    def __iter__(self):
+        yield self.start
+        yield self.end
+
+    def __contains__(self, number: int) -> bool:
+        return self.start <= number <= self.end
+
+    def __eq__(self, other):
+        return isinstance(other, PhoneRange) and self.start == other.start and self.end == other.end
+
+    def __hash__(self):
+        return hash((self.start, self.end))
+
+    def __repr__(self):
+        return f"PhoneRange({self.start}, {self.end})"
+
+    def __str__(self):
+        return f"{int_to_phone_number(self.start)} to {int_to_phone_number(self.end)}"
+
+    def split(self, size: int) -> Iterator["PhoneRange"]:
+        """consecutive sub ranges of `size` numbers, the last one may be shorter"""
+        size = max(1, size)
+        for sub_start in range(self.start, self.end + 1, size):
+            yield PhoneRange(sub_start, min(sub_start + size - 1, self.end))
@@ -1,5 +1,8 @@
 from .CrackResult import CrackResult
 from .CrackRequest import CrackRequest
 from .PhoneNumber import PhoneNumberValidator
+from .PhoneRange import PhoneRange
 from .HashEntry import HashEntry
-from .CrackStatus import CrackStatus
\ No newline at end of file
+from .CrackStatus import CrackStatus
+from .CancelRequest import CancelRequest
+from .Heartbeat import Heartbeat
\ No newline at end of file
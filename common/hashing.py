@@ -0,0 +1,29 @@
+import hashlib
+from typing import List, Optional, Union
+
+from common.config.HashesTypes import HashTypes
+
+
+def get_hashlib_func(hash_type: Union[str, HashTypes]):
+    try:
+        hash_type = HashTypes(hash_type.lower() if isinstance(hash_type, str) else hash_type)
+    except ValueError:
+        raise ValueError(f"Unsupported hash type: {hash_type}")
+    return getattr(hashlib, hash_type.value)
+
+
+def hash_types_for_digest(hash_value: str) -> List[HashTypes]:
+    """every algorithm whose hex digest has the length of hash_value"""
+    return [hash_type for hash_type in HashTypes if get_hashlib_func(hash_type)().digest_size * 2 == len(hash_value)]
+
+
+def calculate_hash(password: str, hash_type: Union[str, HashTypes] = HashTypes.MD5) -> str:
+    return get_hashlib_func(hash_type)(password.encode('utf-8')).hexdigest()
+
+
+def find_hash_type(hash_value: str, password: str) -> Optional[HashTypes]:
+    """returns the algorithm that hashes password into hash_value, None if no algorithm does"""
+    for hash_type in hash_types_for_digest(hash_value):
+        if calculate_hash(password, hash_type) == hash_value.lower():
+            return hash_type
+    return None
@@ -0,0 +1,93 @@
+import bisect
+from typing import Iterator, List, Tuple
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class IntervalSet:
+    """
+    Set of integers kept as sorted, disjoint and non adjacent inclusive intervals,
+    adding an interval merges it with the ones it touches.
+    """
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, intervals: List[Tuple[int, int]] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def add(self, start: int, end: int):
+        if start > end:
+            start, end = end, start
+        # the intervals that overlap or touch [start, end] are [first, last)
+        first = bisect.bisect_left(self._ends, start - 1)
+        last = bisect.bisect_right(self._starts, end + 1)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+
+    def covered(self) -> int:
+        """how many integers are in the set"""
+        return sum(self._ends) - sum(self._starts) + len(self._starts)
+
+    def covers(self, start: int, end: int) -> bool:
+        index = bisect.bisect_right(self._starts, start) - 1
+        return index >= 0 and self._ends[index] >= end
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self._starts, self._ends)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __eq__(self, other):
+        return isinstance(other, IntervalSet) and self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self):
+        return f"IntervalSet({list(self)})"
+
+    def to_bytes(self) -> bytes:
+        """varints of the gap before every interval and its length - 1, a few bytes per interval"""
+        buffer = bytearray()
+        previous_end = -1
+        for start, end in self:
+            _write_varint(buffer, start - previous_end - 1)
+            _write_varint(buffer, end - start)
+            previous_end = end
+        return bytes(buffer)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "IntervalSet":
+        interval_set = cls()
+        if not data:
+            return interval_set
+        position = 0
+        previous_end = -1
+        while position < len(data):
+            gap, position = _read_varint(data, position)
+            length, position = _read_varint(data, position)
+            start = previous_end + gap + 1
+            previous_end = start + length
+            interval_set._starts.append(start)
+            interval_set._ends.append(previous_end)
+        return interval_set
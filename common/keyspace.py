@@ -0,0 +1,44 @@
+import bisect
+from typing import List, Tuple
+
+from common.crack_objects.PhoneNumber import phone_number_to_int
+from common.phone_ranges import efficient_phone_num_range
+
+
+class Keyspace:
+    """
+    Linear view of a list of phone number ranges: index 0 is the first number of the first range,
+    and the indices continue through the ranges in their order.
+    Phone numbers are handled as the integer value of their digits (052-7500000 -> 527500000).
+    """
+    def __init__(self, password_ranges: Tuple[Tuple[str, str], ...] = efficient_phone_num_range):
+        self.ranges: List[Tuple[int, int]] = [
+            (phone_number_to_int(start), phone_number_to_int(end)) for start, end in password_ranges
+        ]
+        self._index_starts = []
+        size = 0
+        for start, end in self.ranges:
+            self._index_starts.append(size)
+            size += end - start + 1
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def number_at(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(f"Keyspace index out of range: {index}")
+        range_index = bisect.bisect_right(self._index_starts, index) - 1
+        return self.ranges[range_index][0] + index - self._index_starts[range_index]
+
+    def range_end_index(self, index: int) -> int:
+        """index of the last number of the range that holds index"""
+        range_index = bisect.bisect_right(self._index_starts, index) - 1
+        start, end = self.ranges[range_index]
+        return self._index_starts[range_index] + end - start
+
+    def index_of(self, number: int) -> int:
+        for (start, end), index_start in zip(self.ranges, self._index_starts):
+            if start <= number <= end:
+                return index_start + number - start
+        raise ValueError(f"Phone number is not in the keyspace: {number}")
@@ -7,8 +7,11 @@ class HashReport:
         hash_value: str,
         password: Optional[str] = None,
         status: str = "Unknown",
-        total_jobs: Optional[int] = None,
-        completed_jobs: Optional[int] = None,
+        covered_candidates: Optional[int] = None,
+        total_candidates: Optional[int] = None,
+        total_jobs: int = 0,
+        completed_jobs: int = 0,
+        in_flight_jobs: int = 0,
         creation_time: Optional[str] = None,
         crack_time: Optional[str] = None
     ):
@@ -16,8 +19,11 @@ class HashReport:
         self.hash_value = hash_value
         self.password = password
         self.status = status
+        self.covered_candidates = covered_candidates
+        self.total_candidates = total_candidates
         self.total_jobs = total_jobs
         self.completed_jobs = completed_jobs
+        self.in_flight_jobs = in_flight_jobs
         self.creation_time = creation_time
         self.crack_time = crack_time
 
@@ -27,8 +33,11 @@ class HashReport:
             "hash_value": self.hash_value,
             "password": self.password,
             "status": self.status,
+            "covered_candidates": self.covered_candidates,
+            "total_candidates": self.total_candidates,
             "total_jobs": self.total_jobs,
             "completed_jobs": self.completed_jobs,
+            "in_flight_jobs": self.in_flight_jobs,
             "creation_time": self.creation_time,
             "crack_time": self.crack_time
         }
@@ -40,8 +49,11 @@ class HashReport:
             hash_value=data.get("hash_value"),
             password=data.get("password"),
             status=data.get("status"),
-            total_jobs=data.get("total_jobs"),
-            completed_jobs=data.get("completed_jobs"),
+            covered_candidates=data.get("covered_candidates"),
+            total_candidates=data.get("total_candidates"),
+            total_jobs=data.get("total_jobs", 0),
+            completed_jobs=data.get("completed_jobs", 0),
+            in_flight_jobs=data.get("in_flight_jobs", 0),
             creation_time=data.get("creation_time"),
             crack_time=data.get("crack_time")
         )
\ No newline at end of file
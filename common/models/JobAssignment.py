@@ -5,10 +5,13 @@ from .statuses.JobAssignmentStatus import JobAssignmentStatus
 @dataclass
 class JobAssignment:
     Id: int
-    HashId: int
-    StartRange: str
-    EndRange: str
+    HashId: Optional[int]  # None for the jobs of a sweep, they search for every hash of HashType that joined before them
+    StartRange: int
+    EndRange: int
     Status: JobAssignmentStatus = JobAssignmentStatus.SCHEDULED
     MinionId: Optional[int] = None
     AssignmentTime: Optional[str] = None
     CompletionTime: Optional[str] = None
+    HashType: Optional[str] = None
+    SweepPosition: Optional[int] = None
+    LeaseExpiresAt: Optional[float] = None  # unix time, while the job is in progress
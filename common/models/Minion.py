@@ -1,7 +1,8 @@
 from common.models.statuses.MinionStatus import MinionStatus
 
 class Minion:
-    def __init__(self, Id, Ip, Port, Status=MinionStatus.AVAILABLE, LastSeen=None, FailedHealthChecks=0):
+    def __init__(self, Id, Ip, Port, Status=MinionStatus.AVAILABLE, LastSeen=None, FailedHealthChecks=0,
+                 CandidatesPerSecond=None, BestWorkers=None, BestChunkSize=None, HashRates=None):
         self.Id = Id
         self.Ip = Ip
         self.Port = Port
@@ -16,6 +17,12 @@ class Minion:
             self.Status = Status
         self.LastSeen = LastSeen
         self.FailedHealthChecks = FailedHealthChecks
+        # measured by the minion's /benchmark, None until it was benchmarked
+        self.CandidatesPerSecond = CandidatesPerSecond
+        self.BestWorkers = BestWorkers
+        self.BestChunkSize = BestChunkSize
+        # candidates per second of every algorithm (hash type value -> rate), empty if it wasn't benchmarked since
+        self.HashRates = HashRates or {}
 
     def __repr__(self):
         return (f"Minion(Id={self.Id}, Ip='{self.Ip}', Port={self.Port}, Status='{self.Status.name}', "
@@ -1,6 +1,6 @@
 from typing import List, Tuple
 
-from common.crack_objects import PhoneNumberValidator
+from common.crack_objects import PhoneRange
 
 
 phone_num_range = (
@@ -35,9 +35,4 @@ efficient_phone_num_range = (
 # PROOF IT'S THE FULL RANGE -> https://imgur.com/a/cX4077U
 def _ranges_for_jobs_generator(password_ranges: Tuple[Tuple[str, str]], passwords_per_job: int):
     for big_pass_range in password_ranges:
-        for job_pass_range in PhoneNumberValidator.split_to_sub_ranges(
-            start=PhoneNumberValidator(phone_number=big_pass_range[0]),
-            end=PhoneNumberValidator(phone_number=big_pass_range[1]),
-            sub_ranges_size=passwords_per_job
-        ):
-            yield job_pass_range
\ No newline at end of file
+        yield from PhoneRange.parse(*big_pass_range).split(passwords_per_job)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+# seconds a query waits on a db locked by another connection before it fails
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", 30))
+# prepared statements kept by every connection, the queries of a db are reused and never prepared twice
+SQLITE_CACHED_STATEMENTS = int(os.environ.get("SQLITE_CACHED_STATEMENTS", 256))
+
+
+class SqliteConnections:
+    """
+    One connection to the db per thread, opened on the first query of the thread and kept for its next ones,
+    so the statements the connection prepared are reused. Connections journal in WAL mode, so readers
+    don't wait on the writer, and sync with synchronous=NORMAL, at checkpoints instead of every commit.
+    Queries run in autocommit mode unless they are inside transaction().
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None,
+                                   cached_statements=SQLITE_CACHED_STATEMENTS)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Runs the block as one transaction and yields a cursor for it, nothing of it is applied if it raises.
+        Every query of the thread inside the block joins the transaction, a transaction inside
+        another one is a savepoint that only rolls back its own queries.
+        """
+        conn = self.connection()
+        depth = self.local.depth
+        savepoint = f"transaction_{depth}"
+        # the write lock is taken up front, a transaction never fails midway on upgrading its read lock
+        conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self.local.depth = depth + 1
+        try:
+            yield conn.cursor()
+            conn.execute("COMMIT" if depth == 0 else f"RELEASE {savepoint}")
+        except BaseException:
+            if conn.in_transaction:
+                if depth == 0:
+                    conn.execute("ROLLBACK")
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+            raise
+        finally:
+            self.local.depth = depth
+
+    def close(self):
+        """closes the connection of the calling thread, its next query opens a new one"""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+def execute_in_transaction(connections: SqliteConnections, queries: Iterable[str]) -> bool:
+    """runs the queries as one transaction, nothing of them is applied if any of them fails"""
+    try:
+        with connections.transaction() as cursor:
+            for query in queries:
+                cursor.execute(query)
+        return True
+    except sqlite3.Error as e:
+        print(f"Error executing queries {queries}: {e}")
+        return False
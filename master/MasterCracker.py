@@ -1,27 +1,37 @@
-import hashlib
 import os
 import threading
 import time
-from typing import List
+from typing import List, Optional, Tuple
 
-import requests
+import httpx
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 
+from common.config.HashesTypes import HashTypes
+
+from common.crack_objects.CancelRequest import CancelRequest
 from common.crack_objects.CrackRequest import CrackRequest
 from common.crack_objects.CrackResult import CrackResult
-from common.crack_objects.PhoneNumber import PhoneNumberValidator
+from common.crack_objects.Heartbeat import Heartbeat
+from common.crack_objects.PhoneRange import PhoneRange
+from common.hashing import calculate_hash
+from common.models.Hash import Hash
 from common.models.JobAssignment import JobAssignment
 from common.models.Minion import Minion
 from common.models.NewMinion import NewMinion
 from common.models.statuses.HashStatus import HashStatus
 from common.models.statuses.JobAssignmentStatus import JobAssignmentStatus
 from common.models.statuses.MinionStatus import MinionStatus
-from common.phone_ranges import _ranges_for_jobs_generator, efficient_phone_num_range, phone_num_range
+from common.keyspace import Keyspace
+from common.phone_ranges import efficient_phone_num_range, phone_num_range
+from master.digest_index.DigestIndex import load_digest_indexes
+from master.fleet_client.FleetClient import FleetClient
+from master.rainbow_table.RainbowTable import load_rainbow_tables
 from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface
+from master.scheduler_state.SchedulerState import SchedulerState
 
 # change this if you want to hash by num order (and not by efficient order)
-PHONE_NUM_RANGES = efficient_phone_num_range
+PHONE_NUM_RANGES = tuple(PhoneRange.parse(start, end) for start, end in efficient_phone_num_range)
 
 app = FastAPI()
 DEFAULT_IP = os.environ.get("DEFAULT_IP", "127.0.0.1")
@@ -31,7 +41,18 @@ HEALTH_CHECK_INTERVAL = int(os.environ.get("HEALTH_CHECK_INTERVAL", 10))
 SET_MINION_TO_UNAVAILABLE_AFTER_HEALTH_CHECK = int(os.environ.get("SET_MINION_TO_UNAVAILABLE_AFTER_HEALTH_CHECK", 5))
 MAX_FAILED_HEALTH_CHECKS = int(os.environ.get("MAX_FAILED_HEALTH_CHECKS", 0))
 
-PASSWORDS_PER_JOB = int(os.environ.get("PASSWORDS_PER_JOB", 100000))
+PASSWORDS_PER_JOB = int(os.environ.get("PASSWORDS_PER_JOB", 100000))  # job size for minions that weren't benchmarked
+# jobs are cut from the scheduled ranges when they are sent, sized to take a minion about JOB_TARGET_SECONDS
+JOB_TARGET_SECONDS = int(os.environ.get("JOB_TARGET_SECONDS", 60))
+MIN_PASSWORDS_PER_JOB = int(os.environ.get("MIN_PASSWORDS_PER_JOB", 10000))
+MAX_PASSWORDS_PER_JOB = int(os.environ.get("MAX_PASSWORDS_PER_JOB", 20000000))
+# a job belongs to its minion while the minion renews its lease with a heartbeat (see /heartbeat),
+# results are only pushed by the minions and a job whose lease expired is scheduled again
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", 60))
+LEASE_CHECK_INTERVAL = int(os.environ.get("LEASE_CHECK_INTERVAL", 10))
+MINION_BENCHMARK_TIMEOUT = int(os.environ.get("MINION_BENCHMARK_TIMEOUT", 300))
+DIGEST_INDEX_DIR = os.environ.get("DIGEST_INDEX_DIR", os.path.join(os.path.dirname(__file__), "digest_index", "indexes"))
+RAINBOW_TABLE_DIR = os.environ.get("RAINBOW_TABLE_DIR", os.path.join(os.path.dirname(__file__), "rainbow_table", "tables"))
 
 master_cracker = None
 
@@ -46,14 +67,22 @@ def get_master_cracker():
 class MasterCracker:
     def __init__(self):
         self.db = MasterCrackerDbInterface()
+        self.keyspace = Keyspace(PHONE_NUM_RANGES)
+        self.fleet = FleetClient()
         self.__create_master_cracker_db()
+        # minions, scheduled jobs and jobs in flight are scheduled in memory and written to the db behind it
+        self.state = SchedulerState(self.db)
+        self.state.load()
+        self.state.start()
+        self.digest_indexes = load_digest_indexes(DIGEST_INDEX_DIR)
+        self.rainbow_tables = load_rainbow_tables(RAINBOW_TABLE_DIR)
 
         self.health_check_thread = None
-        self.job_scan_thread = None
+        self.lease_check_thread = None
         self.job_assignment_thread = None
 
         self.health_check_running = False
-        self.job_scan_running = False
+        self.lease_check_running = False
         self.job_assignment_running = False
 
         self.start_scheduled_tasks()
@@ -61,6 +90,8 @@ class MasterCracker:
     def __create_master_cracker_db(self):
         if not os.path.exists(self.db.db_path) or not self.db.check_tables_exist():
             self.db.create_tables()
+        else:
+            self.db.migrate(self.keyspace.size, time.time() + JOB_LEASE_SECONDS)
 
     def start_scheduled_tasks(self):
         if not self.health_check_thread or not self.health_check_thread.is_alive():
@@ -71,119 +102,53 @@ class MasterCracker:
             self.job_assignment_thread = threading.Thread(target=self.periodic_job_assignments, daemon=True)
             self.job_assignment_thread.start()
 
-        if not self.job_scan_thread or not self.job_scan_thread.is_alive():
-            self.job_scan_thread = threading.Thread(target=self.periodic_in_progress_jobs_scan, daemon=True)
-            self.job_scan_thread.start()
+        if not self.lease_check_thread or not self.lease_check_thread.is_alive():
+            self.lease_check_thread = threading.Thread(target=self.periodic_lease_check, daemon=True)
+            self.lease_check_thread.start()
 
     # region Scheduled Tasks
 
     def periodic_health_check(self):
         self.health_check_running = True
         while self.health_check_running:
-            minions = self.db.get_all_minions()
-            for minion in minions:
+            minions = self.state.get_all_minions()
+            reported_statuses = self.fleet.map(self.__minion_health, minions)
+            for minion, reported_status in zip(minions, reported_statuses):
                 minion_id = minion.Id
-                ip = minion.Ip
-                port = minion.Port
-                reported_status = self.check_minion_health(ip, port)
                 if reported_status:
                     if reported_status == MinionStatus.AVAILABLE.value and minion.Status == MinionStatus.BUSY:
-                        self.db.update_minion_status(minion_id=minion.Id, status=MinionStatus.AVAILABLE.value)
+                        self.state.update_minion_status(minion_id=minion.Id, status=MinionStatus.AVAILABLE)
                     elif minion.Status == MinionStatus.UNAVAILABLE:
-                        self.db.update_minion_status_and_failed_checks(
+                        self.state.update_minion_status_and_failed_checks(
                             minion_id,
-                            MinionStatus.AVAILABLE.value,
+                            MinionStatus.AVAILABLE,
                             0
                         )
                     else:
-                        self.db.update_failed_checks_to_zero(minion_id,)
+                        self.state.update_failed_checks_to_zero(minion_id)
 
                 else:
                     self.__update_minion_as_not_seen(minion_id)
 
             time.sleep(HEALTH_CHECK_INTERVAL)
 
-    def __in_progress_jobs_scan(self):
-        in_progress_jobs = self.db.get_all_in_progress_jobs()
-        if not in_progress_jobs:
-            return 0
-
-        jobs_completed = 0
-        jobs_rescheduled = 0
-
-        for job in in_progress_jobs:
-            job_id = job[0]
-            hash_id = job[1]
-            minion_id = job[2]
-            start_range = job[3]
-            end_range = job[4]
-            hash_value = job[5]
-
-            minion = self.db.get_minion_by_id(minion_id)
-            if not minion:
-                continue
-
-            try:
-                status_url = f"http://{minion.Ip}:{minion.Port}/status/{hash_value}/{start_range}/{end_range}"
-                response = requests.get(status_url, timeout=3)
-
-                if response.status_code == 200:
-                    status_data = response.json()
-
-                    if status_data.get("status") == "Completed":
-                        results = {}
-                        hashes_data = status_data.get("hashes", {})
-
-                        for hash_val, result in hashes_data.items():
-                            results[hash_val] = result
-
-                        crack_result = CrackResult(
-                            range_start=PhoneNumberValidator(phone_number=start_range),
-                            range_end=PhoneNumberValidator(phone_number=end_range),
-                            results=results
-                        )
-
-                        self.complete_job_assignment(crack_result)
-                        jobs_completed += 1
-                elif response.status_code == 404:
-                    # Job not found on minion - reschedule it
-                    print(f"Job {job_id} not found on minion {minion.Ip}:{minion.Port}. Rescheduling...")
-                    self.db.update_job_assignment(job_id, None, JobAssignmentStatus.SCHEDULED.value)
-                    self.db.update_minion_status(minion_id, MinionStatus.AVAILABLE.value)
-                    jobs_rescheduled += 1
-
-            except requests.RequestException as e:
-                print(f"Error checking job status for job {job_id} with minion {minion.Ip}:{minion.Port}: {e}")
-                
-                if isinstance(e, (requests.ConnectionError, requests.Timeout)):
-                    print(f"Minion {minion.Ip}:{minion.Port} is unreachable. Rescheduling job {job_id}...")
-                    self.db.update_job_assignment(job_id, None, JobAssignmentStatus.SCHEDULED.value)
-                    
-                    self.__update_minion_as_not_seen(minion_id)
-                    jobs_rescheduled += 1
-            except ValueError as e:
-                print(f"Error checking job status for job {job_id} with minion {minion.Ip}:{minion.Port}: {e}")
-
-        # If any jobs were rescheduled, trigger job assignment
-        if jobs_rescheduled > 0:
-            print(f"Rescheduled {jobs_rescheduled} jobs. Triggering job assignment...")
+    def requeue_expired_jobs(self) -> int:
+        """jobs whose minion stopped renewing their lease are scheduled again, returns how many"""
+        requeued = self.state.requeue_expired_jobs(time.time(), self.keyspace.size)
+        if requeued:
+            print(f"Requeued {requeued} jobs whose lease expired. Triggering job assignment...")
             self.send_jobs_to_available_minions()
+        return requeued
 
-        return jobs_completed
-
-    def periodic_in_progress_jobs_scan(self):
-        self.job_scan_running = True
-        job_scan_interval = int(os.environ.get("JOB_SCAN_INTERVAL", 30))
-
-        while self.job_scan_running:
+    def periodic_lease_check(self):
+        self.lease_check_running = True
+        while self.lease_check_running:
             try:
-                jobs_completed = self.__in_progress_jobs_scan()
-                if jobs_completed > 0:
-                    print(f"Job scan completed: {jobs_completed} jobs finished")
+                self.requeue_expired_jobs()
             except Exception as e:
-                print(f"Error in job scan: {e}")
+                print(f"Error in lease check: {e}")
 
-            time.sleep(job_scan_interval)
+            time.sleep(LEASE_CHECK_INTERVAL)
 
     def periodic_job_assignments(self):
         self.job_assignment_running = True
@@ -202,178 +167,342 @@ class MasterCracker:
     # endregion
 
     def __update_minion_as_not_seen(self, minion_id):
-        minion = self.db.get_minion_by_id(minion_id)
+        minion = self.state.get_minion(minion_id)
         minion_health_check = minion.FailedHealthChecks + 1
         if minion_health_check >= SET_MINION_TO_UNAVAILABLE_AFTER_HEALTH_CHECK and minion.Status != MinionStatus.UNAVAILABLE:
-            self.db.update_minion_status_and_failed_checks_no_lastseen(
+            self.state.update_minion_status_and_failed_checks_no_lastseen(
                 minion_id,
-                MinionStatus.UNAVAILABLE.value,
+                MinionStatus.UNAVAILABLE,
                 minion_health_check
             )
-            self.db.reschedule_inprogress_jobs_for_minion(minion_id)
+            self.state.reschedule_minion_jobs(minion_id, self.keyspace.size)
         else:
-            self.db.update_minion_failed_checks(
+            self.state.update_minion_failed_checks(
                 minion_id,
                 minion_health_check
             )
 
     def check_minion_health(self, ip, port):
-        health_url = f"http://{ip}:{port}/health"
+        return self.fleet.run(self.__check_health(ip, port))
+
+    async def __minion_health(self, minion: Minion):
+        return await self.__check_health(minion.Ip, minion.Port)
+
+    async def __check_health(self, ip, port):
         try:
-            resp = requests.get(health_url, timeout=3)
+            resp = await self.fleet.get(ip, port, "/health")
             if resp.status_code == 200:
                 return resp.json().get("status")
-        except Exception:  # todo: change to timeout exception
+        except (httpx.HTTPError, ValueError):
             pass
         return False
 
-    def add_new_hashes(self, hash_list):
-        count = 0
-        for hash_value in hash_list:
-            if not self.db.check_hash_exists(hash_value):
-                self.db.add_new_hash(hash_value)
-                count += 1
-
-        return count
-
-    # Todo: dont create all at once. track last generated range, and create a function to get the next range.
-    def create_new_job_assignments(self):
-        scheduled_hashes = self.db.get_scheduled_hashes()
-        if not scheduled_hashes:
-            return 0
-
-        job_assignments_created = 0
-
-        for hash_entry in scheduled_hashes:
-            hash_id = hash_entry["HashId"]
-
-            try:
-                batch_values = []
-                for start_range, end_range in _ranges_for_jobs_generator(password_ranges=PHONE_NUM_RANGES,
-                                                                         passwords_per_job=PASSWORDS_PER_JOB):
-                    batch_values.append((int(hash_id), str(start_range), str(end_range)))
-
-                if batch_values:
-                    inserted = self.db.batch_create_job_assignments(batch_values)
-                    if inserted:
-                        job_assignments_created += inserted
+    def lookup_precomputed(self, hash_value: str, hash_type: HashTypes = HashTypes.MD5):
+        """returns the password of hash_value if the digest index or rainbow table of its algorithm has it"""
+        for precomputed in (self.digest_indexes.get(hash_type), self.rainbow_tables.get(hash_type)):
+            password = precomputed.lookup(hash_value) if precomputed else None
+            if password:
+                return password
+        return None
+
+    def add_new_hashes(self, hash_list, hash_type: HashTypes = HashTypes.MD5) -> List[Tuple[int, str]]:
+        """returns the (HashId, HashValue) of the hashes that were added"""
+        new_hashes = []
+        with self.db.transaction():
+            for hash_value in hash_list:
+                if not self.db.check_hash_exists(hash_value):
+                    hash_id = self.db.add_new_hash(hash_value, hash_type=hash_type.value)
+                    if hash_id:
+                        new_hashes.append((hash_id, hash_value))
+
+        return new_hashes
+
+    def has_precomputed(self, hash_type: HashTypes) -> bool:
+        return hash_type in self.digest_indexes or hash_type in self.rainbow_tables
+
+    def crack_precomputed_hashes(self, new_hashes: List[Tuple[int, str]], hash_type: HashTypes = HashTypes.MD5) -> int:
+        """
+        hashes found in the digest indexes or rainbow tables are cracked without a job, a rainbow table lookup
+        hashes for a while, so it runs after the hashes were added and not while the request waits
+        """
+        cracked = 0
+        for hash_id, hash_value in new_hashes:
+            password = self.lookup_precomputed(hash_value, hash_type)
+            if password and self.add_found_password_to_hash(hash_id, password):
+                cracked += 1
+        return cracked
+
+    def start_scheduled_hashes(self):
+        """
+        puts the scheduled hashes in progress without creating any job, every hash joins the sweep of its algorithm
+        where it currently is and is searched for by the jobs cut from there on (see cut_next_job)
+        """
+        return self.db.start_scheduled_hashes()
 
-                self.db.update_hash_status(hash_id, HashStatus.IN_PROGRESS.value)
+    def cut_next_job(self, minion: Minion) -> Optional[JobAssignment]:
+        """
+        Cuts the next job of a sweep that has hashes waiting, sized for the minion. The job ends at the end
+        of its range of PHONE_NUM_RANGES, and before the sweep gets back to where its oldest target joined,
+        so the job searches for the same hashes all the way. Returns None if there's nothing left to schedule.
+        The job is taken for the caller, who sends it or releases it (see SchedulerState).
+        """
+        while True:
+            with self.db.transaction():
+                pending_sweeps = self.db.get_pending_sweeps(self.keyspace.size)
+                if not pending_sweeps:
+                    return None
+                hash_type, position, min_join_position = pending_sweeps[0]
+                start_index = position % self.keyspace.size
+                end_index = min(start_index + self.job_size_for_minion(minion, hash_type) - 1,
+                                self.keyspace.range_end_index(start_index),
+                                start_index + min_join_position + self.keyspace.size - position - 1)
+                start_range, end_range = self.keyspace.number_at(start_index), self.keyspace.number_at(end_index)
+                next_position = position + end_index - start_index + 1
+                job_id = self.db.claim_sweep_range(hash_type, position, next_position, start_range, end_range,
+                                                   self.keyspace.size)
+            if job_id:
+                job = JobAssignment(Id=job_id, HashId=None, StartRange=start_range, EndRange=end_range,
+                                    HashType=hash_type, SweepPosition=position)
+                self.state.add_taken_job(job)
+                return job
+            # another dispatcher moved the sweep first, read it again
+
+    def job_targets(self, job: JobAssignment) -> List[str]:
+        """the uncracked hashes the job searches for"""
+        if job.HashId is not None:
+            hash_entry = self.db.get_hash_by_id(job.HashId)
+            return [hash_entry.HashValue] if hash_entry and hash_entry.Status != HashStatus.CRACKED else []
+        return self.db.get_sweep_targets(job.HashType, job.SweepPosition, self.keyspace.size)
+
+    def job_size_for_minion(self, minion: Minion, hash_type: str = None) -> int:
+        """
+        candidates of hash_type the minion scans in about JOB_TARGET_SECONDS, PASSWORDS_PER_JOB if it wasn't benchmarked
+        (minions benchmarked before the rates of every algorithm were kept fall back to their best rate)
+        """
+        candidates_per_second = minion.HashRates.get(hash_type or HashTypes.MD5.value) or minion.CandidatesPerSecond
+        if not candidates_per_second:
+            return PASSWORDS_PER_JOB
+        job_size = int(candidates_per_second * JOB_TARGET_SECONDS)
+        return max(MIN_PASSWORDS_PER_JOB, min(MAX_PASSWORDS_PER_JOB, job_size))
 
-            except (ValueError, TypeError) as e:
-                print(f"Error in batch job creation for hash ID {hash_id}: {e}")
+    def split_job_for_minion(self, minion: Minion, job: JobAssignment) -> Optional[JobAssignment]:
+        """
+        Cuts the taken range down to the head that fits the minion's job size and returns it,
+        the rest of the range is scheduled as a new job. Returns None if the job is no longer scheduled.
+        """
+        job = self.state.get_job(job.Id)
+        if not job or job.Status != JobAssignmentStatus.SCHEDULED:
+            return None
+
+        job_size = self.job_size_for_minion(minion, job.HashType)
+        if job.EndRange - job.StartRange + 1 < job_size + MIN_PASSWORDS_PER_JOB:
+            return job  # the rest would be too small to be a job of its own
+
+        head_end_range = job.StartRange + job_size - 1
+        if not self.state.split_job(job, head_end_range, self.keyspace.size):
+            self.state.release_job(job.Id)
+            return None
+        return JobAssignment(Id=job.Id, HashId=job.HashId, StartRange=job.StartRange, EndRange=head_end_range,
+                             HashType=job.HashType, SweepPosition=job.SweepPosition)
+
+    def prepare_job_for_minion(self, minion: Minion, job: JobAssignment) -> Optional[Tuple[JobAssignment, CrackRequest]]:
+        """
+        Cuts the job down to the minion's size and builds its crack request,
+        returns None if the job was taken or has no uncracked hashes left.
+        """
+        job = self.split_job_for_minion(minion, job)
+        if not job:
+            return None
+
+        hashes = self.job_targets(job)
+        if not hashes:
+            # every hash the job was cut for got cracked before it was sent
+            self.state.delete_job(job.Id, self.keyspace.size)
+            return None
+
+        return job, CrackRequest(
+            hashes=hashes,
+            start_range=job.StartRange,
+            end_range=job.EndRange,
+            hash_type=job.HashType or HashTypes.MD5
+        )
+
+    async def post_job_to_minion(self, minion: Minion, crack_request: CrackRequest) -> Optional[dict]:
+        """returns the reply of the minion to the crack request, None if it didn't take the job"""
+        try:
+            response = await self.fleet.post(minion.Ip, minion.Port, "/crack",
+                                             json=crack_request.model_dump(mode="json"), timeout=5)
+            if response.status_code == 200:
+                return response.json()
+        except (httpx.HTTPError, ValueError):
+            pass
+        return None
 
-        return job_assignments_created
+    def __job_sent_to_minion(self, minion: Minion, job: JobAssignment, reply: dict):
+        # a minion with room left in its job queue stays available for the next job
+        self.state.job_sent(job.Id, minion.Id, time.time() + JOB_LEASE_SECONDS, self.keyspace.size,
+                            minion_busy=not reply.get("accepting"))
 
     def send_job_to_minion(self, minion: Minion, job: JobAssignment) -> bool:
         """
         returns true if successfully sent to minion, false if minion unavailable
         """
-        minion_health = self.check_minion_health(minion.Ip, minion.Port)
-
-        if minion_health:
-            hash_value = self.db.get_hash_by_id(job.HashId)
-            if not hash_value:
-                return False
+        if not self.check_minion_health(minion.Ip, minion.Port):
+            return False
 
-            crack_request_obj = CrackRequest(
-                hashes=[hash_value.HashValue],
-                start_range=PhoneNumberValidator(phone_number=job.StartRange),
-                end_range=PhoneNumberValidator(phone_number=job.EndRange)
-            )
+        prepared_job = self.prepare_job_for_minion(minion, job)
+        if not prepared_job:
+            return False
+        job, crack_request = prepared_job
 
-            try:
-                response = requests.post(
-                    f"http://{minion.Ip}:{minion.Port}/crack",
-                    json=crack_request_obj.model_dump(),
-                    timeout=5
-                )
-                if response.status_code == 200:
-                    self.db.update_job_assignment(job.Id, minion.Id, JobAssignmentStatus.INPROGRESS.value)
-                    self.db.update_minion_status(minion.Id, MinionStatus.BUSY.value)
-                    return True
-            except requests.exceptions.RequestException:
-                pass
-        return False
+        reply = self.fleet.run(self.post_job_to_minion(minion, crack_request))
+        if reply is None:
+            self.state.release_job(job.Id)
+            return False
+        self.__job_sent_to_minion(minion, job, reply)
+        return True
 
     def send_jobs_to_available_minions(self):
-        available_minions = self.db.get_all_available_minions()
+        # every round gives at most one job to each minion, minions that still accept jobs
+        # stay available and get another one in the next round (filling their prefetch queue).
+        # a minion that refused its job is skipped in the next rounds, so the job goes to another minion
+        jobs_assigned = 0
+        refused_minion_ids = set()
+        while True:
+            jobs_assigned_in_round = self.__send_jobs_round(refused_minion_ids)
+            if not jobs_assigned_in_round:
+                return jobs_assigned
+            jobs_assigned += jobs_assigned_in_round
+
+    def __send_jobs_round(self, refused_minion_ids: set):
+        available_minions = [minion for minion in self.state.get_available_minions()
+                             if minion.Status == MinionStatus.AVAILABLE and minion.Id not in refused_minion_ids]
         if not available_minions:
             return 0
 
-        scheduled_jobs = self.db.get_scheduled_job_assignments(limit=len(available_minions))
-        if not scheduled_jobs:
-            return 0
-
-        jobs_assigned = 0
-
-        for job in scheduled_jobs:
-            job_assigned = False
-            for minion in available_minions:
-                if minion.Status != MinionStatus.AVAILABLE:  # Skip minions that became unavailable
-                    continue
-
-                if self.send_job_to_minion(minion, job):
-                    jobs_assigned += 1
-                    job_assigned = True
-                    available_minions.remove(
-                        minion)  # Remove minion from available pool #todo: verify if its the correct thing (index shift)
-                    break
-
-            if not job_assigned:
-                # If no minion could take this job, stop trying further jobs
+        # minions are health checked and sent their jobs all at once, jobs are cut for them one by one
+        health = self.fleet.map(self.__minion_health, available_minions)
+        healthy_minions = [minion for minion, status in zip(available_minions, health) if status]
+
+        # jobs left scheduled (rescheduled from lost minions or not sent) go first, then new ones are cut from the hashes.
+        # both are taken off the queue for this round, so concurrent rounds never send the same job
+        scheduled_jobs = self.state.take_scheduled_jobs(limit=len(healthy_minions))
+
+        dispatches = []
+        for minion in healthy_minions:
+            prepared_job = None
+            while prepared_job is None:
+                job = scheduled_jobs.pop(0) if scheduled_jobs else self.cut_next_job(minion)
+                if job is None:
+                    break  # nothing left to schedule
+                prepared_job = self.prepare_job_for_minion(minion, job)
+            if prepared_job is None:
                 break
+            dispatches.append((minion, *prepared_job))
+        for job in scheduled_jobs:
+            self.state.release_job(job.Id)
 
-            if not available_minions:
-                # If no more available minions, stop processing jobs
-                break
+        replies = self.fleet.map(lambda dispatch: self.post_job_to_minion(dispatch[0], dispatch[2]), dispatches)
+
+        # a job that wasn't taken goes back on the queue and goes first in the next round
+        jobs_assigned = 0
+        for (minion, job, _), reply in zip(dispatches, replies):
+            if reply is not None:
+                self.__job_sent_to_minion(minion, job, reply)
+                jobs_assigned += 1
+            else:
+                self.state.release_job(job.Id)
+                refused_minion_ids.add(minion.Id)
 
         return jobs_assigned
 
-    def calculate_hash(self, password: str) -> str:  # todo: move to common area
-        return hashlib.md5(password.encode('utf-8')).hexdigest()
+    def calculate_hash(self, password: str, hash_type: HashTypes = HashTypes.MD5) -> str:
+        return calculate_hash(password, hash_type)
 
-    def __verify_password_of_hash(self, needed_hash: str, found_password: str) -> bool:
-        password_hash = self.calculate_hash(password=found_password)
-        return password_hash == needed_hash
+    def __verify_password_of_hash(self, hash_entry: Hash, found_password: str) -> bool:
+        # the hash was dispatched with its own algorithm, a password matching under any other one is not its password
+        hash_type = hash_entry.HashType or HashTypes.MD5
+        return self.calculate_hash(found_password, hash_type) == hash_entry.HashValue.lower()
 
     def add_found_password_to_hash(self, hash_id: int, password: str) -> bool:
         hash_entry = self.db.get_hash_by_id(hash_id)
         if not hash_entry:
             return False
 
-        if not self.__verify_password_of_hash(hash_entry.HashValue, password):
+        if not self.__verify_password_of_hash(hash_entry, password):
             return False
 
+        minions_working_on_hash = self.state.minions_working_on_hash(hash_entry, self.keyspace.size)
         self.db.update_hash_with_password(hash_id, password)
-        self.db.delete_jobs_by_hash_id(hash_id)
+        self.state.delete_hash_jobs(hash_id)
+        if minions_working_on_hash:
+            # reporting a result never waits on the other minions
+            threading.Thread(target=self.cancel_hash_on_minions, args=(hash_entry.HashValue, minions_working_on_hash),
+                             daemon=True).start()
         return True
 
+    def cancel_hash_on_minions(self, hash_value: str, minions: List[Minion]):
+        """
+        Tells minions that are still searching for a cracked hash to drop it,
+        a minion whose job had no other hash left stops right away and is available again.
+        """
+        cancel_request = CancelRequest(hashes=[hash_value])
+
+        async def cancel_on_minion(minion: Minion) -> bool:
+            try:
+                response = await self.fleet.post(minion.Ip, minion.Port, "/cancel", json=cancel_request.model_dump())
+                return response.status_code == 200 and bool(response.json().get("job_stopped"))
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Failed to cancel hash {hash_value} on minion {minion.Ip}:{minion.Port}: {e}")
+                return False
+
+        for minion, job_stopped in zip(minions, self.fleet.map(cancel_on_minion, minions)):
+            if job_stopped:
+                self.state.update_minion_status(minion.Id, MinionStatus.AVAILABLE)
+
+    def find_job_assignment(self, hash_entry, start_range: int, end_range: int) -> Optional[JobAssignment]:
+        """the job of the hash's sweep over the range, or the job of the hash itself for jobs of older versions"""
+        return self.state.find_job(hash_entry, start_range, end_range)
+
     def complete_job_assignment(self, crack_result: CrackResult):
+        # jobs are looked up before any of them is completed, a completed job is deleted
+        # and the same range could then resolve to the job of another lap of the sweep
+        completed_jobs = {}
+        found_passwords = []
         for hash_value, result in crack_result.results.items():
             hash_entry = self.db.get_hash_by_value(hash_value)
             if not hash_entry:
                 continue
 
-            job = self.db.get_job_assignment(
-                hash_id=hash_entry.HashId,
-                start_range=str(crack_result.range_start),
-                end_range=str(crack_result.range_end)
-            )
+            job = self.find_job_assignment(hash_entry, crack_result.range_start, crack_result.range_end)
             if not job:
                 continue
 
-            if isinstance(result, bool):
-                self.db.update_minion_status(job.MinionId, MinionStatus.AVAILABLE.value)
-                self.db.mark_job_assignment_completed(job.Id)
-                self.send_jobs_to_available_minions()
-            elif isinstance(result, str):  # Password was found
-                self.add_found_password_to_hash(hash_entry.HashId, result)
-                self.db.update_minion_status(job.MinionId, MinionStatus.AVAILABLE.value)
-                self.db.mark_job_assignment_completed(job.Id)
+            completed_jobs.setdefault(job.Id, job)
+            if isinstance(result, str):  # Password was found
+                found_passwords.append((hash_entry.HashId, result))
+
+        for hash_id, password in found_passwords:
+            self.add_found_password_to_hash(hash_id, password)
+
+        for job in completed_jobs.values():
+            self.state.complete_job(job, self.keyspace.size)
+
+        if completed_jobs:
+            self.send_jobs_to_available_minions()
+
+    def renew_job_leases(self, heartbeat: Heartbeat, ip: str) -> Optional[int]:
+        """
+        extends the lease of every job the minion still holds, returns how many were renewed,
+        None if the heartbeat isn't of a registered minion
+        """
+        minion_id = self.state.minion_id(heartbeat.ip or ip, heartbeat.port)
+        if not minion_id:
+            return None
+        return self.state.renew_leases(minion_id, heartbeat.ranges, time.time() + JOB_LEASE_SECONDS)
 
     def add_new_minion(self, new_minion: NewMinion):
-        if self.db.minion_exists(new_minion.Ip, new_minion.Port):
+        if self.state.minion_id(new_minion.Ip, new_minion.Port):
             raise HTTPException(status_code=409, detail="Minion with this IP and port already exists")
         if not self.check_minion_health(new_minion.Ip, new_minion.Port):
             raise HTTPException(status_code=400,
@@ -381,12 +510,50 @@ class MasterCracker:
         minion_id = self.db.register_new_minion(new_minion.Ip, new_minion.Port)
         if not minion_id:
             raise HTTPException(status_code=500, detail="Failed to register minion")
+        self.state.add_minion(Minion(minion_id, new_minion.Ip, new_minion.Port))
+        threading.Thread(target=self.benchmark_minion, args=(minion_id, new_minion.Ip, new_minion.Port),
+                         daemon=True).start()
         return minion_id
 
+    def benchmark_minion(self, minion_id, ip, port, refresh=False) -> bool:
+        """runs the minion's /benchmark and stores its best configuration next to the minion"""
+        try:
+            response = self.fleet.run(self.fleet.get(ip, port, "/benchmark", params={"refresh": refresh},
+                                                     timeout=MINION_BENCHMARK_TIMEOUT))
+            response.raise_for_status()
+            benchmark = response.json()
+            best = benchmark.get("best")
+            algorithms = benchmark.get("algorithms") or {}
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Error benchmarking minion {minion_id}: {e}")
+            return False
+        if not best:
+            return False
+        self.state.update_minion_benchmark(minion_id, best["candidates_per_second"], best["workers"],
+                                           best["chunk_size"], self.__hash_rates(best, algorithms))
+        return True
+
+    @staticmethod
+    def __hash_rates(best: dict, algorithms: dict) -> dict:
+        """
+        the best configuration was measured with the minion's own hash type, the single core rates of the
+        algorithms scale it to each of them
+        """
+        reference_rate = algorithms.get(best.get("hash_type"))
+        if not reference_rate:
+            return {}
+        return {hash_type: best["candidates_per_second"] * rate / reference_rate
+                for hash_type, rate in algorithms.items() if rate}
+
     def get_hash_reports(self):
-        hash_reports = self.db.get_hash_reports()
+        hash_reports = self.db.get_hash_reports(self.keyspace.size)
         return hash_reports
 
+    def rebuild_hash_counters(self) -> bool:
+        # the writes still queued by the scheduler state change the rows and the counters together, so they can land
+        # before or after the rebuild
+        return self.db.rebuild_hash_counters(self.keyspace.size)
+
 
 # todo: validate input for every endpoint
 @app.post("/add-minion")  # todo: also accept local host
@@ -399,37 +566,54 @@ def add_minion(new_minion: NewMinion):
 @app.get("/get-minions-status")
 def get_minions_status():
     master = get_master_cracker()
-    minions = master.db.get_all_minions()
+    minions = master.state.get_all_minions()
     return [
         {
             "Id": minion.Id,
             "Ip": minion.Ip,
             "Port": minion.Port,
             "Status": minion.Status,
-            "LastSeen": minion.LastSeen
+            "LastSeen": minion.LastSeen,
+            "CandidatesPerSecond": minion.CandidatesPerSecond,
+            "BestWorkers": minion.BestWorkers,
+            "BestChunkSize": minion.BestChunkSize,
+            "HashRates": minion.HashRates
         }
         for minion in minions
     ]
 
 
 @app.post("/add-new-hashes")
-async def add_new_hashes(hashes: List[str], background_tasks: BackgroundTasks):
+async def add_new_hashes(hashes: List[str], background_tasks: BackgroundTasks, hash_type: HashTypes = HashTypes.MD5):
     master = get_master_cracker()
     if not hashes or not isinstance(hashes, list):
         raise HTTPException(status_code=400, detail="Invalid input: Expected a list of hash strings")
 
-    count = master.add_new_hashes(hashes)
-    jobs_created = master.create_new_job_assignments()
+    new_hashes = master.add_new_hashes(hashes, hash_type)
+    count = len(new_hashes)
+    hashes_scheduled = master.start_scheduled_hashes()
+    if new_hashes and master.has_precomputed(hash_type):
+        # runs before the jobs are sent, so hashes it cracks are not dispatched
+        background_tasks.add_task(master.crack_precomputed_hashes, new_hashes, hash_type)
     background_tasks.add_task(master.send_jobs_to_available_minions)
 
     return {
         "status": "success",
-        "message": f"Added {count} new hashes and created {jobs_created} jobs",
+        "message": f"Added {count} new hashes and scheduled {hashes_scheduled} hashes",
         "hashes_added": count,
-        "jobs_created": jobs_created
+        "hashes_scheduled": hashes_scheduled
     }
 
 
+@app.post("/heartbeat")
+def heartbeat(heartbeat: Heartbeat, request: Request):
+    master = get_master_cracker()
+    renewed = master.renew_job_leases(heartbeat, request.client.host)
+    if renewed is None:
+        raise HTTPException(status_code=404, detail="Unknown minion, register it with /add-minion")
+    return {"status": "success", "leases_renewed": renewed}
+
+
 @app.post("/crack-result")
 def crack_result(crack_result: CrackResult):
     master = get_master_cracker()
@@ -445,6 +629,14 @@ def get_hash_reports():
     return [report.to_dict() for report in hash_reports]
 
 
+@app.post("/rebuild-hash-counters")
+def rebuild_hash_counters():
+    master = get_master_cracker()
+    if not master.rebuild_hash_counters():
+        raise HTTPException(status_code=500, detail="Failed to rebuild the hash counters")
+    return {"status": "success"}
+
+
 def main():
     global master_cracker
     master_cracker = MasterCracker()
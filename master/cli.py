@@ -51,7 +51,8 @@ class MasterCrackerCLI:
         print("2. View Minions Status")
         print("3. Add New Hashes to Crack")
         print("4. Monitor Hash Status (Live)")
-        print("5. Exit")
+        print("5. Repair Hash Counters")
+        print("6. Exit")
         print("="*50)
 
     def handle_add_minion(self):
@@ -201,7 +202,7 @@ class MasterCrackerCLI:
             if response.status_code == 200:
                 result = response.json()
                 print(f"\n✅ Added {result['hashes_added']} new hashes")
-                print(f"✅ Created {result['jobs_created']} crack jobs")
+                print(f"✅ Scheduled {result['hashes_scheduled']} hashes for cracking")
             else:
                 error_msg = response.json().get("detail", "Unknown error")
                 print(f"\n❌ Failed to add hashes: {error_msg}")
@@ -211,6 +212,24 @@ class MasterCrackerCLI:
         
         input("\nPress Enter to continue...")
 
+    def handle_repair_hash_counters(self):
+        """Rebuild the per hash counters of the hash reports from the jobs and coverage"""
+        print("\n--- Repair Hash Counters ---")
+
+        try:
+            response = requests.post(f"{self.api_base_url}/rebuild-hash-counters")
+
+            if response.status_code == 200:
+                print("\n✅ Rebuilt the hash counters")
+            else:
+                error_msg = response.json().get("detail", "Unknown error")
+                print(f"\n❌ Failed to rebuild the hash counters: {error_msg}")
+
+        except requests.RequestException as e:
+            print(f"\n❌ Connection error: {e}")
+
+        input("\nPress Enter to continue...")
+
     def handle_monitor_hashes(self):
         """Monitor hash status in real-time with auto-refresh"""
         import platform
@@ -294,16 +313,16 @@ class MasterCrackerCLI:
                             # Clear screen before redrawing
                             os.system('cls' if os.name == 'nt' else 'clear')
 
-                            print("\n" + "="*85)
-                            print(" "*30 + "HASH STATUS MONITOR")
-                            print("="*85)
+                            print("\n" + "="*105)
+                            print(" "*40 + "HASH STATUS MONITOR")
+                            print("="*105)
 
                             if not hash_reports:
                                 print("No hashes found in the system.")
                             else:
                                 # Print table header
-                                print(f"{'ID':<5} {'Hash Value':<34} {'Status':<10} {'Password':<15} {'Progress':<15}")
-                                print("-" * 85)
+                                print(f"{'ID':<5} {'Hash Value':<34} {'Status':<10} {'Password':<15} {'Progress':<10} {'Jobs':<20}")
+                                print("-" * 105)
 
                                 for report in hash_reports:
                                     hash_id = report.get('hash_id', 'N/A')
@@ -313,18 +332,24 @@ class MasterCrackerCLI:
 
                                     # Calculate progress for uncracked hashes
                                     progress = "N/A"
-                                    if status != 'Cracked' and report.get('total_jobs') is not None:
-                                        total = report.get('total_jobs', 0)
-                                        completed = report.get('completed_jobs', 0)
+                                    if status != 'Cracked' and report.get('total_candidates') is not None:
+                                        total = report.get('total_candidates', 0)
+                                        covered = report.get('covered_candidates', 0)
                                         if total > 0:
-                                            percentage = (completed / total) * 100
-                                            progress = f"{completed}/{total} ({percentage:.1f}%)"
+                                            percentage = (covered / total) * 100
+                                            progress = f"{percentage:.1f}%"
+
+                                    # completed of total jobs, and how many of them minions are running
+                                    jobs = "N/A"
+                                    if status != 'Cracked' and report.get('total_jobs'):
+                                        jobs = (f"{report.get('completed_jobs', 0)}/{report['total_jobs']} "
+                                                f"({report.get('in_flight_jobs', 0)} running)")
 
-                                    print(f"{hash_id:<5} {hash_value:<34} {status:<10} {password:<15} {progress:<15}")
+                                    print(f"{hash_id:<5} {hash_value:<34} {status:<10} {password:<15} {progress:<10} {jobs:<20}")
 
-                            print("\n" + "="*85)
+                            print("\n" + "="*105)
                             print(f"Auto-refreshing every {refresh_interval} seconds. Press 'q' to exit.")
-                            print("="*85)
+                            print("="*105)
                         else:
                             print(f"❌ Failed to retrieve hash status: {response.text}")
 
@@ -357,7 +382,7 @@ class MasterCrackerCLI:
         """Main CLI loop"""
         while self.running:
             self.display_menu()
-            choice = input("Enter your choice (1-5): ")
+            choice = input("Enter your choice (1-6): ")
             
             if choice == '1':
                 self.handle_add_minion()
@@ -368,10 +393,12 @@ class MasterCrackerCLI:
             elif choice == '4':
                 self.handle_monitor_hashes()
             elif choice == '5':
+                self.handle_repair_hash_counters()
+            elif choice == '6':
                 print("\nExiting Master Cracker CLI. Goodbye!")
                 self.running = False
             else:
-                print("\n⚠️  Invalid choice. Please select a number between 1 and 5.")
+                print("\n⚠️  Invalid choice. Please select a number between 1 and 6.")
 
 def main():
     print("Starting Master Password Cracker CLI...")
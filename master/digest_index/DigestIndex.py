@@ -0,0 +1,114 @@
+import mmap
+import os
+import struct
+from typing import Dict, Optional
+
+from common.config.HashesTypes import HashTypes
+from common.crack_objects.PhoneNumber import MIN_PHONE_NUMBER, int_to_phone_number
+from common.hashing import get_hashlib_func
+
+# Index file layout (one file per algorithm, <hash_type>.idx):
+#   header         magic, hash type, first and last indexed phone number, record count
+#   bucket table   BUCKET_COUNT + 1 record indices, bucket b holds the records of digests starting with the 2 bytes b
+#   records        KEY_SIZE bytes of truncated digest + the phone number as an offset from MIN_PHONE_NUMBER,
+#                  sorted by digest
+INDEX_MAGIC = b"PCDIGIX1"
+INDEX_FILE_SUFFIX = ".idx"
+HEADER_FORMAT = "<8s16sQQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+BUCKET_PREFIX_SIZE = 2
+BUCKET_COUNT = 1 << (8 * BUCKET_PREFIX_SIZE)
+BUCKET_TABLE_FORMAT = f"<{BUCKET_COUNT + 1}Q"
+BUCKET_TABLE_SIZE = struct.calcsize(BUCKET_TABLE_FORMAT)
+KEY_SIZE = 8
+OFFSET_SIZE = 4
+RECORD_SIZE = KEY_SIZE + OFFSET_SIZE
+
+
+def index_file_name(hash_type: HashTypes) -> str:
+    return f"{hash_type.value}{INDEX_FILE_SUFFIX}"
+
+
+def pack_record(digest: bytes, phone_number: int) -> bytes:
+    return digest[:KEY_SIZE] + (phone_number - MIN_PHONE_NUMBER).to_bytes(OFFSET_SIZE, "little")
+
+
+def _record_phone_number(record: bytes) -> str:
+    return int_to_phone_number(MIN_PHONE_NUMBER + int.from_bytes(record[KEY_SIZE:], "little"))
+
+
+class DigestIndex:
+    """
+    Read only view of an index file built by master.digest_index.build_index.
+    The file is memory mapped, a lookup reads one bucket table entry and binary searches its bucket.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty digest index file: {path}")
+
+        magic, hash_type, self.start, self.end, self.count = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Not a digest index file: {path}")
+        self.hash_type = HashTypes(hash_type.rstrip(b"\0").decode("ascii"))
+        self._hash_func = get_hashlib_func(self.hash_type)
+        self._digest_size = self._hash_func().digest_size
+        self._buckets = struct.unpack_from(BUCKET_TABLE_FORMAT, self._mmap, HEADER_SIZE)
+        self._records_start = HEADER_SIZE + BUCKET_TABLE_SIZE
+
+    def _key_at(self, index: int) -> bytes:
+        position = self._records_start + index * RECORD_SIZE
+        return self._mmap[position:position + KEY_SIZE]
+
+    def lookup(self, hash_value: str) -> Optional[str]:
+        """returns the phone number that hashes into hash_value, None if it isn't in the indexed range"""
+        try:
+            digest = bytes.fromhex(hash_value)
+        except ValueError:
+            return None
+        if len(digest) != self._digest_size:
+            return None
+
+        key = digest[:KEY_SIZE]
+        bucket = int.from_bytes(digest[:BUCKET_PREFIX_SIZE], "big")
+        low, high = self._buckets[bucket], self._buckets[bucket + 1]
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        # truncated digests may collide, every candidate with the same key is verified with the full hash
+        while low < self._buckets[bucket + 1] and self._key_at(low) == key:
+            position = self._records_start + low * RECORD_SIZE
+            password = _record_phone_number(self._mmap[position:position + RECORD_SIZE])
+            if self._hash_func(password.encode("ascii")).digest() == digest:
+                return password
+            low += 1
+        return None
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def load_digest_indexes(index_dir: str) -> Dict[HashTypes, DigestIndex]:
+    """opens every index file found in index_dir, a missing directory means no indexes"""
+    indexes = {}
+    if not index_dir or not os.path.isdir(index_dir):
+        return indexes
+    for hash_type in HashTypes:
+        path = os.path.join(index_dir, index_file_name(hash_type))
+        if not os.path.exists(path):
+            continue
+        try:
+            indexes[hash_type] = DigestIndex(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading digest index {path}: {e}")
+    return indexes
@@ -0,0 +1,129 @@
+"""
+Builds the precomputed digest index of the phone number keyspace, one file per algorithm.
+
+    python -m master.digest_index.build_index --hash-types md5 --workers 8
+
+The keyspace is hashed in slices over a process pool (every slice is written sorted to a temp file),
+then every partition of the digest space (first digest byte) is merged and sorted in parallel,
+and the partitions are concatenated behind the header and bucket table.
+"""
+import argparse
+import bisect
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import time
+from typing import List, Tuple
+
+from common.config.HashesTypes import HashTypes
+from common.hashing import get_hashlib_func
+from common.phone_ranges import phone_num_range
+from master.digest_index.DigestIndex import (
+    BUCKET_COUNT, BUCKET_TABLE_FORMAT, HEADER_FORMAT, INDEX_MAGIC, RECORD_SIZE, index_file_name, pack_record
+)
+from minion.cracking_engine.phone_candidates import clamp_phone_range, phone_number_to_int
+from minion.cracking_engine.scanners import iter_range_digests
+
+DEFAULT_INDEX_DIR = os.environ.get("DIGEST_INDEX_DIR", os.path.join(os.path.dirname(__file__), "indexes"))
+DEFAULT_SLICE_SIZE = 1000000
+PARTITION_COUNT = 256  # partitions by the first digest byte, each one holds BUCKET_COUNT // PARTITION_COUNT buckets
+
+
+def _hash_slice(args) -> Tuple[str, List[int]]:
+    """writes the sorted records of one slice, returns the file and the record index where every partition starts"""
+    hash_type, start, end, work_dir = args
+    records = [pack_record(digest, number)
+               for number, digest in iter_range_digests(get_hashlib_func(hash_type), start, end)]
+    records.sort()
+
+    path = os.path.join(work_dir, f"slice-{start}.bin")
+    with open(path, "wb") as f:
+        f.write(b"".join(records))
+    partition_starts = [bisect.bisect_left(records, bytes([partition])) for partition in range(PARTITION_COUNT)]
+    return path, partition_starts + [len(records)]
+
+
+def _sort_partition(args) -> Tuple[int, str, List[int]]:
+    """merges one partition out of every slice, returns its file and the record count of each of its buckets"""
+    partition, slices, work_dir = args
+    records = []
+    for path, partition_starts in slices:
+        first, last = partition_starts[partition], partition_starts[partition + 1]
+        with open(path, "rb") as f:
+            f.seek(first * RECORD_SIZE)
+            data = f.read((last - first) * RECORD_SIZE)
+        records.extend(data[i:i + RECORD_SIZE] for i in range(0, len(data), RECORD_SIZE))
+    records.sort()
+
+    bucket_counts = [0] * (BUCKET_COUNT // PARTITION_COUNT)
+    for record in records:
+        bucket_counts[record[1]] += 1
+
+    path = os.path.join(work_dir, f"partition-{partition:03d}.bin")
+    with open(path, "wb") as f:
+        f.write(b"".join(records))
+    return partition, path, bucket_counts
+
+
+def build_index(hash_type: HashTypes, start: int, end: int, output_path: str,
+                workers: int = None, slice_size: int = DEFAULT_SLICE_SIZE) -> int:
+    """builds the index of [start, end] into output_path, returns the number of records"""
+    start, end = clamp_phone_range(start, end)
+    workers = workers or multiprocessing.cpu_count()
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as work_dir, multiprocessing.Pool(workers) as pool:
+        slice_tasks = [(hash_type.value, slice_start, min(slice_start + slice_size - 1, end), work_dir)
+                       for slice_start in range(start, end + 1, slice_size)]
+        slices = pool.map(_hash_slice, slice_tasks, chunksize=1)
+
+        partitions = sorted(pool.imap_unordered(
+            _sort_partition, [(partition, slices, work_dir) for partition in range(PARTITION_COUNT)]
+        ))
+        for path, _ in slices:
+            os.remove(path)
+
+        bucket_starts = [0]
+        for _, _, bucket_counts in partitions:
+            for count in bucket_counts:
+                bucket_starts.append(bucket_starts[-1] + count)
+
+        partial_path = output_path + ".partial"
+        with open(partial_path, "wb") as output:
+            output.write(struct.pack(HEADER_FORMAT, INDEX_MAGIC, hash_type.value.encode("ascii"),
+                                     start, end, bucket_starts[-1]))
+            output.write(struct.pack(BUCKET_TABLE_FORMAT, *bucket_starts))
+            for _, path, _ in partitions:
+                with open(path, "rb") as partition_file:
+                    shutil.copyfileobj(partition_file, output)
+                os.remove(path)
+        os.replace(partial_path, output_path)
+
+    return bucket_starts[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed digest index of the phone number keyspace")
+    parser.add_argument('--hash-types', nargs='+', default=[HashTypes.MD5.value],
+                        choices=[hash_type.value for hash_type in HashTypes])
+    parser.add_argument('--output-dir', type=str, default=DEFAULT_INDEX_DIR)
+    parser.add_argument('--start', type=str, default=phone_num_range[0], help='first phone number to index')
+    parser.add_argument('--end', type=str, default=phone_num_range[1], help='last phone number to index')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--slice-size', type=int, default=DEFAULT_SLICE_SIZE)
+    args = parser.parse_args()
+
+    for hash_type in args.hash_types:
+        hash_type = HashTypes(hash_type)
+        output_path = os.path.join(args.output_dir, index_file_name(hash_type))
+        started = time.perf_counter()
+        count = build_index(hash_type, phone_number_to_int(args.start), phone_number_to_int(args.end), output_path,
+                            workers=args.workers, slice_size=args.slice_size)
+        print(f"Built {output_path}: {count:,} digests in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
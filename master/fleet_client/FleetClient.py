@@ -0,0 +1,65 @@
+import asyncio
+import os
+import threading
+from typing import Awaitable, Callable, Iterable, List, TypeVar
+
+import httpx
+
+# the master talks to its minions from one event loop, with keep-alive connections that are reused
+# between calls and at most FLEET_CONCURRENCY calls in flight at a time
+FLEET_CONCURRENCY = int(os.environ.get("FLEET_CONCURRENCY", 64))
+FLEET_TIMEOUT = float(os.environ.get("FLEET_TIMEOUT", 3))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FleetClient:
+    """
+    Async HTTP client of the master to its minions. It runs its own event loop on a daemon thread,
+    so the scheduling threads of the master hand it coroutines and block on their results.
+    map() calls many minions at once, so a sweep over the fleet takes about as long as its slowest minion.
+    """
+
+    def __init__(self, concurrency: int = FLEET_CONCURRENCY, timeout: float = FLEET_TIMEOUT):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fleet-client", daemon=True)
+        self.thread.start()
+        self.client = self.run(self.__create_client())
+
+    async def __create_client(self) -> httpx.AsyncClient:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        return httpx.AsyncClient(limits=limits, timeout=self.timeout)
+
+    async def get(self, ip: str, port: int, path: str, timeout: float = None, **kwargs) -> httpx.Response:
+        return await self.client.get(f"http://{ip}:{port}{path}", timeout=timeout or self.timeout, **kwargs)
+
+    async def post(self, ip: str, port: int, path: str, timeout: float = None, **kwargs) -> httpx.Response:
+        return await self.client.post(f"http://{ip}:{port}{path}", timeout=timeout or self.timeout, **kwargs)
+
+    def run(self, coroutine: Awaitable[R]) -> R:
+        """runs the coroutine on the fleet's loop and waits for its result"""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("FleetClient.run() would block the fleet's own event loop, await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def map(self, call: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[R]:
+        """
+        Awaits call(item) for every item concurrently and returns the results in the order of items.
+        call should handle the errors of its own minion, an exception it raises fails the whole map.
+        """
+        async def bounded(item):
+            async with self.semaphore:
+                return await call(item)
+
+        async def gather():
+            return await asyncio.gather(*(bounded(item) for item in items))
+
+        return self.run(gather())
+
+    def close(self):
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
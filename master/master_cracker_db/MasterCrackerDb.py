@@ -1,55 +1,60 @@
 import sqlite3
 from .db_queries import *
+from common.sqlite_db import SqliteConnections
+from common.interval_set import IntervalSet
 from common.models.Minion import Minion
 from common.models.JobAssignment import JobAssignment
 from common.models.statuses.JobAssignmentStatus import JobAssignmentStatus
+from .migrations import Migration, run_migrations, set_schema_version
+
+# the version create_tables() creates new db files at and migrate() upgrades older ones to
+SCHEMA_VERSION = 3
 
 
 class MasterCrackerDbInterface:
     def __init__(self, db_path="MasterCracker.db"):
         self.db_path = db_path
+        self.connections = SqliteConnections(db_path)
+
+    def transaction(self):
+        """the queries of the calling thread inside the block run as one transaction (see SqliteConnections)"""
+        return self.connections.transaction()
 
     def __select_query(self, query, args=None):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                if args:
-                    cursor.execute(query, args)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchall()
-            except sqlite3.Error as e:
-                print(f"Error executing SELECT query {query}: {e}")
-                return False
-
-    def __execute_query(self, query, args=None, commit=True):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                if args:
-                    cursor.execute(query, args)
-                else:
-                    cursor.execute(query)
-                if commit:
-                    conn.commit()
-                return cursor.lastrowid
-            except sqlite3.Error as e:
-                print(f"Error executing query {query}: {e}")
-                return False
-
-    def __update_query(self, query):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
                 cursor.execute(query)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error executing SELECT query {query}: {e}")
+            return False
 
-                conn.commit()
-
-                return cursor.rowcount
+    def __execute_query(self, query, args=None):
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
+                cursor.execute(query)
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Error executing query {query}: {e}")
+            return False
 
-            except sqlite3.Error as e:
-                print(f"Error executing update query {query}: {e}")
-                return False
+    def __update_query(self, query, args=None):
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
+                cursor.execute(query)
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error executing update query {query}: {e}")
+            return False
 
     def check_tables_exist(self):
         minions_exists = self.__select_query(check_minions_table_exists)
@@ -58,9 +63,66 @@ class MasterCrackerDbInterface:
         return bool(minions_exists) and bool(hashes_exists) and bool(jobs_exists)
 
     def create_tables(self):
-        self.__execute_query(create_minions_table)
-        self.__execute_query(create_password_hashes_table)
-        self.__execute_query(create_job_assignments_table)
+        """creates the tables of a new db file at the latest schema version"""
+        try:
+            with self.transaction() as cursor:
+                for query in (create_minions_table, create_minion_hash_rates_table, create_password_hashes_table,
+                              create_job_assignments_table, create_sweeps_table, *create_indexes):
+                    cursor.execute(query)
+                set_schema_version(cursor, SCHEMA_VERSION)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error creating tables: {e}")
+            return False
+
+    def migrate(self, keyspace_size, lease_expires_at):
+        """upgrades the db file in place to the latest schema version, returns True if it got there"""
+        migrations = (
+            Migration(1, "bring over db files of versions before schema versions were kept",
+                      lambda cursor: self.__upgrade_unversioned_tables(cursor, keyspace_size, lease_expires_at)),
+            Migration(2, "index the lookups of jobs and hashes",
+                      lambda cursor: self.__execute_all(cursor, create_indexes)),
+            Migration(3, "keep job and coverage counters of every hash",
+                      lambda cursor: self.__add_hash_counters(cursor, keyspace_size)),
+        )
+        return run_migrations(self.connections, migrations) == SCHEMA_VERSION
+
+    @staticmethod
+    def __execute_all(cursor, queries):
+        for query in queries:
+            cursor.execute(query)
+
+    def __upgrade_unversioned_tables(self, cursor, keyspace_size, lease_expires_at):
+        # files of versions before the schema version was kept can be at any of them, their tables tell which
+        columns = [column[1] for column in cursor.execute(get_minions_columns).fetchall()]
+        if "CandidatesPerSecond" not in columns:
+            self.__execute_all(cursor, add_minions_benchmark_columns)
+        cursor.execute(create_minion_hash_rates_table)
+        columns = [column[1] for column in cursor.execute(get_password_hashes_columns).fetchall()]
+        if "HashType" not in columns:
+            self.__execute_all(cursor, add_password_hashes_sweep_columns)
+        if "NextRangeIndex" in columns:
+            cursor.execute(join_cursor_hashes_to_sweep)
+        if "Coverage" not in columns:
+            cursor.execute(add_password_hashes_coverage_column)
+        cursor.execute(create_sweeps_table)
+        columns = {column[1]: column[2] for column in cursor.execute(get_job_assignments_columns).fetchall()}
+        if columns.get("StartRange", "INTEGER").upper() != "INTEGER" or "SweepPosition" not in columns:
+            self.__execute_all(cursor, rebuild_job_assignments_table)
+        elif "LeaseExpiresAt" not in columns:
+            cursor.execute(add_job_assignments_lease_column)
+        cursor.execute(start_job_assignments_leases, (lease_expires_at,))
+        # completed jobs were kept, they are merged into the coverage of their hashes
+        for row in cursor.execute(get_completed_job_assignments).fetchall():
+            job = self.__job_assignment_from_row(row)
+            for hash_id, coverage in self.__merged_coverage(cursor, job, keyspace_size):
+                cursor.execute(update_hash_coverage,
+                               (coverage.to_bytes(), coverage.covered() >= keyspace_size, hash_id))
+            cursor.execute(delete_job_assignment, (job.Id,))
+
+    def __add_hash_counters(self, cursor, keyspace_size):
+        self.__execute_all(cursor, add_password_hashes_counter_columns)
+        self.__rebuild_hash_counters(cursor, keyspace_size)
 
     def minion_exists(self, ip, port):
         result = self.__select_query(check_minion_exists, (ip, port))
@@ -76,13 +138,36 @@ class MasterCrackerDbInterface:
         rows = self.__select_query(get_available_minions, (max_failed_checks,))
         if not rows:
             return []
-        return [Minion(row[0], row[1], row[2], row[3]) for row in rows]
+        return self.__with_hash_rates(
+            [Minion(row[0], row[1], row[2], row[3], CandidatesPerSecond=row[4]) for row in rows])
 
     def get_all_minions(self):
         rows = self.__select_query(get_all_minions)
         if not rows:
             return []
-        return [Minion(*row) for row in rows]
+        return self.__with_hash_rates([Minion(*row) for row in rows])
+
+    def __with_hash_rates(self, minions):
+        hash_rates = {}
+        for minion_id, hash_type, candidates_per_second in self.__select_query(get_minion_hash_rates) or []:
+            hash_rates.setdefault(minion_id, {})[hash_type] = candidates_per_second
+        for minion in minions:
+            minion.HashRates = hash_rates.get(minion.Id, {})
+        return minions
+
+    def update_minion_benchmark(self, minion_id, candidates_per_second, best_workers, best_chunk_size,
+                                hash_rates=None):
+        """hash_rates are the candidates per second of every algorithm over the best configuration"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(update_minion_benchmark,
+                               (candidates_per_second, best_workers, best_chunk_size, minion_id))
+                cursor.executemany(upsert_minion_hash_rate,
+                                   [(minion_id, hash_type, rate) for hash_type, rate in (hash_rates or {}).items()])
+            return True
+        except sqlite3.Error as e:
+            print(f"Error updating benchmark of minion {minion_id}: {e}")
+            return False
 
     def get_minion_by_id(self, minion_id):
         row = self.__select_query(get_minion_by_id, (minion_id,))
@@ -102,8 +187,8 @@ class MasterCrackerDbInterface:
     def update_minion_failed_checks(self, minion_id, failed_health_checks):
         return self.__execute_query(update_minion_failed_checks, (failed_health_checks, minion_id))
 
-    def add_new_hash(self, hash_value, password=""):
-        return self.__execute_query(insert_hash, (hash_value, password))
+    def add_new_hash(self, hash_value, password="", hash_type="md5"):
+        return self.__execute_query(insert_hash, (hash_value, password, hash_type))
     
     def check_hash_exists(self, hash_value, password=""):
         result = self.__select_query(check_hash_exists, (hash_value, password))
@@ -115,6 +200,45 @@ class MasterCrackerDbInterface:
             return []
         return [{"HashId": row[0], "HashValue": row[1], "Password": row[2]} for row in rows]
     
+    def start_scheduled_hashes(self):
+        """moves every scheduled hash to InProgress, joining the sweep of its algorithm at its current position"""
+        cursor = self.connections.connection().cursor()
+        try:
+            cursor.execute(start_scheduled_hashes)
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error starting scheduled hashes: {e}")
+            return 0
+
+    def get_pending_sweeps(self, keyspace_size):
+        """returns (hash_type, position, min_join_position) of every sweep that has hashes waiting for candidates"""
+        return self.__select_query(get_pending_sweeps, (keyspace_size,)) or []
+
+    def claim_sweep_range(self, hash_type, position, next_position, start_range, end_range, keyspace_size):
+        """
+        Moves the sweep of hash_type from position to next_position and schedules [start_range, end_range] as its job.
+        Returns the Id of the job, None if the sweep was moved by someone else first.
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(insert_sweep, (hash_type,))
+                cursor.execute(advance_sweep, (next_position, hash_type, position))
+                if not cursor.rowcount:
+                    return None
+                cursor.execute(create_sweep_job_assignment,
+                               (hash_type, position, int(start_range), int(end_range)))
+                job_id = cursor.lastrowid
+                cursor.execute(count_job_targets, (1, 0, None, hash_type, position, keyspace_size))
+                return job_id
+        except sqlite3.Error as e:
+            print(f"Error claiming a range of the {hash_type} sweep: {e}")
+            return None
+
+    def get_sweep_targets(self, hash_type, sweep_position, keyspace_size):
+        """the uncracked hashes that a job cut at sweep_position is searching for"""
+        rows = self.__select_query(get_sweep_targets, (hash_type, sweep_position, keyspace_size, sweep_position))
+        return [row[0] for row in rows] if rows else []
+
     def update_hash_status(self, hash_id, status):
         return self.__execute_query(update_hash_status, (status, hash_id))
     
@@ -123,8 +247,12 @@ class MasterCrackerDbInterface:
     
     def create_job_assignment(self, hash_id, start_range, end_range):
         try:
-            return self.__execute_query(create_job_assignment, (int(hash_id), str(start_range), str(end_range)))
-        except (ValueError, TypeError) as e:
+            with self.transaction() as cursor:
+                cursor.execute(create_job_assignment, (int(hash_id), int(start_range), int(end_range)))
+                job_id = cursor.lastrowid
+                cursor.execute(count_job_targets, (1, 0, int(hash_id), None, None, None))
+                return job_id
+        except (ValueError, TypeError, sqlite3.Error) as e:
             print(f"Error creating job assignment: {e}")
             return False
     
@@ -132,40 +260,206 @@ class MasterCrackerDbInterface:
         rows = self.__select_query(get_scheduled_job_assignments, (limit,))
         if not rows:
             return []
-        return [JobAssignment(
-            Id=row[0],
-            HashId=row[1],
-            StartRange=row[2],
-            EndRange=row[3],
-            Status=JobAssignmentStatus.SCHEDULED
-        ) for row in rows]
+        return [self.__job_assignment_from_row(row) for row in rows]
     
-    def update_job_assignment(self, job_id, minion_id, status="InProgress"):
-        return self.__execute_query(update_job_assignment, (minion_id, status, job_id))
+    def update_job_assignment(self, job_id, minion_id, keyspace_size, status="InProgress", lease_expires_at=None):
+        try:
+            with self.transaction() as cursor:
+                row = cursor.execute(get_job_assignment_by_id, (job_id,)).fetchone()
+                if not row:
+                    return False
+                job = self.__job_assignment_from_row(row)
+                cursor.execute(update_job_assignment, (minion_id, status, lease_expires_at, job_id))
+                in_flight = int(status == JobAssignmentStatus.INPROGRESS.value) - \
+                    int(job.Status == JobAssignmentStatus.INPROGRESS)
+                if in_flight:
+                    self.__count_job(cursor, job, keyspace_size, in_flight_jobs=in_flight)
+                return True
+        except sqlite3.Error as e:
+            print(f"Error updating job assignment {job_id}: {e}")
+            return False
+
+    def renew_job_leases(self, minion_id, ranges, lease_expires_at):
+        """extends the leases of the minion's in progress jobs over ranges, returns how many were renewed"""
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(renew_job_assignment_lease,
+                                   [(lease_expires_at, minion_id, int(start_range), int(end_range))
+                                    for start_range, end_range in ranges])
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error renewing job leases of minion {minion_id}: {e}")
+            return 0
+
+    def requeue_expired_job_assignments(self, now, keyspace_size):
+        """schedules the in progress jobs whose lease expired before now again, returns how many"""
+        return self.__reschedule_selected(get_expired_job_assignments, (now,), keyspace_size)
+
+    def reschedule_inprogress_jobs_for_minion(self, minion_id, keyspace_size):
+        return self.__reschedule_selected(get_inprogress_job_assignments_for_minion, (minion_id,), keyspace_size)
+
+    def __reschedule_selected(self, select_query, args, keyspace_size):
+        try:
+            with self.transaction() as cursor:
+                rows = cursor.execute(select_query, args).fetchall()
+                return self.__reschedule(cursor, [self.__job_assignment_from_row(row) for row in rows],
+                                         keyspace_size)
+        except sqlite3.Error as e:
+            print(f"Error rescheduling job assignments: {e}")
+            return 0
+
+    def reschedule_job_assignments(self, job_ids, keyspace_size):
+        """schedules the in progress jobs again, returns how many were rescheduled"""
+        try:
+            with self.transaction() as cursor:
+                rows = [cursor.execute(get_job_assignment_by_id, (job_id,)).fetchone() for job_id in job_ids]
+                return self.__reschedule(cursor, [self.__job_assignment_from_row(row) for row in rows if row],
+                                         keyspace_size)
+        except sqlite3.Error as e:
+            print(f"Error rescheduling job assignments {job_ids}: {e}")
+            return 0
+
+    def __reschedule(self, cursor, jobs, keyspace_size):
+        rescheduled = 0
+        for job in jobs:
+            cursor.execute(reschedule_job_assignment, (job.Id,))
+            if cursor.rowcount:
+                self.__count_job(cursor, job, keyspace_size, in_flight_jobs=-1)
+                rescheduled += 1
+        return rescheduled
+
+    def get_live_job_assignments(self):
+        """the scheduled and in progress jobs, with their leases"""
+        rows = self.__select_query(get_live_job_assignments)
+        if not rows:
+            return []
+        jobs = []
+        for row in rows:
+            job = self.__job_assignment_from_row(row)
+            job.LeaseExpiresAt = row[8]
+            jobs.append(job)
+        return jobs
     
-    def complete_job_assignment(self, job_id):
-        return self.__execute_query(complete_job_assignment, (job_id,))
+    def complete_job_assignment(self, job, keyspace_size):
+        """
+        Merges the range of the job into the coverage of every hash it searched and deletes the job.
+        Returns how many hashes were covered, False on errors.
+        """
+        try:
+            with self.transaction() as cursor:
+                row = cursor.execute(get_job_assignment_by_id, (job.Id,)).fetchone()
+                if not row:
+                    return 0
+                in_flight = int(self.__job_assignment_from_row(row).Status == JobAssignmentStatus.INPROGRESS)
+                targets = self.__merged_coverage(cursor, job, keyspace_size)
+                for hash_id, coverage in targets:
+                    covered = coverage.covered()
+                    cursor.execute(complete_hash_job, (coverage.to_bytes(), covered, covered >= keyspace_size,
+                                                       in_flight, hash_id))
+                cursor.execute(delete_job_assignment, (job.Id,))
+                return len(targets)
+        except sqlite3.Error as e:
+            print(f"Error completing job assignment {job.Id}: {e}")
+            return False
+
+    @staticmethod
+    def __merged_coverage(cursor, job, keyspace_size):
+        """(hash id, coverage with the job's range merged into it) of every hash the job searched"""
+        cursor.execute(get_job_targets_coverage, (job.HashId, job.HashType, job.SweepPosition, keyspace_size))
+        targets = []
+        for hash_id, coverage in cursor.fetchall():
+            coverage = IntervalSet.from_bytes(coverage)
+            coverage.add(int(job.StartRange), int(job.EndRange))
+            targets.append((hash_id, coverage))
+        return targets
+
+    @staticmethod
+    def __count_job(cursor, job, keyspace_size, total_jobs=0, in_flight_jobs=0):
+        """adds to the job counters of the hashes the job searches"""
+        cursor.execute(count_job_targets, (total_jobs, in_flight_jobs, job.HashId, job.HashType, job.SweepPosition,
+                                           keyspace_size))
+
+    def rebuild_hash_counters(self, keyspace_size):
+        """
+        Rebuilds the counters of every hash from its coverage and the live jobs, in case they drifted.
+        Completed jobs are only kept as their count, so CompletedJobs is left as is. Returns False on errors.
+        """
+        try:
+            with self.transaction() as cursor:
+                self.__rebuild_hash_counters(cursor, keyspace_size)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error rebuilding hash counters: {e}")
+            return False
+
+    def __rebuild_hash_counters(self, cursor, keyspace_size):
+        cursor.execute(reset_hash_counters)
+        cursor.executemany(update_hash_covered_candidates,
+                           [(IntervalSet.from_bytes(coverage).covered(), hash_id)
+                            for hash_id, coverage in cursor.execute(get_hashes_coverage).fetchall()])
+        for row in cursor.execute(get_live_job_assignments).fetchall():
+            job = self.__job_assignment_from_row(row)
+            self.__count_job(cursor, job, keyspace_size, total_jobs=1,
+                             in_flight_jobs=int(job.Status == JobAssignmentStatus.INPROGRESS))
     
     def get_job_assignment(self, hash_id, start_range, end_range):
         try:
             hash_id = int(hash_id)
-            rows = self.__select_query(get_job_assignment, (hash_id, str(start_range), str(end_range)))
+            rows = self.__select_query(get_job_assignment, (hash_id, int(start_range), int(end_range)))
             if not rows:
                 return None
-            row = rows[0]
-            return JobAssignment(
-                Id=row[0],
-                HashId=row[1],
-                MinionId=row[2],
-                StartRange=row[3],
-                EndRange=row[4],
-                Status=JobAssignmentStatus(row[5]) if row[5] else JobAssignmentStatus.SCHEDULED
-            )
+            return self.__job_assignment_from_row(rows[0])
         except (ValueError, TypeError) as e:
             print(f"Error in get_job_assignment: {e}")
             return None
     
+    def get_sweep_job_assignment(self, hash_type, start_range, end_range):
+        rows = self.__select_query(get_sweep_job_assignment, (hash_type, int(start_range), int(end_range)))
+        if not rows:
+            return None
+        return self.__job_assignment_from_row(rows[0])
+
+    def get_job_assignment_by_id(self, job_id):
+        rows = self.__select_query(get_job_assignment_by_id, (job_id,))
+        if not rows:
+            return None
+        return self.__job_assignment_from_row(rows[0])
+
+    @staticmethod
+    def __job_assignment_from_row(row):
+        return JobAssignment(
+            Id=row[0],
+            HashId=row[1],
+            MinionId=row[2],
+            StartRange=row[3],
+            EndRange=row[4],
+            Status=JobAssignmentStatus(row[5]) if row[5] else JobAssignmentStatus.SCHEDULED,
+            HashType=row[6],
+            SweepPosition=row[7]
+        )
+
+    def split_job_assignment(self, job_id, start_range, head_end_range, rest_start_range, keyspace_size):
+        """
+        Splits a scheduled job into its head ending at head_end_range, which keeps job_id,
+        and a new scheduled job for the rest of the range. Returns the Id of the new job,
+        None if the job is no longer scheduled from start_range (split or sent by someone else).
+        """
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(insert_job_assignment_rest, (int(rest_start_range), job_id, int(start_range)))
+                if not cursor.rowcount:
+                    return None
+                rest_id = cursor.lastrowid
+                cursor.execute(update_job_assignment_end_range, (int(head_end_range), job_id))
+                rest = self.__job_assignment_from_row(cursor.execute(get_job_assignment_by_id, (rest_id,)).fetchone())
+                self.__count_job(cursor, rest, keyspace_size, total_jobs=1)
+                return rest_id
+        except sqlite3.Error as e:
+            print(f"Error splitting job assignment {job_id}: {e}")
+            return None
+
     def delete_jobs_by_hash_id(self, hash_id):
+        # only called once the hash is cracked, its counters no longer change
         return self.__execute_query(delete_jobs_by_hash_id, (hash_id,))
 
     def update_minion_status(self, minion_id, status):
@@ -184,24 +478,24 @@ class MasterCrackerDbInterface:
             Status=row[3],
             CreationTime=row[4],
             CrackTime=row[5],
+            HashType=row[6],
+            JoinPosition=row[7],
         )
 
     def batch_create_job_assignments(self, batch_values):
         if not batch_values:
             return 0
             
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("BEGIN TRANSACTION")
+        try:
+            with self.transaction() as cursor:
                 cursor.executemany(create_job_assignment, batch_values)
-                rowcount = cursor.rowcount
-                conn.commit()
-                return rowcount
-            except sqlite3.Error as e:
-                conn.rollback()
-                print(f"Error in batch job creation: {e}")
-                return False
+                created = cursor.rowcount
+                cursor.executemany(count_job_targets, [(1, 0, int(values[0]), None, None, None)
+                                                       for values in batch_values])
+                return created
+        except sqlite3.Error as e:
+            print(f"Error in batch job creation: {e}")
+            return False
 
     def get_hash_by_value(self, hash_value):
         rows = self.__select_query(get_hash_by_value, (hash_value,))
@@ -216,52 +510,65 @@ class MasterCrackerDbInterface:
             Status=row[3],
             CreationTime=row[4],
             CrackTime=row[5],
+            HashType=row[6],
+            JoinPosition=row[7],
         )
 
-    def mark_job_assignment_completed(self, job_id):
-        return self.__execute_query(mark_job_assignment_completed, (job_id,))
+    def delete_job_assignment(self, job_id, keyspace_size):
+        try:
+            with self.transaction() as cursor:
+                row = cursor.execute(get_job_assignment_by_id, (job_id,)).fetchone()
+                if not row:
+                    return 0
+                job = self.__job_assignment_from_row(row)
+                cursor.execute(delete_job_assignment, (job_id,))
+                self.__count_job(cursor, job, keyspace_size, total_jobs=-1,
+                                 in_flight_jobs=-int(job.Status == JobAssignmentStatus.INPROGRESS))
+                return 1
+        except sqlite3.Error as e:
+            print(f"Error deleting job assignment {job_id}: {e}")
+            return False
 
-    def reschedule_inprogress_jobs_for_minion(self, minion_id):
-        return self.__execute_query(reschedule_inprogress_jobs_for_minion, (minion_id,))
+    def get_minions_working_on_hash(self, hash_id, keyspace_size):
+        rows = self.__select_query(get_inprogress_minions_for_hash, (hash_id, keyspace_size))
+        if not rows:
+            return []
+        return [Minion(row[0], row[1], row[2], row[3]) for row in rows]
 
-    def get_all_in_progress_jobs(self):
-        return self.__select_query(get_inprogress_job_assignments_with_hashes)
 
-    def get_hash_reports(self):
+    def get_hash_reports(self, keyspace_size):
         hash_rows = self.__select_query(get_all_hashes_with_status)
         if not hash_rows:
             return []
-            
-        job_stats_rows = self.__select_query(get_all_job_stats)
-        
-        job_stats = {}
-        if job_stats_rows:
-            for row in job_stats_rows:
-                hash_id, total_jobs, completed_jobs = row
-                job_stats[hash_id] = (total_jobs, completed_jobs)
-        
+
         hash_reports = []
         from common.models.HashReport import HashReport
-        
+
         for row in hash_rows:
-            hash_id, hash_value, password, status, creation_time, crack_time = row
-            
-            total_jobs, completed_jobs = None, None
-            
-            if status != 'Cracked' and hash_id in job_stats:
-                total_jobs, completed_jobs = job_stats[hash_id]
-            
+            (hash_id, hash_value, password, status, creation_time, crack_time,
+             covered_candidates, total_jobs, completed_jobs, in_flight_jobs) = row
+
+            total_candidates = None
+
+            if status != 'Cracked':
+                total_candidates = keyspace_size
+            else:
+                covered_candidates = None
+
             hash_report = HashReport(
                 hash_id=hash_id, 
                 hash_value=hash_value,
                 password=password if password else None,
                 status=status,
+                covered_candidates=covered_candidates,
+                total_candidates=total_candidates,
                 total_jobs=total_jobs,
                 completed_jobs=completed_jobs,
+                in_flight_jobs=in_flight_jobs,
                 creation_time=creation_time,
                 crack_time=crack_time
             )
-            
+
             hash_reports.append(hash_report)
-            
-        return hash_reports
\ No newline at end of file
+
+        return hash_reports
@@ -7,10 +7,37 @@ CREATE TABLE IF NOT EXISTS minions (
     Status TEXT DEFAULT 'Available',
     LastSeen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FailedHealthChecks INTEGER DEFAULT 0,
+    CandidatesPerSecond REAL,
+    BestWorkers INTEGER,
+    BestChunkSize INTEGER,
+    BenchmarkTime TIMESTAMP,
     UNIQUE(Ip, Port)
 )
 """
 
+# candidates per second of every algorithm over the minion's best configuration, a sha512 job
+# of a minion takes about as long as an md5 job several times its size
+create_minion_hash_rates_table = """
+CREATE TABLE IF NOT EXISTS minion_hash_rates (
+    MinionId INTEGER NOT NULL,
+    HashType TEXT NOT NULL,
+    CandidatesPerSecond REAL NOT NULL,
+    PRIMARY KEY (MinionId, HashType)
+)
+"""
+
+# Table upgrade queries (for db files created by older versions)
+get_minions_columns = """
+PRAGMA table_info(minions)
+"""
+
+add_minions_benchmark_columns = (
+    "ALTER TABLE minions ADD COLUMN CandidatesPerSecond REAL",
+    "ALTER TABLE minions ADD COLUMN BestWorkers INTEGER",
+    "ALTER TABLE minions ADD COLUMN BestChunkSize INTEGER",
+    "ALTER TABLE minions ADD COLUMN BenchmarkTime TIMESTAMP",
+)
+
 check_minions_table_exists = """
 SELECT name FROM sqlite_master WHERE type='table' AND name='minions'
 """
@@ -24,7 +51,7 @@ INSERT INTO minions (Ip, Port, Status) VALUES (?, ?, 'Available')
 """
 
 get_all_minions = """
-SELECT Id, Ip, Port, Status, FailedHealthChecks FROM minions
+SELECT Id, Ip, Port, Status, LastSeen, FailedHealthChecks, CandidatesPerSecond, BestWorkers, BestChunkSize FROM minions
 """
 
 get_minion_by_id = """
@@ -48,7 +75,7 @@ UPDATE minions SET FailedHealthChecks = ? WHERE Id = ?
 """
 
 get_available_minions = """
-SELECT Id, Ip, Port, Status FROM minions 
+SELECT Id, Ip, Port, Status, CandidatesPerSecond FROM minions 
 WHERE Status = 'Available' AND FailedHealthChecks < ?
 """
 
@@ -56,6 +83,20 @@ update_minion_status = """
 UPDATE minions SET Status = ? WHERE Id = ?
 """
 
+update_minion_benchmark = """
+UPDATE minions SET CandidatesPerSecond = ?, BestWorkers = ?, BestChunkSize = ?, BenchmarkTime = CURRENT_TIMESTAMP
+WHERE Id = ?
+"""
+
+upsert_minion_hash_rate = """
+INSERT INTO minion_hash_rates (MinionId, HashType, CandidatesPerSecond) VALUES (?, ?, ?)
+ON CONFLICT (MinionId, HashType) DO UPDATE SET CandidatesPerSecond = excluded.CandidatesPerSecond
+"""
+
+get_minion_hash_rates = """
+SELECT MinionId, HashType, CandidatesPerSecond FROM minion_hash_rates
+"""
+
 # Hash-related queries
 create_password_hashes_table = """
 CREATE TABLE IF NOT EXISTS password_hashes (
@@ -65,17 +106,85 @@ CREATE TABLE IF NOT EXISTS password_hashes (
     Status TEXT DEFAULT 'Scheduled',
     CreationTime TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CrackTime TIMESTAMP,
+    HashType TEXT DEFAULT 'md5',
+    JoinPosition INTEGER,
+    Coverage BLOB,
+    CoveredCandidates INTEGER NOT NULL DEFAULT 0,
+    TotalJobs INTEGER NOT NULL DEFAULT 0,
+    CompletedJobs INTEGER NOT NULL DEFAULT 0,
+    InFlightJobs INTEGER NOT NULL DEFAULT 0,
     UNIQUE(HashValue, Password)
 )
 """
 
+get_password_hashes_columns = """
+PRAGMA table_info(password_hashes)
+"""
+
+add_password_hashes_sweep_columns = (
+    "ALTER TABLE password_hashes ADD COLUMN HashType TEXT DEFAULT 'md5'",
+    "ALTER TABLE password_hashes ADD COLUMN JoinPosition INTEGER",
+)
+
+# Coverage holds the ranges searched for the hash as an encoded IntervalSet, it replaces the completed job rows
+add_password_hashes_coverage_column = """
+ALTER TABLE password_hashes ADD COLUMN Coverage BLOB
+"""
+
+# the counters of a hash are kept with the job changes, so its report reads them instead of its jobs and coverage.
+# TotalJobs counts the jobs cut for the hash that weren't dropped, CompletedJobs the ones merged into its coverage
+# (their rows are deleted) and InFlightJobs the ones in progress on a minion.
+# They stop changing once the hash is no longer InProgress
+add_password_hashes_counter_columns = (
+    "ALTER TABLE password_hashes ADD COLUMN CoveredCandidates INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE password_hashes ADD COLUMN TotalJobs INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE password_hashes ADD COLUMN CompletedJobs INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE password_hashes ADD COLUMN InFlightJobs INTEGER NOT NULL DEFAULT 0",
+)
+
+# hashes that were left with a per hash cursor by older versions join the sweep of their algorithm from its start
+join_cursor_hashes_to_sweep = """
+UPDATE password_hashes SET JoinPosition = 0
+WHERE NextRangeIndex IS NOT NULL AND Status = 'InProgress' AND JoinPosition IS NULL
+"""
+
+# Sweep-related queries
+# every algorithm has one sweep that goes around the keyspace, Position counts the candidates cut into jobs
+# since the sweep started (keyspace index = Position % keyspace size). A hash joins the sweep at the position
+# it has when the hash is started and is a target of every job cut from [JoinPosition, JoinPosition + keyspace size)
+create_sweeps_table = """
+CREATE TABLE IF NOT EXISTS sweeps (
+    HashType TEXT PRIMARY KEY,
+    Position INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+insert_sweep = """
+INSERT OR IGNORE INTO sweeps (HashType, Position) VALUES (?, 0)
+"""
+
+advance_sweep = """
+UPDATE sweeps SET Position = ? WHERE HashType = ? AND Position = ?
+"""
+
+# (hash type, sweep position, join position of the hash that needs the fewest candidates) of every sweep
+# that has hashes waiting for candidates, oldest hashes first
+get_pending_sweeps = """
+SELECT password_hashes.HashType, COALESCE(sweeps.Position, 0), MIN(password_hashes.JoinPosition)
+FROM password_hashes
+LEFT JOIN sweeps ON sweeps.HashType = password_hashes.HashType
+WHERE password_hashes.Status = 'InProgress' AND password_hashes.JoinPosition + ? > COALESCE(sweeps.Position, 0)
+GROUP BY password_hashes.HashType
+ORDER BY MIN(password_hashes.HashId) ASC
+"""
+
 check_password_hashes_table_exists = """
 SELECT name FROM sqlite_master WHERE type='table' AND name='password_hashes'
 """
 
 insert_hash = """
-INSERT OR IGNORE INTO password_hashes (HashValue, Password, Status) 
-VALUES (?, ?, 'Scheduled')
+INSERT OR IGNORE INTO password_hashes (HashValue, Password, Status, HashType)
+VALUES (?, ?, 'Scheduled', ?)
 """
 
 check_hash_exists = """
@@ -88,24 +197,77 @@ WHERE Status = 'Scheduled'
 ORDER BY CreationTime ASC
 """
 
+start_scheduled_hashes = """
+UPDATE password_hashes SET Status = 'InProgress',
+    JoinPosition = COALESCE((SELECT Position FROM sweeps WHERE sweeps.HashType = password_hashes.HashType), 0)
+WHERE Status = 'Scheduled'
+"""
+
+get_sweep_targets = """
+SELECT HashValue FROM password_hashes
+WHERE HashType = ? AND Status = 'InProgress' AND JoinPosition <= ? AND JoinPosition + ? > ?
+ORDER BY HashId ASC
+"""
+
+# the uncracked hashes a job searches: its own hash for jobs of older versions, the targets of its sweep otherwise
+get_job_targets_coverage = """
+SELECT HashId, Coverage FROM password_hashes
+WHERE Status = 'InProgress' AND (HashId = ?1 OR (HashType = ?2 AND JoinPosition <= ?3 AND JoinPosition + ?4 > ?3))
+"""
+
+# a hash whose whole keyspace was searched without finding its password is UnCracked
+update_hash_coverage = """
+UPDATE password_hashes SET Coverage = ?1,
+    Status = CASE WHEN ?2 AND Status = 'InProgress' THEN 'UnCracked' ELSE Status END
+WHERE HashId = ?3
+"""
+
+# the same, for a completed job whose row is still there: ?4 is 1 if it was in progress
+complete_hash_job = """
+UPDATE password_hashes SET Coverage = ?1, CoveredCandidates = ?2, CompletedJobs = CompletedJobs + 1,
+    InFlightJobs = CASE WHEN ?3 THEN 0 ELSE InFlightJobs - ?4 END,
+    Status = CASE WHEN ?3 AND Status = 'InProgress' THEN 'UnCracked' ELSE Status END
+WHERE HashId = ?5
+"""
+
+# adds to the job counters of the hashes a job searches, the same hashes as get_job_targets_coverage
+count_job_targets = """
+UPDATE password_hashes SET TotalJobs = TotalJobs + ?1, InFlightJobs = InFlightJobs + ?2
+WHERE Status = 'InProgress' AND (HashId = ?3 OR (HashType = ?4 AND JoinPosition <= ?5 AND JoinPosition + ?6 > ?5))
+"""
+
+# the counters that can be rebuilt start over from the completed jobs, which are only kept as a count
+reset_hash_counters = """
+UPDATE password_hashes SET CoveredCandidates = 0, TotalJobs = CompletedJobs, InFlightJobs = 0
+"""
+
+get_hashes_coverage = """
+SELECT HashId, Coverage FROM password_hashes WHERE Coverage IS NOT NULL
+"""
+
+update_hash_covered_candidates = """
+UPDATE password_hashes SET CoveredCandidates = ? WHERE HashId = ?
+"""
+
 update_hash_status = """
-UPDATE password_hashes SET Status = ?, CrackTime = CURRENT_TIMESTAMP 
-WHERE HashId = ?
+UPDATE password_hashes SET Status = ?1, CrackTime = CURRENT_TIMESTAMP,
+    InFlightJobs = CASE WHEN ?1 = 'InProgress' THEN InFlightJobs ELSE 0 END
+WHERE HashId = ?2
 """
 
 update_hash_with_password = """
-UPDATE password_hashes SET Password = ?, Status = 'Cracked', CrackTime = CURRENT_TIMESTAMP 
+UPDATE password_hashes SET Password = ?, Status = 'Cracked', CrackTime = CURRENT_TIMESTAMP, InFlightJobs = 0
 WHERE HashId = ?
 """
 
 get_hash_by_id = """
-SELECT HashId, HashValue, Password, Status, CreationTime, CrackTime
+SELECT HashId, HashValue, Password, Status, CreationTime, CrackTime, HashType, JoinPosition
 FROM password_hashes
 WHERE HashId = ?
 """
 
 get_hash_by_value = """
-SELECT HashId, HashValue, Password, Status, CreationTime, CrackTime
+SELECT HashId, HashValue, Password, Status, CreationTime, CrackTime, HashType, JoinPosition
 FROM password_hashes
 WHERE HashValue = ?
 """
@@ -114,13 +276,16 @@ WHERE HashValue = ?
 create_job_assignments_table = """
 CREATE TABLE IF NOT EXISTS job_assignments (
     Id INTEGER PRIMARY KEY AUTOINCREMENT,
-    HashId INTEGER NOT NULL,
+    HashId INTEGER DEFAULT NULL,
+    HashType TEXT DEFAULT NULL,
+    SweepPosition INTEGER DEFAULT NULL,
     MinionId INTEGER DEFAULT NULL,
-    StartRange TEXT NOT NULL,
-    EndRange TEXT NOT NULL,
+    StartRange INTEGER NOT NULL,
+    EndRange INTEGER NOT NULL,
     Status TEXT DEFAULT 'Scheduled',
     AssignmentTime TIMESTAMP,
     CompletionTime TIMESTAMP,
+    LeaseExpiresAt REAL DEFAULT NULL,
     FOREIGN KEY (HashId) REFERENCES password_hashes(HashId),
     FOREIGN KEY (MinionId) REFERENCES minions(Id)
 )
@@ -130,62 +295,178 @@ check_job_assignments_table_exists = """
 SELECT name FROM sqlite_master WHERE type='table' AND name='job_assignments'
 """
 
+get_job_assignments_columns = """
+PRAGMA table_info(job_assignments)
+"""
+
+# jobs of a sweep have a HashType and SweepPosition instead of a HashId, jobs of older versions belong to one hash.
+# ranges used to be stored as dashed TEXT ("052-7500000") and HashId was NOT NULL, the table is rebuilt
+rebuild_job_assignments_table = (
+    "ALTER TABLE job_assignments RENAME TO job_assignments_old",
+    create_job_assignments_table,
+    """
+    INSERT INTO job_assignments (Id, HashId, MinionId, StartRange, EndRange, Status, AssignmentTime, CompletionTime)
+    SELECT Id, HashId, MinionId, CAST(REPLACE(StartRange, '-', '') AS INTEGER),
+           CAST(REPLACE(EndRange, '-', '') AS INTEGER), Status, AssignmentTime, CompletionTime
+    FROM job_assignments_old
+    """,
+    "DROP TABLE job_assignments_old",
+)
+
+add_job_assignments_lease_column = """
+ALTER TABLE job_assignments ADD COLUMN LeaseExpiresAt REAL DEFAULT NULL
+"""
+
+# jobs that were in progress before leases existed get a first lease, their minions renew it from there on
+start_job_assignments_leases = """
+UPDATE job_assignments SET LeaseExpiresAt = ? WHERE Status = 'InProgress' AND LeaseExpiresAt IS NULL
+"""
+
 create_job_assignment = """
 INSERT INTO job_assignments (HashId, StartRange, EndRange, Status) 
 VALUES (?, ?, ?, 'Scheduled')
 """
 
+create_sweep_job_assignment = """
+INSERT INTO job_assignments (HashType, SweepPosition, StartRange, EndRange, Status)
+VALUES (?, ?, ?, ?, 'Scheduled')
+"""
+
 get_scheduled_job_assignments = """
-SELECT Id, HashId, StartRange, EndRange 
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
 FROM job_assignments 
 WHERE Status = 'Scheduled' 
 ORDER BY Id ASC
 LIMIT ?
 """
 
-get_inprogress_job_assignments_with_hashes = """
-SELECT 
-    job_assignments.Id, 
-    job_assignments.HashId, 
-    job_assignments.MinionId, 
-    job_assignments.StartRange, 
-    job_assignments.EndRange,
-    password_hashes.HashValue
+get_job_assignment_by_id = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
+FROM job_assignments 
+WHERE Id = ?
+"""
+
+# the head of a scheduled range keeps its Id as the job that is sent, the rest of the range is scheduled as a new job
+insert_job_assignment_rest = """
+INSERT INTO job_assignments (HashId, HashType, SweepPosition, StartRange, EndRange, Status)
+SELECT HashId, HashType, SweepPosition + (?1 - StartRange), ?1, EndRange, 'Scheduled' FROM job_assignments
+WHERE Id = ?2 AND Status = 'Scheduled' AND StartRange = ?3
+"""
+
+update_job_assignment_end_range = """
+UPDATE job_assignments SET EndRange = ? WHERE Id = ?
+"""
+
+# minions with a job of the hash itself, or a job of its sweep cut while the hash was a target
+get_inprogress_minions_for_hash = """
+SELECT DISTINCT minions.Id, minions.Ip, minions.Port, minions.Status
 FROM job_assignments
-JOIN password_hashes ON job_assignments.HashId = password_hashes.HashId
-WHERE job_assignments.Status = 'InProgress'
+JOIN minions ON job_assignments.MinionId = minions.Id
+JOIN password_hashes ON password_hashes.HashId = ?1
+WHERE job_assignments.Status = 'InProgress' AND (
+    job_assignments.HashId = password_hashes.HashId
+    OR (job_assignments.HashType = password_hashes.HashType
+        AND job_assignments.SweepPosition >= password_hashes.JoinPosition
+        AND job_assignments.SweepPosition < password_hashes.JoinPosition + ?2)
+)
 """
 
 update_job_assignment = """
-UPDATE job_assignments SET MinionId = ?, Status = ?, AssignmentTime = CURRENT_TIMESTAMP 
+UPDATE job_assignments SET MinionId = ?, Status = ?, AssignmentTime = CURRENT_TIMESTAMP, LeaseExpiresAt = ?
 WHERE Id = ?
 """
 
-complete_job_assignment = """
-UPDATE job_assignments SET Status = 'Completed', CompletionTime = CURRENT_TIMESTAMP 
-WHERE Id = ?
+# leases are unix timestamps, a heartbeat renews the jobs the minion still holds
+renew_job_assignment_lease = """
+UPDATE job_assignments SET LeaseExpiresAt = ?
+WHERE MinionId = ? AND StartRange = ? AND EndRange = ? AND Status = 'InProgress'
+"""
+
+reschedule_job_assignment = """
+UPDATE job_assignments SET Status = 'Scheduled', MinionId = NULL, AssignmentTime = NULL, LeaseExpiresAt = NULL
+WHERE Id = ? AND Status = 'InProgress'
+"""
+
+get_expired_job_assignments = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
+FROM job_assignments
+WHERE Status = 'InProgress' AND LeaseExpiresAt < ?
+"""
+
+# the jobs the master's scheduler state is rebuilt from on startup
+get_live_job_assignments = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition, LeaseExpiresAt
+FROM job_assignments
+WHERE Status IN ('Scheduled', 'InProgress')
+ORDER BY Id ASC
 """
 
 get_job_assignment = """
-SELECT Id, HashId, MinionId, StartRange, EndRange, Status 
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
 FROM job_assignments 
 WHERE HashId = ? AND StartRange = ? AND EndRange = ?
 """
 
+# a range comes back around on every lap of the sweep, the job that is in progress is the one that's meant
+get_sweep_job_assignment = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
+FROM job_assignments
+WHERE HashType = ? AND StartRange = ? AND EndRange = ?
+ORDER BY Status = 'InProgress' DESC, Id DESC
+LIMIT 1
+"""
+
 delete_jobs_by_hash_id = """
 DELETE FROM job_assignments WHERE HashId = ?
 """
 
-mark_job_assignment_completed = """
-UPDATE job_assignments SET Status = 'Completed', CompletionTime = CURRENT_TIMESTAMP 
-WHERE Id = ?
+# a completed job is merged into the coverage of its hashes and its row is deleted
+delete_job_assignment = """
+DELETE FROM job_assignments WHERE Id = ?
+"""
+
+# older versions kept completed jobs, they are merged into the coverage of their hashes once
+get_completed_job_assignments = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
+FROM job_assignments
+WHERE Status = 'Completed'
+ORDER BY Id ASC
 """
 
-reschedule_inprogress_jobs_for_minion = """
-UPDATE job_assignments SET Status = 'Scheduled', MinionId = NULL, AssignmentTime = NULL 
+get_inprogress_job_assignments_for_minion = """
+SELECT Id, HashId, MinionId, StartRange, EndRange, Status, HashType, SweepPosition
+FROM job_assignments
 WHERE MinionId = ? AND Status = 'InProgress'
 """
 
+# Indexes
+# every lookup of a result callback, a dispatch round and a lease check searches one of these instead of scanning
+# the table (tests/test_master_query_plans.py), hashes are looked up by HashValue through their UNIQUE index.
+# partial indexes only hold the rows of the status their queries filter by
+create_indexes = (
+    """
+    CREATE INDEX IF NOT EXISTS job_assignments_scheduled ON job_assignments (Id) WHERE Status = 'Scheduled'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS job_assignments_hash_range ON job_assignments (HashId, StartRange, EndRange)
+    WHERE HashId IS NOT NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS job_assignments_sweep_range ON job_assignments (HashType, StartRange, EndRange)
+    WHERE HashType IS NOT NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS job_assignments_minion_range ON job_assignments (MinionId, StartRange, EndRange)
+    WHERE Status = 'InProgress'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS job_assignments_lease ON job_assignments (LeaseExpiresAt) WHERE Status = 'InProgress'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS password_hashes_status ON password_hashes (Status, HashType, JoinPosition)
+    """,
+)
+
 # Hash report queries
 get_all_hashes_with_status = """
 SELECT 
@@ -194,27 +475,11 @@ SELECT
     Password, 
     Status, 
     CreationTime, 
-    CrackTime 
+    CrackTime,
+    CoveredCandidates,
+    TotalJobs,
+    CompletedJobs,
+    InFlightJobs
 FROM password_hashes
 ORDER BY CreationTime DESC
 """
-
-get_job_stats_for_hash = """
-SELECT 
-    HashId,
-    COUNT(*) AS total_jobs,
-    SUM(CASE WHEN Status = 'Completed' THEN 1 ELSE 0 END) AS completed_jobs
-FROM job_assignments
-WHERE HashId = ?
-GROUP BY HashId
-"""
-
-get_all_job_stats = """
-SELECT 
-    HashId,
-    COUNT(*) AS total_jobs,
-    SUM(CASE WHEN Status = 'Completed' THEN 1 ELSE 0 END) AS completed_jobs
-FROM job_assignments
-GROUP BY HashId
-"""
-
@@ -0,0 +1,42 @@
+import sqlite3
+from typing import Callable, NamedTuple, Sequence
+
+from common.sqlite_db import SqliteConnections
+
+
+class Migration(NamedTuple):
+    """apply brings a db file at version - 1 to version, it runs in the transaction that sets the version"""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Cursor], None]
+
+
+def schema_version(connections: SqliteConnections) -> int:
+    """the schema version of the db is its PRAGMA user_version, 0 for files of versions before it was kept"""
+    return connections.connection().execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(cursor: sqlite3.Cursor, version: int):
+    cursor.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def run_migrations(connections: SqliteConnections, migrations: Sequence[Migration]) -> int:
+    """
+    Applies the migrations newer than the schema version of the db in order, every one in its own transaction,
+    a migration that fails leaves the db at the version before it and the ones after it aren't applied.
+    Returns the schema version the db is at.
+    """
+    version = schema_version(connections)
+    for migration in sorted(migrations, key=lambda migration: migration.version):
+        if migration.version <= version:
+            continue
+        try:
+            with connections.transaction() as cursor:
+                migration.apply(cursor)
+                set_schema_version(cursor, migration.version)
+        except sqlite3.Error as e:
+            print(f"Error migrating the db to version {migration.version} ({migration.description}): {e}")
+            break
+        print(f"Migrated the db to version {migration.version}: {migration.description}")
+        version = migration.version
+    return version
@@ -0,0 +1,131 @@
+import mmap
+import os
+import struct
+from typing import Dict, Optional
+
+from common.config.HashesTypes import HashTypes
+from common.crack_objects.PhoneNumber import int_to_phone_number
+from common.hashing import get_hashlib_func
+from common.keyspace import Keyspace
+
+# Table file layout (one file per algorithm, <hash_type>.rt):
+#   header    magic, hash type, chain length, chain count, size of the keyspace the table was built for
+#   chains    (end index, start index) of every chain as big endian uint32, sorted by end index
+#             (chains that merged into the same end are stored once)
+TABLE_MAGIC = b"PCRAINB1"
+TABLE_FILE_SUFFIX = ".rt"
+HEADER_FORMAT = "<8s16sQQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+CHAIN_FORMAT = ">II"
+CHAIN_SIZE = struct.calcsize(CHAIN_FORMAT)
+INDEX_SIZE = 4
+
+
+def table_file_name(hash_type: HashTypes) -> str:
+    return f"{hash_type.value}{TABLE_FILE_SUFFIX}"
+
+
+def reduce_digest(digest: bytes, step: int, keyspace_size: int) -> int:
+    """maps a digest back into the keyspace, every step of a chain uses its own reduction function"""
+    return (int.from_bytes(digest[:8], "little") + step) % keyspace_size
+
+
+def candidate_at(keyspace: Keyspace, index: int) -> bytes:
+    return int_to_phone_number(keyspace.number_at(index)).encode("ascii")
+
+
+def walk_chain(hash_func, keyspace: Keyspace, index: int, first_step: int, last_step: int) -> int:
+    """hashes and reduces index through the steps [first_step, last_step), returns the index it ends on"""
+    for step in range(first_step, last_step):
+        index = reduce_digest(hash_func(candidate_at(keyspace, index)).digest(), step, keyspace.size)
+    return index
+
+
+class RainbowTable:
+    """
+    Read only view of a table built by master.rainbow_table.build_table, the chains are memory mapped.
+    A lookup costs about chain_length ** 2 / 2 hashes.
+    """
+    def __init__(self, path: str, keyspace: Keyspace = None):
+        self.path = path
+        self.keyspace = keyspace or Keyspace()
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty rainbow table file: {path}")
+
+        magic, hash_type, self.chain_length, self.chain_count, keyspace_size = \
+            struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != TABLE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a rainbow table file: {path}")
+        if keyspace_size != self.keyspace.size:
+            self.close()
+            raise ValueError(f"Rainbow table {path} was built for another keyspace")
+        self.hash_type = HashTypes(hash_type.rstrip(b"\0").decode("ascii"))
+        self._hash_func = get_hashlib_func(self.hash_type)
+        self._digest_size = self._hash_func().digest_size
+
+    def _chain_at(self, position: int):
+        return struct.unpack_from(CHAIN_FORMAT, self._mmap, HEADER_SIZE + position * CHAIN_SIZE)
+
+    def _find_start(self, end_index: int) -> Optional[int]:
+        low, high = 0, self.chain_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._chain_at(middle)[0] < end_index:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.chain_count:
+            chain_end, chain_start = self._chain_at(low)
+            if chain_end == end_index:
+                return chain_start
+        return None
+
+    def lookup(self, hash_value: str) -> Optional[str]:
+        """returns the phone number that hashes into hash_value, None if no chain of the table covers it"""
+        try:
+            digest = bytes.fromhex(hash_value)
+        except ValueError:
+            return None
+        if len(digest) != self._digest_size:
+            return None
+
+        keyspace_size = self.keyspace.size
+        # the password can be at any step of a chain, the last steps are the cheapest to try
+        for step in range(self.chain_length - 1, -1, -1):
+            end_index = walk_chain(self._hash_func, self.keyspace, reduce_digest(digest, step, keyspace_size),
+                                   step + 1, self.chain_length)
+            chain_start = self._find_start(end_index)
+            if chain_start is None:
+                continue
+            index = walk_chain(self._hash_func, self.keyspace, chain_start, 0, step)
+            candidate = candidate_at(self.keyspace, index)
+            if self._hash_func(candidate).digest() == digest:
+                return candidate.decode("ascii")
+            # a false alarm, another chain merged into this end
+        return None
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def load_rainbow_tables(table_dir: str) -> Dict[HashTypes, RainbowTable]:
+    """opens every table file found in table_dir, a missing directory means no tables"""
+    tables = {}
+    if not table_dir or not os.path.isdir(table_dir):
+        return tables
+    keyspace = Keyspace()
+    for hash_type in HashTypes:
+        path = os.path.join(table_dir, table_file_name(hash_type))
+        if not os.path.exists(path):
+            continue
+        try:
+            tables[hash_type] = RainbowTable(path, keyspace=keyspace)
+        except (OSError, ValueError) as e:
+            print(f"Error loading rainbow table {path}: {e}")
+    return tables
@@ -0,0 +1,98 @@
+"""
+Builds a rainbow table of the efficient_phone_num_range keyspace, one file per algorithm.
+
+    python -m master.rainbow_table.build_table --hash-types md5 --chains 2000000 --chain-length 1000 --workers 8
+
+The table takes 8 bytes per chain. chains * chain_length should be a few times the keyspace size (100M)
+for most numbers to be covered, longer chains make the table smaller and lookups slower.
+"""
+import argparse
+import heapq
+import multiprocessing
+import os
+import struct
+import time
+
+from common.config.HashesTypes import HashTypes
+from common.hashing import get_hashlib_func
+from common.keyspace import Keyspace
+from master.rainbow_table.RainbowTable import (
+    CHAIN_FORMAT, CHAIN_SIZE, HEADER_FORMAT, INDEX_SIZE, TABLE_MAGIC, table_file_name, walk_chain
+)
+
+DEFAULT_TABLE_DIR = os.environ.get("RAINBOW_TABLE_DIR", os.path.join(os.path.dirname(__file__), "tables"))
+DEFAULT_CHAINS = 2000000
+DEFAULT_CHAIN_LENGTH = 1000
+CHAINS_PER_TASK = 10000
+
+
+def _build_chains(args) -> bytes:
+    """returns the chains of the start indices [first_chain, last_chain) sorted by their end index"""
+    hash_type, first_chain, last_chain, chain_count, chain_length = args
+    hash_func = get_hashlib_func(hash_type)
+    keyspace = Keyspace()
+    chains = []
+    for chain in range(first_chain, last_chain):
+        start_index = chain * keyspace.size // chain_count  # start points are spread evenly over the keyspace
+        chains.append(struct.pack(CHAIN_FORMAT, walk_chain(hash_func, keyspace, start_index, 0, chain_length), start_index))
+    chains.sort()
+    return b"".join(chains)
+
+
+def _iter_chains(data: bytes):
+    for position in range(0, len(data), CHAIN_SIZE):
+        yield data[position:position + CHAIN_SIZE]
+
+
+def build_table(hash_type: HashTypes, output_path: str, chain_count: int = DEFAULT_CHAINS,
+                chain_length: int = DEFAULT_CHAIN_LENGTH, workers: int = None) -> int:
+    """builds the table into output_path, returns the number of chains stored"""
+    keyspace = Keyspace()
+    workers = workers or multiprocessing.cpu_count()
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    tasks = [(hash_type.value, first_chain, min(first_chain + CHAINS_PER_TASK, chain_count), chain_count, chain_length)
+             for first_chain in range(0, chain_count, CHAINS_PER_TASK)]
+    with multiprocessing.Pool(workers) as pool:
+        sorted_parts = pool.map(_build_chains, tasks, chunksize=1)
+
+    partial_path = output_path + ".partial"
+    stored = 0
+    with open(partial_path, "wb") as output:
+        output.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, hash_type.value.encode("ascii"), chain_length, 0, 0))
+        last_end = None
+        for chain in heapq.merge(*(_iter_chains(part) for part in sorted_parts)):
+            chain_end = chain[:INDEX_SIZE]
+            if chain_end == last_end:
+                continue  # merged chains cover the same numbers from here on, one of them is enough
+            output.write(chain)
+            last_end = chain_end
+            stored += 1
+        output.seek(0)
+        output.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, hash_type.value.encode("ascii"), chain_length,
+                                 stored, keyspace.size))
+    os.replace(partial_path, output_path)
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a rainbow table of the phone number keyspace")
+    parser.add_argument('--hash-types', nargs='+', default=[HashTypes.MD5.value],
+                        choices=[hash_type.value for hash_type in HashTypes])
+    parser.add_argument('--output-dir', type=str, default=DEFAULT_TABLE_DIR)
+    parser.add_argument('--chains', type=int, default=DEFAULT_CHAINS)
+    parser.add_argument('--chain-length', type=int, default=DEFAULT_CHAIN_LENGTH)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    for hash_type in args.hash_types:
+        hash_type = HashTypes(hash_type)
+        output_path = os.path.join(args.output_dir, table_file_name(hash_type))
+        started = time.perf_counter()
+        stored = build_table(hash_type, output_path, chain_count=args.chains, chain_length=args.chain_length,
+                             workers=args.workers)
+        print(f"Built {output_path}: {stored:,} chains of {args.chain_length} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
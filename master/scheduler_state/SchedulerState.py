@@ -0,0 +1,360 @@
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import replace
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from common.models.Hash import Hash
+from common.models.JobAssignment import JobAssignment
+from common.models.Minion import Minion
+from common.models.statuses.JobAssignmentStatus import JobAssignmentStatus
+from common.models.statuses.MinionStatus import MinionStatus
+from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface
+
+# the changes to the scheduler state are written to the db every WRITE_BEHIND_INTERVAL seconds,
+# all the changes queued since the last write in one transaction
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", 0.2))
+
+
+def _range_key(job: JobAssignment) -> tuple:
+    # the jobs of a sweep are found by their algorithm and range, jobs of older versions by their hash and range
+    return (job.HashType if job.HashId is None else job.HashId), job.StartRange, job.EndRange
+
+
+def _now() -> str:
+    # same format as CURRENT_TIMESTAMP, which the db sets when the change is written
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+class SchedulerState:
+    """
+    The minions, scheduled jobs and jobs in flight of the master, kept in memory so scheduling decisions don't
+    wait on the db. Scheduled jobs are a heap of their Ids (the oldest job is sent first), and a dispatcher takes
+    jobs off it until they are sent or released. Every change is queued and written to the db behind the state
+    by a writer thread, one transaction per batch. The state is rebuilt from the db on startup.
+    The lock only guards memory, no db call is made while it's held.
+    """
+
+    def __init__(self, db: MasterCrackerDbInterface):
+        self.db = db
+        self.lock = threading.RLock()
+        self.minions: Dict[int, Minion] = {}
+        self.minion_ids: Dict[Tuple[str, int], int] = {}
+        self.jobs: Dict[int, JobAssignment] = {}  # scheduled and in progress jobs by Id
+        self.scheduled: List[int] = []  # heap of job Ids, entries of jobs that left the queue are skipped
+        self.taken: Set[int] = set()  # scheduled jobs a dispatcher took off the heap
+        self.minion_jobs: Dict[int, Set[int]] = defaultdict(set)  # Ids of the in progress jobs of every minion
+        self.range_jobs: Dict[tuple, Set[int]] = defaultdict(set)
+        self.writes: List[Callable[[], object]] = []
+        self.flush_lock = threading.Lock()
+        self.writer_thread = None
+        self.writer_running = False
+
+    def load(self):
+        """rebuilds the state from the db, changes that weren't written yet are written first"""
+        self.flush()
+        minions = self.db.get_all_minions()
+        jobs = self.db.get_live_job_assignments()
+        with self.lock:
+            self.minions = {minion.Id: minion for minion in minions}
+            self.minion_ids = {(minion.Ip, minion.Port): minion.Id for minion in minions}
+            self.jobs, self.scheduled, self.taken = {}, [], set()
+            self.minion_jobs, self.range_jobs = defaultdict(set), defaultdict(set)
+            for job in jobs:
+                self.__add_job(job)
+
+    # region Write Behind
+
+    def start(self):
+        if not self.writer_thread or not self.writer_thread.is_alive():
+            self.writer_running = True
+            self.writer_thread = threading.Thread(target=self.__write_behind, daemon=True)
+            self.writer_thread.start()
+
+    def stop(self):
+        self.writer_running = False
+        self.flush()
+
+    def __write_behind(self):
+        while self.writer_running:
+            time.sleep(WRITE_BEHIND_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing the scheduler state to the db: {e}")
+
+    def __queue_write(self, write: Callable, *args):
+        self.writes.append(partial(write, *args))
+
+    def flush(self) -> int:
+        """writes the queued changes to the db in one transaction, returns how many were written"""
+        with self.flush_lock:
+            with self.lock:
+                writes, self.writes = self.writes, []
+            if not writes:
+                return 0
+            try:
+                with self.db.transaction():
+                    for write in writes:
+                        write()
+            except sqlite3.Error as e:
+                print(f"Error writing {len(writes)} scheduler changes to the db, retrying with the next batch: {e}")
+                with self.lock:
+                    self.writes[:0] = writes
+                return 0
+            return len(writes)
+
+    # endregion
+
+    # region Minions
+
+    def add_minion(self, minion: Minion):
+        with self.lock:
+            self.minions[minion.Id] = minion
+            self.minion_ids[(minion.Ip, minion.Port)] = minion.Id
+
+    def get_minion(self, minion_id: int) -> Optional[Minion]:
+        return self.minions.get(minion_id)
+
+    def minion_id(self, ip: str, port: int) -> Optional[int]:
+        return self.minion_ids.get((ip, port))
+
+    def get_all_minions(self) -> List[Minion]:
+        with self.lock:
+            return list(self.minions.values())
+
+    def get_available_minions(self, max_failed_checks=3) -> List[Minion]:
+        with self.lock:
+            return [minion for minion in self.minions.values()
+                    if minion.Status == MinionStatus.AVAILABLE and minion.FailedHealthChecks < max_failed_checks]
+
+    def update_minion_status(self, minion_id: int, status: MinionStatus):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.Status = status
+            self.__queue_write(self.db.update_minion_status, minion_id, status.value)
+
+    def update_minion_status_and_failed_checks(self, minion_id: int, status: MinionStatus, failed_health_checks: int):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.Status, minion.FailedHealthChecks, minion.LastSeen = status, failed_health_checks, _now()
+            self.__queue_write(self.db.update_minion_status_and_failed_checks, minion_id, status.value,
+                               failed_health_checks)
+
+    def update_minion_status_and_failed_checks_no_lastseen(self, minion_id: int, status: MinionStatus,
+                                                           failed_health_checks: int):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.Status, minion.FailedHealthChecks = status, failed_health_checks
+            self.__queue_write(self.db.update_minion_status_and_failed_checks_no_lastseen, minion_id, status.value,
+                               failed_health_checks)
+
+    def update_failed_checks_to_zero(self, minion_id: int):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.FailedHealthChecks, minion.LastSeen = 0, _now()
+            self.__queue_write(self.db.update_failed_checks_to_zero, minion_id)
+
+    def update_minion_failed_checks(self, minion_id: int, failed_health_checks: int):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.FailedHealthChecks = failed_health_checks
+            self.__queue_write(self.db.update_minion_failed_checks, minion_id, failed_health_checks)
+
+    def update_minion_benchmark(self, minion_id: int, candidates_per_second: float, best_workers: int,
+                                best_chunk_size: int, hash_rates: dict = None):
+        with self.lock:
+            minion = self.minions.get(minion_id)
+            if minion:
+                minion.CandidatesPerSecond, minion.BestWorkers = candidates_per_second, best_workers
+                minion.BestChunkSize, minion.HashRates = best_chunk_size, dict(hash_rates or {})
+            self.__queue_write(self.db.update_minion_benchmark, minion_id, candidates_per_second, best_workers,
+                               best_chunk_size, hash_rates)
+
+    # endregion
+
+    # region Jobs
+
+    def __add_job(self, job: JobAssignment):
+        self.jobs[job.Id] = job
+        self.range_jobs[_range_key(job)].add(job.Id)
+        if job.Status == JobAssignmentStatus.INPROGRESS:
+            self.minion_jobs[job.MinionId].add(job.Id)
+        else:
+            heapq.heappush(self.scheduled, job.Id)
+
+    def __remove_job(self, job: JobAssignment):
+        self.jobs.pop(job.Id, None)
+        self.taken.discard(job.Id)
+        self.range_jobs[_range_key(job)].discard(job.Id)
+        if job.MinionId is not None:
+            self.minion_jobs[job.MinionId].discard(job.Id)
+
+    def __reschedule(self, job: JobAssignment):
+        self.minion_jobs[job.MinionId].discard(job.Id)
+        job.Status, job.MinionId, job.AssignmentTime, job.LeaseExpiresAt = \
+            JobAssignmentStatus.SCHEDULED, None, None, None
+        heapq.heappush(self.scheduled, job.Id)
+
+    def add_taken_job(self, job: JobAssignment):
+        """a job that was just created in the db by the caller, who sends it or releases it"""
+        with self.lock:
+            self.jobs[job.Id] = job
+            self.taken.add(job.Id)
+            self.range_jobs[_range_key(job)].add(job.Id)
+
+    def get_job(self, job_id: int) -> Optional[JobAssignment]:
+        return self.jobs.get(job_id)
+
+    def take_scheduled_jobs(self, limit: int) -> List[JobAssignment]:
+        """takes up to limit of the oldest scheduled jobs off the queue, other dispatchers skip them until released"""
+        jobs = []
+        with self.lock:
+            while self.scheduled and len(jobs) < limit:
+                job = self.jobs.get(heapq.heappop(self.scheduled))
+                if job and job.Status == JobAssignmentStatus.SCHEDULED and job.Id not in self.taken:
+                    self.taken.add(job.Id)
+                    jobs.append(job)
+        return jobs
+
+    def release_job(self, job_id: int):
+        """puts a taken job that wasn't sent back on the queue"""
+        with self.lock:
+            if job_id in self.taken:
+                self.taken.discard(job_id)
+                if job_id in self.jobs:
+                    heapq.heappush(self.scheduled, job_id)
+
+    def split_job(self, job: JobAssignment, head_end_range: int, keyspace_size: int) -> Optional[int]:
+        """
+        Splits a taken job into its head ending at head_end_range, which keeps the job's Id, and a new scheduled job
+        for the rest of the range. The rest needs its Id from the db, so the split is written right away.
+        Returns the Id of the rest, None if the job couldn't be split.
+        """
+        self.flush()
+        rest_start_range = head_end_range + 1
+        rest_id = self.db.split_job_assignment(job.Id, job.StartRange, head_end_range, rest_start_range,
+                                              keyspace_size)
+        if not rest_id:
+            return None
+        with self.lock:
+            rest = replace(job, Id=rest_id, StartRange=rest_start_range, Status=JobAssignmentStatus.SCHEDULED,
+                           SweepPosition=None if job.SweepPosition is None
+                           else job.SweepPosition + rest_start_range - job.StartRange)
+            self.range_jobs[_range_key(job)].discard(job.Id)
+            job.EndRange = head_end_range
+            self.range_jobs[_range_key(job)].add(job.Id)
+            self.__add_job(rest)
+        return rest_id
+
+    def job_sent(self, job_id: int, minion_id: int, lease_expires_at: float, keyspace_size: int,
+                 minion_busy: bool) -> bool:
+        """the job is in progress on the minion, returns False if it was deleted while it was sent"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if minion_busy:
+                self.update_minion_status(minion_id, MinionStatus.BUSY)
+            if not job:
+                return False
+            self.taken.discard(job_id)
+            job.Status, job.MinionId, job.AssignmentTime, job.LeaseExpiresAt = \
+                JobAssignmentStatus.INPROGRESS, minion_id, _now(), lease_expires_at
+            self.minion_jobs[minion_id].add(job_id)
+            self.__queue_write(self.db.update_job_assignment, job_id, minion_id, keyspace_size,
+                               JobAssignmentStatus.INPROGRESS.value, lease_expires_at)
+            return True
+
+    def find_job(self, hash_entry: Hash, start_range: int, end_range: int) -> Optional[JobAssignment]:
+        """
+        the job of the hash's sweep over the range, or the job of the hash itself for jobs of older versions.
+        a range comes back around on every lap of the sweep, the job that is in progress is the one that's meant
+        """
+        with self.lock:
+            for key in (hash_entry.HashType, hash_entry.HashId):
+                job_ids = self.range_jobs.get((key, start_range, end_range))
+                if job_ids:
+                    jobs = [self.jobs[job_id] for job_id in job_ids]
+                    return max(jobs, key=lambda job: (job.Status == JobAssignmentStatus.INPROGRESS, job.Id))
+        return None
+
+    def complete_job(self, job: JobAssignment, keyspace_size: int):
+        """the minion of the job is available again, the job's range is merged into the coverage of its hashes"""
+        with self.lock:
+            if self.jobs.get(job.Id) is not job:
+                return
+            self.__remove_job(job)
+            if job.MinionId is not None:
+                self.update_minion_status(job.MinionId, MinionStatus.AVAILABLE)
+            self.__queue_write(self.db.complete_job_assignment, job, keyspace_size)
+
+    def delete_job(self, job_id: int, keyspace_size: int):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                self.__remove_job(job)
+            self.__queue_write(self.db.delete_job_assignment, job_id, keyspace_size)
+
+    def delete_hash_jobs(self, hash_id: int):
+        """deletes the jobs of the hash itself (jobs of older versions), sweep jobs search for other hashes too"""
+        with self.lock:
+            for job in [job for job in self.jobs.values() if job.HashId == hash_id]:
+                self.__remove_job(job)
+            self.__queue_write(self.db.delete_jobs_by_hash_id, hash_id)
+
+    def minions_working_on_hash(self, hash_entry: Hash, keyspace_size: int) -> List[Minion]:
+        """minions with a job of the hash itself, or a job of its sweep cut while the hash was a target"""
+        def searches_hash(job):
+            if job.HashId is not None:
+                return job.HashId == hash_entry.HashId
+            return (job.HashType == hash_entry.HashType and hash_entry.JoinPosition is not None
+                    and hash_entry.JoinPosition <= job.SweepPosition < hash_entry.JoinPosition + keyspace_size)
+
+        with self.lock:
+            return [self.minions[minion_id] for minion_id, job_ids in self.minion_jobs.items()
+                    if minion_id in self.minions and any(searches_hash(self.jobs[job_id]) for job_id in job_ids)]
+
+    def renew_leases(self, minion_id: int, ranges: Iterable[Tuple[int, int]], lease_expires_at: float) -> int:
+        """extends the leases of the minion's in progress jobs over ranges, returns how many were renewed"""
+        ranges = [(int(start_range), int(end_range)) for start_range, end_range in ranges]
+        held_ranges = set(ranges)
+        renewed = 0
+        with self.lock:
+            for job_id in self.minion_jobs.get(minion_id, ()):
+                job = self.jobs[job_id]
+                if (job.StartRange, job.EndRange) in held_ranges:
+                    job.LeaseExpiresAt = lease_expires_at
+                    renewed += 1
+            if renewed:
+                self.__queue_write(self.db.renew_job_leases, minion_id, ranges, lease_expires_at)
+        return renewed
+
+    def requeue_expired_jobs(self, now: float, keyspace_size: int) -> int:
+        """schedules the jobs whose lease expired again, returns how many"""
+        with self.lock:
+            expired = [self.jobs[job_id] for job_ids in self.minion_jobs.values() for job_id in job_ids
+                       if (self.jobs[job_id].LeaseExpiresAt or 0) < now]
+            for job in expired:
+                self.__reschedule(job)
+            if expired:
+                self.__queue_write(self.db.reschedule_job_assignments, [job.Id for job in expired], keyspace_size)
+        return len(expired)
+
+    def reschedule_minion_jobs(self, minion_id: int, keyspace_size: int) -> int:
+        """schedules the in progress jobs of a lost minion again, returns how many"""
+        with self.lock:
+            jobs = [self.jobs[job_id] for job_id in self.minion_jobs.get(minion_id, ())]
+            for job in jobs:
+                self.__reschedule(job)
+            self.__queue_write(self.db.reschedule_inprogress_jobs_for_minion, minion_id, keyspace_size)
+        return len(jobs)
+
+    # endregion
@@ -1,21 +1,28 @@
 import os
-from typing import List
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import FastAPI, HTTPException
 from datetime import datetime
 import logging
-from common.crack_objects import PhoneNumberValidator
 import uvicorn
-import hashlib
 from common.crack_objects import HashEntry
-from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing
 import requests
-from common.crack_objects import CrackRequest, CrackResult
+from common.crack_objects import CrackRequest, CrackResult, CancelRequest, Heartbeat
 from minion.minion_cracker_db.MinionCrackerDb import MinionCrackerDb
+from minion.cracking_engine.DigestMatcher import DigestMatcher
+from minion.cracking_engine.WorkerPool import WorkerPool
+from common.hashing import get_hashlib_func
+from minion.cracking_engine.scanners import get_scanner
+from minion.cracking_engine.ShardCache import ShardCache
 from common.crack_objects.CrackStatus import CrackStatus
+from common.crack_objects.PhoneNumber import PhoneNumber, phone_number_to_int
+from common.crack_objects.Job import Job
+from common.config.HashesTypes import HashTypes
 from common.models.statuses.MinionStatus import MinionStatus
 import os.path
+import queue
 import threading
+import time
 import socket
 import argparse
 
@@ -28,8 +35,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("MinionCracker")
 
+CHECKPOINT_INTERVAL = int(os.environ.get("MINION_CHECKPOINT_INTERVAL", 5))  # seconds between saved job checkpoints
+PREFETCH_DEPTH = int(os.environ.get("MINION_PREFETCH_DEPTH", 2))  # jobs accepted on top of the running one (at least 1)
+BENCHMARK_CANDIDATES = int(os.environ.get("MINION_BENCHMARK_CANDIDATES", 200000))  # candidates per measurement
+BENCHMARK_CHUNK_SIZES = (2000, 10000, 50000)
+BENCHMARK_START = 500000000
+# opt-in: keep the digests of scanned ranges on disk and answer repeated ranges by lookup
+SHARD_CACHE_DIR = os.environ.get("MINION_SHARD_CACHE_DIR")
+SHARD_CACHE_MAX_MB = int(os.environ.get("MINION_SHARD_CACHE_MAX_MB", 1024))
+SHARD_CACHE_HOT_SHARDS = int(os.environ.get("MINION_SHARD_CACHE_HOT_SHARDS", 16))  # shards kept in memory
+# the master requeues a job whose lease isn't renewed, keep this well below its JOB_LEASE_SECONDS
+HEARTBEAT_INTERVAL = int(os.environ.get("MINION_HEARTBEAT_INTERVAL", 15))
+MINION_IP = os.environ.get("MINION_IP")  # the address the master knows the minion by, if it isn't the one it sends from
+
 class MinionCracker:
-    def __init__(self, db_path=None, api_port=None, master_ip=None, master_port=None, hash_type=None):
+    def __init__(self, db_path=None, api_port=None, master_ip=None, master_port=None, hash_type=None, prefetch_depth=None,
+                 shard_cache_dir=None):
         self.logger = logging.getLogger("MinionCracker")
         self.db_path = db_path or os.environ.get("MINION_DB_PATH") or os.path.join(os.path.dirname(__file__), "MinionCracker.db")
         self.api_port = api_port or int(os.getenv("API_PORT", "8000"))
@@ -38,76 +59,85 @@ class MinionCracker:
         self.hash_type = hash_type or "md5"
         self.max_workers = multiprocessing.cpu_count()
         self.db = MinionCrackerDb(self.db_path)
+        self.shard_cache_dir = shard_cache_dir or SHARD_CACHE_DIR
+        self.shard_cache = None
+        if self.shard_cache_dir:
+            self.shard_cache = ShardCache(self.shard_cache_dir, max_bytes=SHARD_CACHE_MAX_MB * 1024 * 1024,
+                                          hot_shards=SHARD_CACHE_HOT_SHARDS)
+        self.worker_pool = WorkerPool(max_workers=self.max_workers, shard_cache_dir=self.shard_cache_dir)
         self.active_job = None
+        self.cancelled_hashes = set()
+        self.prefetch_depth = max(1, PREFETCH_DEPTH if prefetch_depth is None else prefetch_depth)
+        self.job_queue = queue.Queue(maxsize=self.prefetch_depth)
+        self.job_runner_thread = None
+        self.heartbeat_thread = None
+        # results the master couldn't be reached for, sent again with the next heartbeat
+        self.unreported_results: List[Tuple[dict, CrackRequest]] = []
+        self.unreported_results_lock = threading.Lock()
 
     def get_hashlib_func(self, hash_type: str):
-        if hash_type.lower() == 'md5':
-            return hashlib.md5
-        elif hash_type.lower() == 'sha1':
-            return hashlib.sha1
-        elif hash_type.lower() == 'sha256':
-            return hashlib.sha256
-        elif hash_type.lower() == 'sha512':
-            return hashlib.sha512
-        else:
-            raise ValueError(f"Unsupported hash type: {hash_type}")
+        return get_hashlib_func(hash_type)
 
     def calculate_hash(self, password):
         return self.get_hashlib_func(self.hash_type)(password.encode('utf-8')).hexdigest()
 
-    def generate_phone_range(self, start_phone: PhoneNumberValidator, end_phone: PhoneNumberValidator) -> List[str]:
-        return list(PhoneNumberValidator.range(start_phone, end_phone))
-
-    def distribute_password_list_to_sub_jobs(self, password_list) -> List[List[str]]:
-        return [password_list]
+    def distribute_range_to_sub_jobs(self, start_offset: int, end_offset: int) -> List[Tuple[int, int]]:
+        return [(start_offset, end_offset)]
 
     def hash_password(self, password: str, needed_hashes: List[str]):
         password_hash = self.calculate_hash(password=password)
         if password_hash in needed_hashes:
             return HashEntry(hash=password_hash, password=password)
 
-    def process_password_batch(self, password_batch: List[str], needed_hashes: List[str]):
-        results = []
-        for password in password_batch:
-            password_hash = self.calculate_hash(password=password)
-            if password_hash in needed_hashes:
-                results.append(HashEntry(hash=password_hash, password=password))
-        return results
+    def process_password_batch(self, start_offset: int, end_offset: int, needed_hashes: List[str], hash_type: str = None):
+        hash_func = self.get_hashlib_func(hash_type or self.hash_type)
+        scanner = get_scanner(self.worker_pool.strategy)
+        return scanner([(hash_func, DigestMatcher(needed_hashes).targets)], start_offset, end_offset)
 
-    def multi_processing_sub_job(self, password_list, needed_hashes: List[str], max_workers: int):
-        results = []
-        
-        if not password_list:
-            return results
-            
-        batch_size = max(1, len(password_list) // max_workers)
-        password_batches = []
-        
-        for i in range(0, len(password_list), batch_size):
-            batch = password_list[i:i + batch_size]
-            if batch:  # Ensure we don't add empty batches
-                password_batches.append(batch)
-        
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                executor.submit(self.process_password_batch, batch, needed_hashes) 
-                for batch in password_batches
-            ]
-            
-            for future in as_completed(futures):
-                batch_results = future.result()
-                if batch_results:
-                    results.extend(batch_results)
-                    
-        return results
+    def multi_processing_sub_job(self, start_offset: int, end_offset: int, targets_by_hash_type: Dict[str, List[str]],
+                                 max_workers: int, on_progress: Callable[[int, List[HashEntry]], None] = None):
+        found_hashes: List[HashEntry] = []
+        if self.shard_cache:
+            targets_by_hash_type = dict(targets_by_hash_type)
+            for hash_type, hashes in list(targets_by_hash_type.items()):
+                cached = self.shard_cache.lookup(hash_type, hashes, start_offset, end_offset)
+                if cached is not None:
+                    self.logger.info(f"Answered {len(hashes)} {hash_type} hashes from the shard cache")
+                    found_hashes.extend(cached)
+                    del targets_by_hash_type[hash_type]
+            if not targets_by_hash_type:
+                return found_hashes
+
+        found_hashes.extend(self.worker_pool.run(
+            start_offset=start_offset,
+            end_offset=end_offset,
+            targets_by_hash_type=targets_by_hash_type,
+            max_workers=max_workers,
+            on_progress=on_progress
+        ))
+        if self.shard_cache:
+            self.shard_cache.refresh()
+        return found_hashes
 
-    def multi_processing_job(self, password_list, needed_hashes: List[str], max_workers: int=None):
+    def multi_processing_job(self, start_phone: int, end_phone: int,
+                             needed_hashes: List[str], max_workers: int=None, scanned_up_to: int=None,
+                             on_progress: Callable[[int, List[HashEntry]], None] = None,
+                             hash_types: Dict[str, str] = None):
         if max_workers is None:
             max_workers = self.max_workers
-        sub_jobs = self.distribute_password_list_to_sub_jobs(password_list)
+        if not needed_hashes:
+            return {}
+        # hashes missing from hash_types are of the minion's default hash_type
+        targets_by_hash_type = CrackRequest(hashes=needed_hashes, start_range=start_phone, end_range=end_phone,
+                                            hash_type=self.hash_type, hash_types=hash_types or {}).targets_by_hash_type()
+        start_offset = start_phone
+        if scanned_up_to is not None:
+            start_offset = max(start_offset, scanned_up_to + 1)
+        sub_jobs = self.distribute_range_to_sub_jobs(start_offset, end_phone)
         found_hashes: List[HashEntry] = []
-        for sub_job in sub_jobs:
-            results = self.multi_processing_sub_job(sub_job, needed_hashes=needed_hashes, max_workers=max_workers)
+        for sub_job_start, sub_job_end in sub_jobs:
+            results = self.multi_processing_sub_job(sub_job_start, sub_job_end, targets_by_hash_type=targets_by_hash_type,
+                                                    max_workers=max_workers, on_progress=on_progress)
             found_hashes.extend(results)
         results = {found_hash.hash: found_hash.password for found_hash in found_hashes}
         for needed_hash in needed_hashes:
@@ -116,6 +146,7 @@ class MinionCracker:
         return results
 
     def report_crack_result_to_master(self, results, crack_request: CrackRequest):
+        """results are only pushed, a result the master couldn't be reached for is sent again with the next heartbeat"""
         try:
             crack_result = CrackResult(
                 range_start=crack_request.start_range,
@@ -129,47 +160,135 @@ class MinionCracker:
             response.raise_for_status()
             self.logger.info(f"Successfully reported results to master for range {crack_request.start_range} to {crack_request.end_range}")
             return response.json()
-        except requests.exceptions.ConnectionError as e:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
             self.logger.error(f"Failed to report results to master (connection error): {str(e)}")
+            self.__keep_unreported_result(results, crack_request)
             return {"status": "error", "message": "Master server unavailable"}
         except Exception as e:
             self.logger.error(f"Failed to report results to master: {str(e)}")
             return {"status": "error", "message": f"Error reporting to master: {str(e)}"}
 
-    def background_crack(self, crack_request: CrackRequest):
+    def __keep_unreported_result(self, results, crack_request: CrackRequest):
+        with self.unreported_results_lock:
+            self.unreported_results.append((results, crack_request))
+
+    def report_unreported_results(self):
+        with self.unreported_results_lock:
+            unreported_results, self.unreported_results = self.unreported_results, []
+        for results, crack_request in unreported_results:
+            self.report_crack_result_to_master(results, crack_request)
+
+    def held_ranges(self) -> List[Tuple[int, int]]:
+        """the ranges of the jobs the master should keep leased to this minion"""
+        crack_requests = self.queued_jobs()
+        active_job = self.active_job
+        if active_job:
+            crack_requests.append(active_job)
+        with self.unreported_results_lock:
+            crack_requests.extend(crack_request for _, crack_request in self.unreported_results)
+        return sorted({(crack_request.start_range, crack_request.end_range) for crack_request in crack_requests})
+
+    def send_heartbeat(self) -> bool:
+        """renews the leases of the jobs this minion holds, returns False if the master didn't take the heartbeat"""
+        heartbeat = Heartbeat(port=self.api_port, ip=MINION_IP, ranges=self.held_ranges())
         try:
-            self.active_job = crack_request
+            response = requests.post(f"http://{self.master_ip}:{self.master_port}/heartbeat",
+                                     json=heartbeat.model_dump(), timeout=HEARTBEAT_INTERVAL)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Heartbeat to master failed: {str(e)}")
+            return False
+
+    def send_heartbeats(self):
+        while True:
+            self.report_unreported_results()
+            self.send_heartbeat()
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def start_heartbeat(self):
+        if not self.heartbeat_thread or not self.heartbeat_thread.is_alive():
+            self.heartbeat_thread = threading.Thread(target=self.send_heartbeats, daemon=True)
+            self.heartbeat_thread.start()
+
+    def _job_progress_saver(self, job_ids: List[int]):
+        """
+        Builds the on_progress callback of a job: found passwords are saved right away,
+        the scanned offset is saved at most once every CHECKPOINT_INTERVAL seconds.
+        """
+        last_checkpoint_time = time.monotonic()
+
+        def save_progress(scanned_up_to: int, found: List[HashEntry]):
+            nonlocal last_checkpoint_time
+            try:
+                for found_hash in found:
+                    hash_info = self.db.get_hash_by_value(found_hash.hash)
+                    if hash_info:
+                        self.db.add_password_to_hash(hash_info["Id"], found_hash.password)
+                if time.monotonic() - last_checkpoint_time >= CHECKPOINT_INTERVAL:
+                    self.db.update_jobs_checkpoint(job_ids, scanned_up_to)
+                    last_checkpoint_time = time.monotonic()
+            except Exception as e:
+                self.logger.error(f"Failed to save job progress: {e}")
+
+        return save_progress
+
+    def register_job(self, crack_request: CrackRequest) -> List[int]:
+        """returns the Ids of the HashJobs rows of the request, one per hash"""
+        job_ids = []
+        with self.db.transaction():
             for hash_value in crack_request.hashes:
                 hash_id = self.db.check_hash_exists(hash_value)
                 if not hash_id:
-                    hash_id = self.db.add_new_hash(hash_value)
+                    hash_id = self.db.add_new_hash(hash_value, hash_type=crack_request.hash_type_of(hash_value).value)
                 existing_job = self.db.get_hash_job_by_hash_and_range(
-                    hash_value, 
-                    str(crack_request.start_range), 
-                    str(crack_request.end_range)
+                    hash_value,
+                    crack_request.start_range,
+                    crack_request.end_range
                 )
                 if not existing_job:
-                    self.db.add_hash_job(hash_id, str(crack_request.start_range), str(crack_request.end_range))
-            phone_range = self.generate_phone_range(
-                start_phone=crack_request.start_range,
-                end_phone=crack_request.end_range
-            )
-            results = self.multi_processing_job(
-                password_list=phone_range,
-                needed_hashes=crack_request.hashes,
-                max_workers=self.max_workers
-            )
-            for hash_value, password in results.items():
+                    job_ids.append(self.db.add_hash_job(hash_id, crack_request.start_range, crack_request.end_range))
+                    continue
+                if existing_job.Status != "InProgress":  # the same range was sent again
+                    self.db.update_hash_job_status(existing_job.Id, "InProgress")
+                job_ids.append(existing_job.Id)
+        return job_ids
+
+    def background_crack(self, crack_request: CrackRequest, scanned_up_to: int = None):
+        try:
+            self.active_job = crack_request
+            job_ids = self.register_job(crack_request)
+            results = {}
+            for hash_value in crack_request.hashes:
+                # found before a restart (or by an earlier job)
                 hash_info = self.db.get_hash_by_value(hash_value)
-                if hash_info and password:
-                    self.db.add_password_to_hash(hash_info["Id"], password)
-                job = self.db.get_hash_job_by_hash_and_range(
-                    hash_value, 
-                    str(crack_request.start_range), 
-                    str(crack_request.end_range)
-                )
-                if job:
-                    self.db.update_hash_job_status(job.Id, "Completed")
+                if hash_info and hash_info["Password"]:
+                    results[hash_value] = hash_info["Password"]
+            results.update(self.multi_processing_job(
+                start_phone=crack_request.start_range,
+                end_phone=crack_request.end_range,
+                needed_hashes=[hash_value for hash_value in crack_request.hashes
+                               if hash_value not in results and hash_value not in self.cancelled_hashes],
+                max_workers=self.max_workers,
+                scanned_up_to=scanned_up_to,
+                on_progress=self._job_progress_saver(job_ids),
+                hash_types={hash_value: crack_request.hash_type_of(hash_value) for hash_value in crack_request.hashes}
+            ))
+            for hash_value in crack_request.hashes:
+                results.setdefault(hash_value, False)
+            with self.db.transaction():
+                for hash_value, password in results.items():
+                    hash_info = self.db.get_hash_by_value(hash_value)
+                    if hash_info and password:
+                        self.db.add_password_to_hash(hash_info["Id"], password)
+                    job = self.db.get_hash_job_by_hash_and_range(
+                        hash_value,
+                        crack_request.start_range,
+                        crack_request.end_range
+                    )
+                    if job:
+                        cancelled = not password and hash_value in self.cancelled_hashes
+                        self.db.update_hash_job_status(job.Id, "Cancelled" if cancelled else "Completed")
             self.active_job = None
             self.report_crack_result_to_master(results, crack_request)
             return results
@@ -178,6 +297,152 @@ class MinionCracker:
             self.active_job = None
             self.logger.error(f"Background crack job failed: {str(e)}")
 
+    def resume_unfinished_jobs(self, unfinished_jobs: List[Job]):
+        # the rows of one job share their checkpoint, so rows of other jobs over the same range
+        # (e.g. of another algorithm) are resumed from their own checkpoint
+        jobs_by_checkpoint = {}
+        for job in unfinished_jobs:
+            jobs_by_checkpoint.setdefault((job.StartRange, job.EndRange, job.Checkpoint), []).append(job)
+
+        for (start_range, end_range, scanned_up_to), range_jobs in jobs_by_checkpoint.items():
+            crack_request = CrackRequest(
+                hashes=[job.HashValue for job in range_jobs],
+                start_range=start_range,
+                end_range=end_range,
+                hash_types={job.HashValue: job.HashType for job in range_jobs if job.HashType}
+            )
+            self.logger.info(f"Resuming job {start_range} to {end_range} for {len(range_jobs)} hashes "
+                             f"from {'the start' if scanned_up_to is None else scanned_up_to + 1}")
+            self.job_queue.put((crack_request, scanned_up_to))
+
+    def start_job_runner(self):
+        if not self.job_runner_thread or not self.job_runner_thread.is_alive():
+            self.job_runner_thread = threading.Thread(target=self.run_queued_jobs, daemon=True)
+            self.job_runner_thread.start()
+
+    def run_queued_jobs(self):
+        """picks the next queued job as soon as the current one finishes, so the workers never wait for the master"""
+        while True:
+            crack_request, scanned_up_to = self.job_queue.get()
+            crack_request = self.drop_cancelled_hashes(crack_request)
+            if crack_request.hashes:
+                self.active_job = crack_request
+                self.background_crack(crack_request, scanned_up_to=scanned_up_to)
+            self.forget_cancelled_hashes()
+
+    def drop_cancelled_hashes(self, crack_request: CrackRequest) -> CrackRequest:
+        """
+        Removes the hashes cancelled while the job was queued (their rows were already marked Cancelled).
+        A job left without hashes is reported right away, so the master can complete it.
+        """
+        cancelled = [hash_value for hash_value in crack_request.hashes if hash_value in self.cancelled_hashes]
+        if not cancelled:
+            return crack_request
+        remaining = [hash_value for hash_value in crack_request.hashes if hash_value not in self.cancelled_hashes]
+        if not remaining:
+            self.report_crack_result_to_master({hash_value: False for hash_value in cancelled}, crack_request)
+        return crack_request.model_copy(update={"hashes": remaining})
+
+    def queued_jobs(self) -> List[CrackRequest]:
+        with self.job_queue.mutex:
+            return [crack_request for crack_request, _ in self.job_queue.queue]
+
+    def forget_cancelled_hashes(self):
+        """keeps only the cancelled hashes that a queued job still has"""
+        still_queued = {hash_value for crack_request in self.queued_jobs() for hash_value in crack_request.hashes}
+        self.cancelled_hashes &= still_queued
+
+    def enqueue_job(self, crack_request: CrackRequest) -> bool:
+        """returns False if the queue is already full"""
+        self.start_job_runner()
+        if self.job_queue.full():
+            return False
+        self.register_job(crack_request)
+        try:
+            self.job_queue.put_nowait((crack_request, None))
+        except queue.Full:
+            return False
+        return True
+
+    def is_accepting_jobs(self) -> bool:
+        return not self.job_queue.full()
+
+    def cancel_hashes(self, hashes: List[str]) -> bool:
+        """
+        Called when the master resolved hashes elsewhere. Returns True if the active job
+        had nothing left to search for and was stopped.
+        """
+        # queued jobs skip these hashes once they start, their rows are cancelled now so a restart won't resume them
+        for crack_request in self.queued_jobs():
+            for hash_value in set(hashes).intersection(crack_request.hashes):
+                self.cancelled_hashes.add(hash_value)
+                job = self.db.get_hash_job_by_hash_and_range(hash_value, crack_request.start_range, crack_request.end_range)
+                if job:
+                    self.db.update_hash_job_status(job.Id, "Cancelled")
+        active_job = self.active_job
+        if not active_job:
+            return False
+        self.cancelled_hashes.update(set(hashes).intersection(active_job.hashes))
+        cancelled = [hash_value for hash_value in hashes if hash_value in active_job.hashes]
+        if not cancelled:
+            return False
+        self.logger.info(f"Cancelled {len(cancelled)} hashes of the active job ({active_job.start_range} to {active_job.end_range})")
+        return self.worker_pool.cancel_targets(cancelled)
+
+    def run_benchmark(self):
+        """
+        Measures the candidates per second of every algorithm on one core (process_password_batch),
+        and of the minion's hash type over the worker pool for several worker counts and chunk sizes.
+        The result replaces the cached benchmark.
+        """
+        start_offset = BENCHMARK_START
+        end_offset = start_offset + BENCHMARK_CANDIDATES - 1
+        benchmarks = []
+        for hash_type in HashTypes:
+            # a hash no candidate has, so the whole range is scanned
+            never_found = ["00" * self.get_hashlib_func(hash_type.value)().digest_size]
+            started = time.perf_counter()
+            self.process_password_batch(start_offset, end_offset, never_found, hash_type=hash_type.value)
+            benchmarks.append((hash_type.value, 1, None, BENCHMARK_CANDIDATES / (time.perf_counter() - started)))
+
+        # shards written by a benchmark would make the next one measure lookups
+        benchmark_pool = self.worker_pool
+        if self.shard_cache_dir:
+            benchmark_pool = WorkerPool(max_workers=self.max_workers, strategy=self.worker_pool.strategy)
+        never_found = {self.hash_type: ["00" * self.get_hashlib_func(self.hash_type)().digest_size]}
+        try:
+            for workers in sorted({1, max(1, self.max_workers // 2), self.max_workers}):
+                for chunk_size in BENCHMARK_CHUNK_SIZES:
+                    started = time.perf_counter()
+                    benchmark_pool.run(start_offset, end_offset, never_found, max_workers=workers, chunk_size=chunk_size)
+                    benchmarks.append((self.hash_type, workers, chunk_size,
+                                       BENCHMARK_CANDIDATES / (time.perf_counter() - started)))
+        finally:
+            if benchmark_pool is not self.worker_pool:
+                benchmark_pool.stop()
+
+        self.db.save_benchmarks(benchmarks)
+        result = self.get_benchmark()
+        self.logger.info(f"Benchmark finished, best configuration: {result['best']}")
+        return result
+
+    def get_benchmark(self):
+        """the cached benchmark, None if the minion wasn't benchmarked yet"""
+        rows = self.db.get_benchmarks()
+        if not rows:
+            return None
+        configurations = [
+            {"hash_type": row["HashType"], "workers": row["Workers"], "chunk_size": row["ChunkSize"],
+             "candidates_per_second": row["CandidatesPerSecond"]}
+            for row in rows if row["ChunkSize"] is not None
+        ]
+        return {
+            "algorithms": {row["HashType"]: row["CandidatesPerSecond"] for row in rows if row["ChunkSize"] is None},
+            "configurations": configurations,
+            "best": max(configurations, key=lambda configuration: configuration["candidates_per_second"], default=None),
+            "timestamp": rows[0]["CreationTime"]
+        }
+
     def check_minion_running(self, port=None): # do we really need it? api server wont run if port is occupied..
         port = port or self.api_port
         try:
@@ -200,24 +465,24 @@ class MinionCracker:
         if self.check_minion_running():
             self.logger.error(f"Another minion is already running on port {self.api_port}. Exiting.")
             raise SystemExit(f"Error: Another minion is already running on port {self.api_port}")
+        self.worker_pool.start()
         if not os.path.exists(self.db_path) or not self.db.check_tables_exist():
             self.logger.info("Creating database tables...")
             self.db.create_tables()
+            self.start_job_runner()
+            self.start_heartbeat()
             return
+        self.db.upgrade_tables()
+        self.start_job_runner()
+        self.start_heartbeat()
         unfinished_jobs = self.db.get_unfinished_jobs()
         if unfinished_jobs:
-            self.logger.info(f"Found {len(unfinished_jobs)} unfinished jobs. Resuming first job...")
-            job = unfinished_jobs[0]
-            hash_info = self.db.get_hash_by_value(job.HashValue)
-            if hash_info:
-                crack_request = CrackRequest(
-                    hashes=[job.HashValue],
-                    start_range=PhoneNumberValidator(phone_number=job.StartRange),
-                    end_range=PhoneNumberValidator(phone_number=job.EndRange)
-                )
-                self.active_job = crack_request
-                thread = threading.Thread(target=self.background_crack, args=(crack_request,), daemon=True)
-                thread.start()
+            self.logger.info(f"Found {len(unfinished_jobs)} unfinished jobs. Resuming them from their checkpoints...")
+            thread = threading.Thread(target=self.resume_unfinished_jobs, args=(unfinished_jobs,), daemon=True)
+            thread.start()
+
+    def shutdown(self):
+        self.worker_pool.stop()
 
 app = FastAPI()
 minion_cracker = None
@@ -229,31 +494,49 @@ def get_minion_cracker():
     return minion_cracker
 
 @app.post("/crack")
-async def crack(crack_request: CrackRequest, background_tasks: BackgroundTasks):
+async def crack(crack_request: CrackRequest):
     minion = get_minion_cracker()
-    if minion.active_job:
+    if not minion.enqueue_job(crack_request):
         minion.logger.warning(
-            f"Rejected crack request: another job is already in progress. "
-            f"Active job details: hashes={minion.active_job.hashes}, "
-            f"range={minion.active_job.start_range} to {minion.active_job.end_range}, "
+            f"Rejected crack request: the job queue is full ({minion.prefetch_depth} queued). "
             f"New request: hashes={crack_request.hashes}, "
             f"range={crack_request.start_range} to {crack_request.end_range}"
         )
-        raise HTTPException(status_code=409, detail="A job is already in progress")
-    minion.logger.info(f"Received crack request for {len(crack_request.hashes)} hashes. Range: {crack_request.start_range} to {crack_request.end_range}")
-    background_tasks.add_task(minion.background_crack, crack_request)
-    return {"status": "accepted", "message": "Cracking job started"}
+        raise HTTPException(status_code=409, detail="The job queue is full")
+    minion.logger.info(f"Queued crack request for {len(crack_request.hashes)} hashes. Range: {crack_request.start_range} to {crack_request.end_range}")
+    return {"status": "accepted", "message": "Cracking job queued", "accepting": minion.is_accepting_jobs()}
+
+@app.post("/cancel")
+async def cancel(cancel_request: CancelRequest):
+    minion = get_minion_cracker()
+    job_stopped = minion.cancel_hashes(cancel_request.hashes)
+    return {"status": "success", "job_stopped": job_stopped}
 
 @app.get("/health")
 async def health_check():
     minion = get_minion_cracker()
-    if minion.active_job:
-        return {"status": MinionStatus.BUSY, "timestamp": datetime.now().isoformat()}
-    else:
-        return {"status": MinionStatus.AVAILABLE, "timestamp": datetime.now().isoformat()}
+    return {
+        "status": MinionStatus.AVAILABLE if minion.is_accepting_jobs() else MinionStatus.BUSY,
+        "active_job": minion.active_job is not None,
+        "queued_jobs": minion.job_queue.qsize(),
+        "prefetch_depth": minion.prefetch_depth,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/benchmark")
+def benchmark(refresh: bool = False):
+    minion = get_minion_cracker()
+    cached = minion.get_benchmark()
+    if cached and not refresh:
+        return cached
+    if minion.active_job or not minion.job_queue.empty():
+        if cached:
+            return cached
+        raise HTTPException(status_code=409, detail="The minion is busy with a job, try again when it is done")
+    return minion.run_benchmark()
 
 @app.get("/status/{hash_value}/{start_range}/{end_range}")
-async def get_status(hash_value: str, start_range: str, end_range: str):
+async def get_status(hash_value: str, start_range: PhoneNumber, end_range: PhoneNumber):
     minion = get_minion_cracker()
     minion.logger.debug(f"Status check for hash: {hash_value}, range: {start_range} to {end_range}")
     job = minion.db.get_hash_job_by_hash_and_range(hash_value, start_range, end_range)
@@ -269,11 +552,29 @@ async def get_status(hash_value: str, start_range: str, end_range: str):
         hashes={hash_value: hash_info["Password"] if hash_info["Password"] else False}
     )
     if minion.active_job and minion.active_job.hashes and hash_value in minion.active_job.hashes:
-        if start_range == str(minion.active_job.start_range) and end_range == str(minion.active_job.end_range):
+        if start_range == minion.active_job.start_range and end_range == minion.active_job.end_range:
             status.status = "InProgress"
     minion.logger.debug(f"Status for hash {hash_value}: {status.status}")
     return status
 
+@app.get("/status/{start_range}/{end_range}")
+async def get_job_status(start_range: PhoneNumber, end_range: PhoneNumber, hash_type: Optional[HashTypes] = None):
+    """
+    the status of the job over the range and the result of every one of its hashes, in one response
+    (jobs of other algorithms can have the same range, hash_type tells them apart)
+    """
+    minion = get_minion_cracker()
+    rows = minion.db.get_hash_jobs_by_range(start_range, end_range, hash_type.value if hash_type else None)
+    if not rows:
+        minion.logger.warning(f"Status check failed: Job not found for range: {start_range} to {end_range}")
+        raise HTTPException(status_code=404, detail="Job not found")
+    status = CrackStatus(
+        status="InProgress" if any(job_status == "InProgress" for _, job_status, _ in rows) else "Completed",
+        hashes={hash_value: password if password else False for hash_value, _, password in rows}
+    )
+    minion.logger.debug(f"Status for range {start_range} to {end_range}: {status.status}")
+    return status
+
 def main():
     import sys
     parser = argparse.ArgumentParser(description="MinionCracker Service")
@@ -289,6 +590,8 @@ def main():
     except Exception as e:
         minion_cracker.logger.error(f"Failed to start MinionCracker: {e}")
         sys.exit(1)
+    finally:
+        minion_cracker.shutdown()
 
 def main2():
     NEEDED_HASHES = [
@@ -298,17 +601,13 @@ def main2():
         "87d6a470856a83b0886c721da7e213d7",
         "393a180472b1cd5d8a37c7efa27a3a2d"
     ]
-    DEFAULT_START_PHONE = PhoneNumberValidator(phone_number="052-7500000")
-    DEFAULT_END_PHONE = PhoneNumberValidator(phone_number="052-7501999")
+    DEFAULT_START_PHONE = phone_number_to_int("052-7500000")
+    DEFAULT_END_PHONE = phone_number_to_int("052-7501999")
 
     minion_cracker = MinionCracker()
-    pass_list = minion_cracker.generate_phone_range(
-        start_phone=DEFAULT_START_PHONE,
-        end_phone=DEFAULT_END_PHONE
-    )
-
     return minion_cracker.multi_processing_job(
-        password_list=pass_list,
+        start_phone=DEFAULT_START_PHONE,
+        end_phone=DEFAULT_END_PHONE,
         needed_hashes=NEEDED_HASHES
     )
 
@@ -0,0 +1,25 @@
+from typing import Dict, Iterable, Optional
+
+
+class DigestMatcher:
+    """
+    Keeps the target hashes of a job as a set of raw digests, so checking a candidate is a single
+    set lookup no matter how many targets the job carries. Only matching digests get hex encoded back.
+    """
+    def __init__(self, hashes: Iterable[str]):
+        self.targets: Dict[bytes, str] = {}
+        for hash_value in hashes:
+            try:
+                self.targets[bytes.fromhex(hash_value)] = hash_value
+            except ValueError:
+                pass  # not a hex digest, it can never be matched
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self.targets
+
+    def match(self, digest: bytes) -> Optional[str]:
+        """returns the target hash exactly as it was requested (keeps its original casing)"""
+        return self.targets.get(digest)
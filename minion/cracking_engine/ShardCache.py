@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.crack_objects import HashEntry
+from common.hashing import get_hashlib_func
+from minion.cracking_engine.phone_candidates import int_to_phone_number
+from minion.cracking_engine.scanners import iter_range_digests
+
+# A shard holds every digest of one (algorithm, range) as sorted records of
+# KEY_SIZE bytes of truncated digest + the phone number as an offset from the shard start.
+KEY_SIZE = 8
+OFFSET_SIZE = 4
+RECORD_SIZE = KEY_SIZE + OFFSET_SIZE
+SHARD_FILE_SUFFIX = ".shard"
+STOP_CHECK_INTERVAL = 1000  # candidates between should_stop polls while building a shard
+
+
+def shard_path(cache_dir: str, hash_type: str, start_offset: int, end_offset: int) -> str:
+    return os.path.join(cache_dir, hash_type, f"{start_offset}-{end_offset}{SHARD_FILE_SUFFIX}")
+
+
+def build_shard(hash_func, start_offset: int, end_offset: int,
+                should_stop: Callable[[], bool] = None) -> Optional[bytes]:
+    """returns the sorted records of the range, None if the scan was stopped before it finished"""
+    records = []
+    for number, digest in iter_range_digests(hash_func, start_offset, end_offset):
+        if should_stop and (number - start_offset) % STOP_CHECK_INTERVAL == 0 and should_stop():
+            return None
+        records.append(digest[:KEY_SIZE] + (number - start_offset).to_bytes(OFFSET_SIZE, "little"))
+    records.sort()
+    return b"".join(records)
+
+
+def write_shard(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "wb") as f:
+        f.write(data)
+    os.replace(partial_path, path)
+
+
+def read_shard(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def lookup_shard(data: bytes, hash_func, shard_start: int, digest: bytes) -> Optional[int]:
+    """returns the phone number whose digest is `digest`, verified with the full hash"""
+    key = digest[:KEY_SIZE]
+    low, high = 0, len(data) // RECORD_SIZE
+    while low < high:
+        middle = (low + high) // 2
+        if data[middle * RECORD_SIZE:middle * RECORD_SIZE + KEY_SIZE] < key:
+            low = middle + 1
+        else:
+            high = middle
+
+    # truncated digests may collide
+    while data[low * RECORD_SIZE:low * RECORD_SIZE + KEY_SIZE] == key:
+        position = low * RECORD_SIZE + KEY_SIZE
+        number = shard_start + int.from_bytes(data[position:position + OFFSET_SIZE], "little")
+        if hash_func(int_to_phone_number(number).encode("ascii")).digest() == digest:
+            return number
+        low += 1
+    return None
+
+
+def scan_and_store_range(cache_dir: str, algorithms: List[Tuple[str, Callable, Dict[bytes, str]]],
+                         start_offset: int, end_offset: int, should_stop: Callable[[], bool] = None) -> List[HashEntry]:
+    """
+    Worker side of the cache: the range is hashed with every (hash type, hashlib constructor, targets) algorithm
+    of the job, even the ones with no targets left, and stored as a shard before its targets are matched.
+    Ranges that already have a shard are only looked up.
+    """
+    results = []
+    for hash_type, hash_func, targets in algorithms:
+        path = shard_path(cache_dir, hash_type, start_offset, end_offset)
+        data = read_shard(path)
+        if data is None:
+            data = build_shard(hash_func, start_offset, end_offset, should_stop=should_stop)
+            if data is None:
+                break
+            write_shard(path, data)
+        results.extend(match_shard(data, hash_func, start_offset, targets, start_offset, end_offset))
+    return results
+
+
+def match_shard(data: bytes, hash_func, shard_start: int, targets: Dict[bytes, str],
+                start_offset: int, end_offset: int) -> List[HashEntry]:
+    """pops and returns the targets whose password is in both the shard and [start_offset, end_offset]"""
+    results = []
+    for digest in list(targets):
+        number = lookup_shard(data, hash_func, shard_start, digest)
+        if number is not None and start_offset <= number <= end_offset:
+            results.append(HashEntry(hash=targets.pop(digest), password=int_to_phone_number(number)))
+    return results
+
+
+class ShardCache:
+    """
+    On-disk cache of the digests computed by normal jobs, the worker processes write a shard for every chunk
+    they scan and the minion answers later requests for covered ranges by lookup.
+    The most recently used shards are kept in memory, the least recently used files are deleted
+    once the cache grows over max_bytes.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int, hot_shards: int = 16):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hot_shards = hot_shards
+        self._lock = threading.Lock()
+        self._shards: Dict[str, List[Tuple[int, int]]] = {}  # hash type -> sorted (start, end) of its shards
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self.refresh()
+
+    def refresh(self):
+        """picks up the shards written by the workers and evicts old ones if the cache is over its size cap"""
+        with self._lock:
+            shards = {}
+            files = []
+            for hash_type in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+                type_dir = os.path.join(self.cache_dir, hash_type)
+                if not os.path.isdir(type_dir):
+                    continue
+                for file_name in os.listdir(type_dir):
+                    if not file_name.endswith(SHARD_FILE_SUFFIX):
+                        continue
+                    path = os.path.join(type_dir, file_name)
+                    try:
+                        start_offset, end_offset = map(int, file_name[:-len(SHARD_FILE_SUFFIX)].split("-"))
+                        stat = os.stat(path)
+                    except (ValueError, OSError):
+                        continue
+                    last_used = max(stat.st_mtime, self._last_used.get(path, 0))
+                    files.append((last_used, stat.st_size, hash_type, start_offset, end_offset))
+                    shards.setdefault(hash_type, []).append((start_offset, end_offset))
+
+            total_bytes = sum(file[1] for file in files)
+            for _, size, hash_type, start_offset, end_offset in sorted(files):
+                if total_bytes <= self.max_bytes:
+                    break
+                path = shard_path(self.cache_dir, hash_type, start_offset, end_offset)
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total_bytes -= size
+                shards[hash_type].remove((start_offset, end_offset))
+                self._hot.pop(path, None)
+                self._last_used.pop(path, None)
+
+            self._shards = {hash_type: sorted(ranges) for hash_type, ranges in shards.items()}
+
+    def _covering_shards(self, hash_type: str, start_offset: int, end_offset: int) -> Optional[List[Tuple[int, int]]]:
+        covering = []
+        next_uncovered = start_offset
+        for shard_start, shard_end in self._shards.get(hash_type, []):
+            if next_uncovered > end_offset:
+                break
+            if shard_start <= next_uncovered <= shard_end:
+                covering.append((shard_start, shard_end))
+                next_uncovered = shard_end + 1
+        return covering if next_uncovered > end_offset else None
+
+    def covers(self, hash_type: str, start_offset: int, end_offset: int) -> bool:
+        with self._lock:
+            return self._covering_shards(hash_type, start_offset, end_offset) is not None
+
+    def _load(self, path: str) -> Optional[bytes]:
+        with self._lock:
+            self._last_used[path] = time.time()
+            data = self._hot.get(path)
+            if data is not None:
+                self._hot.move_to_end(path)
+                return data
+        data = read_shard(path)
+        if data is None:
+            return None
+        with self._lock:
+            self._hot[path] = data
+            while len(self._hot) > self.hot_shards:
+                self._hot.popitem(last=False)
+        return data
+
+    def lookup(self, hash_type: str, hashes: List[str], start_offset: int, end_offset: int) -> Optional[List[HashEntry]]:
+        """
+        Answers a range fully covered by shards. Returns the found hashes,
+        or None if the range isn't covered (or a shard is gone) and has to be hashed.
+        """
+        with self._lock:
+            covering = self._covering_shards(hash_type, start_offset, end_offset)
+        if covering is None:
+            return None
+
+        hash_func = get_hashlib_func(hash_type)
+        targets = {}
+        for hash_value in hashes:
+            try:
+                targets[bytes.fromhex(hash_value)] = hash_value
+            except ValueError:
+                continue
+
+        results = []
+        for shard_start, shard_end in covering:
+            if not targets:
+                break
+            data = self._load(shard_path(self.cache_dir, hash_type, shard_start, shard_end))
+            if data is None:
+                return None
+            results.extend(match_shard(data, hash_func, shard_start, targets, start_offset, end_offset))
+        return results
@@ -0,0 +1,253 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.crack_objects import HashEntry
+from common.hashing import get_hashlib_func
+from minion.cracking_engine.DigestMatcher import DigestMatcher
+from minion.cracking_engine.phone_candidates import chunk_phone_range, clamp_phone_range
+from minion.cracking_engine.scanners import DEFAULT_HASH_STRATEGY, get_scanner, resolve_hash_strategy
+from minion.cracking_engine.ShardCache import scan_and_store_range
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get("MINION_CHUNK_SIZE", 10000))
+WORKER_CHECK_INTERVAL = 1  # seconds between liveness checks while waiting for results
+
+logger = logging.getLogger("MinionCracker")
+
+
+def _worker_main(control_queue, task_queue, result_queue, stop_flag, strategy, shard_cache_dir=None):
+    """
+    Runs inside every pool process. The targets are pushed once per change through the worker's own
+    control queue and stay resident, range tasks only carry (run_id, generation, start, end).
+    A run is stopped by setting the shared stop_flag to its run_id.
+    With a shard_cache_dir every chunk is stored as digest shards (see ShardCache) instead of plainly scanned.
+    """
+    generation = 0
+    resident_hash_types = []
+    resident_algorithms = []
+    scanner = get_scanner(strategy)
+
+    current_run_id = None
+    remaining_algorithms = []
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        run_id, task_generation, start_offset, end_offset = task
+
+        try:
+            while generation < task_generation:
+                generation, targets_by_hash_type = control_queue.get()
+                resident_hash_types = list(targets_by_hash_type)
+                resident_algorithms = [
+                    (get_hashlib_func(hash_type), DigestMatcher(hashes).targets)
+                    for hash_type, hashes in targets_by_hash_type.items()
+                ]
+
+            if run_id != current_run_id:
+                # targets found by this worker in earlier chunks of the same run are not searched again
+                current_run_id = run_id
+                remaining_algorithms = [(hash_func, dict(targets)) for hash_func, targets in resident_algorithms]
+
+            found = []
+            if stop_flag.value != run_id:
+                should_stop = lambda: stop_flag.value == run_id
+                if shard_cache_dir:
+                    found = scan_and_store_range(
+                        shard_cache_dir,
+                        [(hash_type, hash_func, targets)
+                         for hash_type, (hash_func, targets) in zip(resident_hash_types, remaining_algorithms)],
+                        start_offset, end_offset, should_stop=should_stop
+                    )
+                else:
+                    found = scanner(remaining_algorithms, start_offset, end_offset, should_stop=should_stop)
+            result_queue.put((run_id, start_offset, end_offset, found, None))
+        except Exception as e:
+            result_queue.put((run_id, start_offset, end_offset, [], repr(e)))
+
+
+class WorkerPool:
+    """
+    Long-lived pool of cracking processes, started once with the minion and reused by every job.
+    """
+    def __init__(self, max_workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE, strategy: str = DEFAULT_HASH_STRATEGY,
+                 shard_cache_dir: str = None):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.strategy = resolve_hash_strategy(strategy)
+        self.shard_cache_dir = shard_cache_dir
+
+        self._context = multiprocessing.get_context()
+        self._processes = []
+        self._control_queues = []
+        self._task_queue = None
+        self._result_queue = None
+
+        self._generation = 0
+        self._targets_key: Optional[Tuple[Tuple[str, Tuple[str, ...]], ...]] = None
+        self._run_id = 0
+        self._lock = threading.Lock()
+
+        # state of the running job, shared with cancel_targets() which is called from other threads
+        self._stop_flag = self._context.RawValue('q', 0)
+        self._run_state_lock = threading.Lock()
+        self._unresolved_targets = set()
+
+    def is_running(self) -> bool:
+        return bool(self._processes) and all(process.is_alive() for process in self._processes)
+
+    def start(self):
+        if self.is_running():
+            return
+        self.stop()
+
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        for _ in range(self.max_workers):
+            control_queue = self._context.Queue()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(control_queue, self._task_queue, self._result_queue, self._stop_flag, self.strategy,
+                      self.shard_cache_dir),
+                daemon=True
+            )
+            process.start()
+            self._control_queues.append(control_queue)
+            self._processes.append(process)
+        logger.info(f"Started worker pool with {self.max_workers} workers ({self.strategy} hashing)")
+
+    def stop(self):
+        if self._task_queue is not None:
+            for process in self._processes:
+                if process.is_alive():
+                    self._task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+        self._processes = []
+        self._control_queues = []
+        self._task_queue = None
+        self._result_queue = None
+        self._generation = 0
+        self._targets_key = None
+
+    def _set_targets(self, targets_by_hash_type: Dict[str, List[str]]):
+        targets_key = tuple(sorted((hash_type, tuple(hashes)) for hash_type, hashes in targets_by_hash_type.items()))
+        if targets_key == self._targets_key:
+            return
+        for hash_type in targets_by_hash_type:
+            get_hashlib_func(hash_type)  # fail here on an unsupported hash type, not in every worker
+        self._generation += 1
+        self._targets_key = targets_key
+        for control_queue in self._control_queues:
+            control_queue.put((self._generation, {hash_type: list(hashes) for hash_type, hashes in targets_by_hash_type.items()}))
+
+    def _wait_for_result(self):
+        while True:
+            try:
+                return self._result_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                if not self.is_running():
+                    self.stop()  # the next run starts a fresh pool
+                    raise RuntimeError("A worker process died while running a job")
+
+    def cancel_targets(self, hashes: List[str]) -> bool:
+        """
+        Marks hashes of the running job as resolved elsewhere. Once every target of the job is resolved
+        the workers stop within one block of candidates. Returns True if the running job was stopped.
+        """
+        with self._run_state_lock:
+            if not self._unresolved_targets:
+                return False
+            self._unresolved_targets.difference_update(hashes)
+            if self._unresolved_targets:
+                return False
+            self._stop_flag.value = self._run_id
+            return True
+
+    def _resolve_targets(self, hashes: List[str]):
+        with self._run_state_lock:
+            self._unresolved_targets.difference_update(hashes)
+            if not self._unresolved_targets:
+                self._stop_flag.value = self._run_id
+
+    def is_stopped(self) -> bool:
+        return self._stop_flag.value == self._run_id
+
+    def run(self, start_offset: int, end_offset: int, targets_by_hash_type: Dict[str, List[str]],
+            max_workers: int = None, chunk_size: int = None,
+            on_progress: Callable[[int, List[HashEntry]], None] = None) -> List[HashEntry]:
+        """
+        Scans [start_offset, end_offset] in chunks over the pool and returns every match.
+        targets_by_hash_type maps an algorithm to its target hashes, every candidate is generated once
+        and hashed by each algorithm that still has targets.
+        max_workers limits the chunks in flight (at most the pool size).
+        The run ends early once every hash is found or cancelled.
+        on_progress(scanned_up_to, found) is called after every chunk, with the highest offset below which
+        every chunk is done and the matches of that chunk.
+        """
+        with self._lock:
+            try:
+                return self._run(start_offset, end_offset, targets_by_hash_type, max_workers, chunk_size, on_progress)
+            finally:
+                with self._run_state_lock:
+                    self._unresolved_targets = set()
+
+    def _run(self, start_offset, end_offset, targets_by_hash_type, max_workers, chunk_size, on_progress):
+        self.start()
+        self._set_targets(targets_by_hash_type)
+        with self._run_state_lock:
+            self._run_id += 1
+            self._unresolved_targets = {hash_value for hashes in targets_by_hash_type.values() for hash_value in hashes}
+
+        in_flight_limit = min(max_workers or self.max_workers, self.max_workers)
+        start_offset, end_offset = clamp_phone_range(start_offset, end_offset)
+        chunks = chunk_phone_range(start_offset, end_offset, chunk_size or self.chunk_size)
+        results: List[HashEntry] = []
+        errors = []
+        in_flight = 0
+
+        # chunks finish out of order, only the contiguous prefix of finished chunks counts as scanned
+        finished_chunks = {}
+        next_unscanned = start_offset
+
+        def submit_next() -> bool:
+            if self.is_stopped():
+                return False
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            self._task_queue.put((self._run_id, self._generation, chunk[0], chunk[1]))
+            return True
+
+        while in_flight < in_flight_limit and submit_next():
+            in_flight += 1
+
+        while in_flight:
+            run_id, chunk_start, chunk_end, found, error = self._wait_for_result()
+            if run_id != self._run_id:
+                continue  # left over from an aborted run
+            in_flight -= 1
+            if error:
+                errors.append(f"{chunk_start}-{chunk_end}: {error}")
+            else:
+                finished_chunks[chunk_start] = chunk_end
+                while next_unscanned in finished_chunks:
+                    next_unscanned = finished_chunks.pop(next_unscanned) + 1
+            results.extend(found)
+            if found:
+                self._resolve_targets([entry.hash for entry in found])
+            if on_progress:
+                on_progress(next_unscanned - 1, found)
+            if submit_next():
+                in_flight += 1
+
+        if errors:
+            raise RuntimeError(f"Worker pool failed on {len(errors)} chunks: {errors[0]}")
+        return results
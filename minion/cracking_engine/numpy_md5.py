@@ -0,0 +1,157 @@
+"""
+Lane-parallel MD5 over NumPy uint32 arrays.
+
+Every phone candidate ("052-7500000") is an 11 byte message, so its MD5 is a single compression of one
+padded 64 byte block. Each of the 16 message words is built for all candidates at once and the 64 MD5
+steps run over whole arrays, so one call hashes as many candidates as fit in memory.
+NumPy is optional, NUMPY_AVAILABLE is False when it is not installed.
+"""
+import hashlib
+import math
+import random
+from typing import Callable, Dict, List
+
+from common.crack_objects import HashEntry
+from minion.cracking_engine.phone_candidates import MAX_PHONE_NUMBER, MIN_PHONE_NUMBER, clamp_phone_range, int_to_phone_number
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+DEFAULT_BATCH_SIZE = 1 << 16  # lanes per call, bigger batches fall out of the cpu cache and get slower
+
+_SHIFTS = (
+    [7, 12, 17, 22] * 4 +
+    [5, 9, 14, 20] * 4 +
+    [4, 11, 16, 23] * 4 +
+    [6, 10, 15, 21] * 4
+)
+_CONSTANTS = [int(abs(math.sin(i + 1)) * 2 ** 32) & 0xFFFFFFFF for i in range(64)]
+_INIT_STATE = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476)
+
+_MESSAGE_BIT_LENGTH = 11 * 8
+_ASCII_ZERO = ord("0")
+
+
+def _message_word_index(step: int) -> int:
+    if step < 16:
+        return step
+    if step < 32:
+        return (5 * step + 1) % 16
+    if step < 48:
+        return (3 * step + 5) % 16
+    return (7 * step) % 16
+
+
+def _candidate_words(numbers):
+    """builds the 3 non constant message words of every candidate, the rest of the block is padding"""
+    numbers = numbers.astype(np.uint32)
+    digits = [(numbers // np.uint32(10 ** (8 - position))) % np.uint32(10) + np.uint32(_ASCII_ZERO) for position in range(9)]
+    word0 = np.uint32(_ASCII_ZERO) | (digits[0] << np.uint32(8)) | (digits[1] << np.uint32(16)) | np.uint32(ord("-") << 24)
+    word1 = digits[2] | (digits[3] << np.uint32(8)) | (digits[4] << np.uint32(16)) | (digits[5] << np.uint32(24))
+    word2 = digits[6] | (digits[7] << np.uint32(8)) | (digits[8] << np.uint32(16)) | np.uint32(0x80 << 24)
+    return word0, word1, word2
+
+
+def md5_phone_numbers(numbers):
+    """
+    Returns the 4 little endian MD5 state words (a, b, c, d) of every candidate in `numbers`,
+    the digest of candidate i is a[i] | b[i] | c[i] | d[i] as little endian bytes.
+    """
+    numbers = np.asarray(numbers)
+    message = [None] * 16
+    message[0], message[1], message[2] = _candidate_words(numbers)
+    message[14] = _MESSAGE_BIT_LENGTH
+
+    lanes = numbers.shape[0]
+    a, b, c, d = (np.full(lanes, value, dtype=np.uint32) for value in _INIT_STATE)
+    f = np.empty(lanes, dtype=np.uint32)
+    scratch = np.empty(lanes, dtype=np.uint32)
+    # every step is done in place on preallocated lanes, the old `a` buffer receives the new `b`
+    for step in range(64):
+        if step < 16:
+            np.bitwise_and(b, c, out=f)
+            np.invert(b, out=scratch)
+            scratch &= d
+            f |= scratch
+        elif step < 32:
+            np.bitwise_and(d, b, out=f)
+            np.invert(d, out=scratch)
+            scratch &= c
+            f |= scratch
+        elif step < 48:
+            np.bitwise_xor(b, c, out=f)
+            f ^= d
+        else:
+            np.invert(d, out=f)
+            f |= b
+            f ^= c
+
+        word = message[_message_word_index(step)]
+        if word is None:
+            f += np.uint32(_CONSTANTS[step])
+        elif isinstance(word, int):
+            f += np.uint32((_CONSTANTS[step] + word) & 0xFFFFFFFF)
+        else:
+            f += np.uint32(_CONSTANTS[step])
+            f += word
+        f += a
+
+        shift = _SHIFTS[step]
+        np.left_shift(f, np.uint32(shift), out=scratch)
+        f >>= np.uint32(32 - shift)
+        f |= scratch
+        np.add(b, f, out=a)
+        a, b, c, d = d, a, b, c
+
+    a += np.uint32(_INIT_STATE[0])
+    b += np.uint32(_INIT_STATE[1])
+    c += np.uint32(_INIT_STATE[2])
+    d += np.uint32(_INIT_STATE[3])
+    return a, b, c, d
+
+
+def scan_range_md5(targets: Dict[bytes, str], start_offset: int, end_offset: int,
+                   batch_size: int = DEFAULT_BATCH_SIZE, should_stop: Callable[[], bool] = None) -> List[HashEntry]:
+    """
+    Compares the first digest word of every candidate against the targets in vectorized form,
+    only the few lanes that hit are confirmed with hashlib.
+    """
+    results = []
+    if not targets:
+        return results
+    target_words = np.array(
+        sorted({int.from_bytes(digest[:4], "little") for digest in targets if len(digest) == 16}),
+        dtype=np.uint32
+    )
+    if not target_words.size:
+        return results
+
+    start_offset, end_offset = clamp_phone_range(start_offset, end_offset)
+    for batch_start in range(start_offset, end_offset + 1, batch_size):
+        if not targets or (should_stop and should_stop()):
+            break
+        batch_end = min(batch_start + batch_size - 1, end_offset)
+        numbers = np.arange(batch_start, batch_end + 1, dtype=np.uint32)
+        first_words = md5_phone_numbers(numbers)[0]
+        for lane in np.flatnonzero(np.isin(first_words, target_words)):
+            password = int_to_phone_number(int(numbers[lane]))
+            digest = hashlib.md5(password.encode("ascii")).digest()
+            if digest in targets:
+                results.append(HashEntry(hash=targets.pop(digest), password=password))
+    return results
+
+
+def self_check(samples: int = 4096) -> bool:
+    """compares the kernel's digests against hashlib.md5 on random candidates (and the keyspace edges)"""
+    if not NUMPY_AVAILABLE:
+        return False
+    numbers = [MIN_PHONE_NUMBER, MAX_PHONE_NUMBER] + [random.randint(MIN_PHONE_NUMBER, MAX_PHONE_NUMBER) for _ in range(samples)]
+    words = md5_phone_numbers(np.array(numbers, dtype=np.uint32))
+    for lane, number in enumerate(numbers):
+        digest = b"".join(int(word[lane]).to_bytes(4, "little") for word in words)
+        if digest != hashlib.md5(int_to_phone_number(number).encode("ascii")).digest():
+            return False
+    return True
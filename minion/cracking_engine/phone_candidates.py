@@ -0,0 +1,57 @@
+from typing import Iterator, Tuple
+
+from common.crack_objects.PhoneNumber import MAX_PHONE_NUMBER, MIN_PHONE_NUMBER, int_to_phone_number, phone_number_to_int
+
+# the last 3 digits of every candidate are written from this table, the first 8 bytes ("052-7500") once per block
+CANDIDATE_BLOCK_SIZE = 1000
+CANDIDATE_PREFIX_LENGTH = 8
+_SUFFIXES = tuple(f"{i:03d}".encode("ascii") for i in range(CANDIDATE_BLOCK_SIZE))
+
+
+def clamp_phone_range(start: int, end: int) -> Tuple[int, int]:
+    if start > end:
+        start, end = end, start
+    return max(start, MIN_PHONE_NUMBER), min(end, MAX_PHONE_NUMBER)
+
+
+def iter_candidate_blocks(start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yields (block_start, low, high) for every block of CANDIDATE_BLOCK_SIZE numbers that intersects [start, end],
+    low and high are the in-block offsets of the first and last number of the range inside that block.
+    """
+    start, end = clamp_phone_range(start, end)
+    block_start = start - start % CANDIDATE_BLOCK_SIZE
+    while block_start <= end:
+        low = max(start, block_start) - block_start
+        high = min(end, block_start + CANDIDATE_BLOCK_SIZE - 1) - block_start
+        yield block_start, low, high
+        block_start += CANDIDATE_BLOCK_SIZE
+
+
+def candidate_prefix(block_start: int) -> bytes:
+    return int_to_phone_number(block_start)[:CANDIDATE_PREFIX_LENGTH].encode("ascii")
+
+
+def iter_phone_candidates(start: int, end: int) -> Iterator[bytearray]:
+    """
+    Yields every phone number in [start, end] as ascii bytes (b"052-7500000").
+    The same bytearray is mutated and yielded again on every iteration, copy it if you need to keep it.
+    """
+    start, end = clamp_phone_range(start, end)
+    if start > end:
+        return
+
+    buffer = bytearray(int_to_phone_number(start).encode("ascii"))
+    for block_start, low, high in iter_candidate_blocks(start, end):
+        buffer[:CANDIDATE_PREFIX_LENGTH] = candidate_prefix(block_start)
+        suffixes = _SUFFIXES if low == 0 and high == CANDIDATE_BLOCK_SIZE - 1 else _SUFFIXES[low:high + 1]
+        for suffix in suffixes:
+            buffer[CANDIDATE_PREFIX_LENGTH:] = suffix
+            yield buffer
+
+
+def chunk_phone_range(start: int, end: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    start, end = clamp_phone_range(start, end)
+    chunk_size = max(1, chunk_size)
+    for chunk_start in range(start, end + 1, chunk_size):
+        yield chunk_start, min(chunk_start + chunk_size - 1, end)
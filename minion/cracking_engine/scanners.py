@@ -0,0 +1,221 @@
+import logging
+import os
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from common.crack_objects import HashEntry
+from minion.cracking_engine import numpy_md5
+from minion.cracking_engine.phone_candidates import (
+    CANDIDATE_BLOCK_SIZE, candidate_prefix, int_to_phone_number, iter_candidate_blocks, iter_phone_candidates
+)
+
+DIRECT_STRATEGY = "direct"
+MIDSTATE_STRATEGY = "midstate"
+NUMPY_STRATEGY = "numpy"
+DEFAULT_HASH_STRATEGY = os.environ.get("MINION_HASH_STRATEGY", MIDSTATE_STRATEGY)
+
+logger = logging.getLogger("MinionCracker")
+
+# (hashlib constructor, raw digest -> requested hash) of one algorithm
+Algorithm = Tuple[Callable, Dict[bytes, str]]
+
+_DIGITS = tuple(str(digit).encode("ascii") for digit in range(10))
+# batches of scan_range_numpy are whole candidate blocks, so the midstate walk never gets a partial block inside the range
+NUMPY_BATCH_SIZE = max(1, numpy_md5.DEFAULT_BATCH_SIZE // CANDIDATE_BLOCK_SIZE) * CANDIDATE_BLOCK_SIZE
+
+
+def _live(algorithms: List[Algorithm]) -> List[Algorithm]:
+    """only the algorithms that still have targets left are hashed"""
+    return [algorithm for algorithm in algorithms if algorithm[1]]
+
+
+def _scan_direct(algorithms: List[Algorithm], start_offset: int, end_offset: int, results: List[HashEntry]) -> List[Algorithm]:
+    algorithms = _live(algorithms)
+    for candidate in iter_phone_candidates(start_offset, end_offset):
+        for hash_func, targets in algorithms:
+            digest = hash_func(candidate).digest()
+            if digest in targets:
+                results.append(HashEntry(hash=targets.pop(digest), password=candidate.decode('ascii')))
+                if not targets:
+                    algorithms = _live(algorithms)
+                    if not algorithms:
+                        return algorithms
+    return algorithms
+
+
+def scan_range(algorithms: List[Algorithm], start_offset: int, end_offset: int,
+               should_stop: Callable[[], bool] = None) -> List[HashEntry]:
+    """
+    Every candidate is generated once and hashed by each algorithm that still has targets.
+    Scanners pop the targets they find out of the algorithms' target dicts and return as soon as none are left,
+    `should_stop` is polled once per block of candidates.
+    """
+    results = []
+    algorithms = _live(algorithms)
+    for block_start, low, high in iter_candidate_blocks(start_offset, end_offset):
+        if not algorithms or (should_stop and should_stop()):
+            break
+        algorithms = _scan_direct(algorithms, block_start + low, block_start + high, results)
+    return results
+
+
+def _midstate_block(hash_func, targets: Dict[bytes, str], block_start: int, results: List[HashEntry]):
+    block_hash = hash_func(candidate_prefix(block_start))
+    for hundreds, hundreds_digit in enumerate(_DIGITS):
+        hundreds_hash = block_hash.copy()
+        hundreds_hash.update(hundreds_digit)
+        for tens, tens_digit in enumerate(_DIGITS):
+            tens_hash = hundreds_hash.copy()
+            tens_hash.update(tens_digit)
+            for units, units_digit in enumerate(_DIGITS):
+                candidate_hash = tens_hash.copy()
+                candidate_hash.update(units_digit)
+                digest = candidate_hash.digest()
+                if digest in targets:
+                    password = int_to_phone_number(block_start + hundreds * 100 + tens * 10 + units)
+                    results.append(HashEntry(hash=targets.pop(digest), password=password))
+                    if not targets:
+                        return
+
+
+def _child_hashes(parent_hashes, digit: bytes):
+    """extends the state of every algorithm that still has targets (found or cancelled ones are dropped) by digit"""
+    child_hashes = []
+    for parent_hash, targets in parent_hashes:
+        if targets:
+            node_hash = parent_hash.copy()
+            node_hash.update(digit)
+            child_hashes.append((node_hash, targets))
+    return child_hashes
+
+
+def _midstate_block_multi(algorithms: List[Algorithm], block_start: int, results: List[HashEntry]):
+    prefix = candidate_prefix(block_start)
+    block_hashes = [(hash_func(prefix), targets) for hash_func, targets in algorithms]
+    for hundreds, hundreds_digit in enumerate(_DIGITS):
+        hundreds_hashes = _child_hashes(block_hashes, hundreds_digit)
+        if not hundreds_hashes:
+            return
+        for tens, tens_digit in enumerate(_DIGITS):
+            tens_hashes = _child_hashes(hundreds_hashes, tens_digit)
+            if not tens_hashes:
+                return
+            for units, units_digit in enumerate(_DIGITS):
+                for parent_hash, targets in tens_hashes:
+                    if not targets:
+                        continue
+                    candidate_hash = parent_hash.copy()
+                    candidate_hash.update(units_digit)
+                    digest = candidate_hash.digest()
+                    if digest in targets:
+                        password = int_to_phone_number(block_start + hundreds * 100 + tens * 10 + units)
+                        results.append(HashEntry(hash=targets.pop(digest), password=password))
+
+
+def scan_range_midstate(algorithms: List[Algorithm], start_offset: int, end_offset: int,
+                        should_stop: Callable[[], bool] = None) -> List[HashEntry]:
+    """
+    Walks the candidates as a prefix tree over their last 3 digit positions: the shared prefix of a block
+    ("052-7500") is fed into each algorithm once, and every deeper digit only copies its parent's state and adds
+    one byte. Partial blocks at the edges of the range are scanned directly.
+    """
+    results = []
+    algorithms = _live(algorithms)
+    for block_start, low, high in iter_candidate_blocks(start_offset, end_offset):
+        if not algorithms or (should_stop and should_stop()):
+            break
+        if low != 0 or high != CANDIDATE_BLOCK_SIZE - 1:
+            algorithms = _scan_direct(algorithms, block_start + low, block_start + high, results)
+            continue
+
+        if len(algorithms) == 1:
+            _midstate_block(algorithms[0][0], algorithms[0][1], block_start, results)
+        else:
+            _midstate_block_multi(algorithms, block_start, results)
+        algorithms = _live(algorithms)
+    return results
+
+
+def iter_range_digests(hash_func, start_offset: int, end_offset: int) -> Iterator[Tuple[int, bytes]]:
+    """yields (phone number, digest) of every candidate in the range, walked like scan_range_midstate"""
+    for block_start, low, high in iter_candidate_blocks(start_offset, end_offset):
+        if low != 0 or high != CANDIDATE_BLOCK_SIZE - 1:
+            for number, candidate in enumerate(iter_phone_candidates(block_start + low, block_start + high),
+                                               block_start + low):
+                yield number, hash_func(candidate).digest()
+            continue
+
+        block_hash = hash_func(candidate_prefix(block_start))
+        number = block_start
+        for hundreds_digit in _DIGITS:
+            hundreds_hash = block_hash.copy()
+            hundreds_hash.update(hundreds_digit)
+            for tens_digit in _DIGITS:
+                tens_hash = hundreds_hash.copy()
+                tens_hash.update(tens_digit)
+                for units_digit in _DIGITS:
+                    candidate_hash = tens_hash.copy()
+                    candidate_hash.update(units_digit)
+                    yield number, candidate_hash.digest()
+                    number += 1
+
+
+def scan_range_numpy(algorithms: List[Algorithm], start_offset: int, end_offset: int,
+                     should_stop: Callable[[], bool] = None) -> List[HashEntry]:
+    """
+    One pass over the range in batches of whole candidate blocks: MD5 runs on the vectorized NumPy kernel and
+    the other algorithms walk the same batch with midstates, before the pass moves on to the next batch.
+    """
+    md5_targets = None
+    hashlib_algorithms = []
+    for hash_func, targets in _live(algorithms):
+        if numpy_md5.NUMPY_AVAILABLE and hash_func().name == "md5":
+            md5_targets = targets
+        else:
+            hashlib_algorithms.append((hash_func, targets))
+    if md5_targets is None:
+        return scan_range_midstate(hashlib_algorithms, start_offset, end_offset, should_stop=should_stop)
+
+    results = []
+    batch_start = start_offset
+    while batch_start <= end_offset:
+        hashlib_algorithms = _live(hashlib_algorithms)
+        if not (md5_targets or hashlib_algorithms) or (should_stop and should_stop()):
+            break
+        batch_end = min(end_offset, (batch_start // NUMPY_BATCH_SIZE + 1) * NUMPY_BATCH_SIZE - 1)
+        if md5_targets:
+            results.extend(numpy_md5.scan_range_md5(md5_targets, batch_start, batch_end))
+        if hashlib_algorithms:
+            results.extend(scan_range_midstate(hashlib_algorithms, batch_start, batch_end, should_stop=should_stop))
+        batch_start = batch_end + 1
+    return results
+
+
+SCANNERS = {
+    DIRECT_STRATEGY: scan_range,
+    MIDSTATE_STRATEGY: scan_range_midstate,
+    NUMPY_STRATEGY: scan_range_numpy,
+}
+
+
+def get_scanner(strategy: str):
+    try:
+        return SCANNERS[strategy.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported hash strategy: {strategy}")
+
+
+def resolve_hash_strategy(strategy: str) -> str:
+    """
+    Validates the requested strategy, the NumPy kernel is only used if NumPy is installed
+    and its output matches hashlib.md5, otherwise the minion falls back to midstate hashing.
+    """
+    strategy = strategy.lower()
+    get_scanner(strategy)
+    if strategy == NUMPY_STRATEGY:
+        if not numpy_md5.NUMPY_AVAILABLE:
+            logger.warning("NumPy is not installed, falling back to midstate hashing")
+            return MIDSTATE_STRATEGY
+        if not numpy_md5.self_check():
+            logger.error("NumPy MD5 kernel failed its self check against hashlib.md5, falling back to midstate hashing")
+            return MIDSTATE_STRATEGY
+    return strategy
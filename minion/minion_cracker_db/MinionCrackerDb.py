@@ -1,53 +1,53 @@
 import sqlite3
 from .db_queries import *
+from common.sqlite_db import SqliteConnections, execute_in_transaction
 from common.crack_objects.Job import Job
 
 
 class MinionCrackerDb:
     def __init__(self, db_path="MinionCracker.db"):
         self.db_path = db_path
+        self.connections = SqliteConnections(db_path)
+
+    def transaction(self):
+        """the queries of the calling thread inside the block run as one transaction (see SqliteConnections)"""
+        return self.connections.transaction()
 
     def __select_query(self, query, args=None):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                if args:
-                    cursor.execute(query, args)
-                else:
-                    cursor.execute(query)
-                return cursor.fetchall()
-            except sqlite3.Error as e:
-                print(f"Error executing SELECT query {query}: {e}")
-                return False
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
+                cursor.execute(query)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error executing SELECT query {query}: {e}")
+            return False
 
-    def __execute_query(self, query, args=None, commit=True):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                if args:
-                    cursor.execute(query, args)
-                else:
-                    cursor.execute(query)
-                if commit:
-                    conn.commit()
-                return cursor.lastrowid
-            except sqlite3.Error as e:
-                print(f"Error executing query {query}: {e}")
-                return False
+    def __execute_query(self, query, args=None):
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
+                cursor.execute(query)
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Error executing query {query}: {e}")
+            return False
 
     def __update_query(self, query, args=None):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                if args:
-                    cursor.execute(query, args)
-                else:
-                    cursor.execute(query)
-                conn.commit()
-                return cursor.rowcount
-            except sqlite3.Error as e:
-                print(f"Error executing update query {query}: {e}")
-                return False
+        cursor = self.connections.connection().cursor()
+        try:
+            if args:
+                cursor.execute(query, args)
+            else:
+                cursor.execute(query)
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error executing update query {query}: {e}")
+            return False
 
     def check_tables_exist(self):
         hashes_exists = self.__select_query(check_hashes_table_exists)
@@ -57,10 +57,25 @@ class MinionCrackerDb:
     def create_tables(self):
         self.__execute_query(create_hashes_table)
         self.__execute_query(create_hash_jobs_table)
+        self.__execute_query(create_benchmarks_table)
         return True
 
-    def add_new_hash(self, hash_value, password=""):
-        return self.__execute_query(insert_hash, (hash_value, password))
+    def upgrade_tables(self):
+        columns = self.__select_query(get_hash_jobs_columns) or []
+        if "Checkpoint" not in [column[1] for column in columns]:
+            self.__execute_query(add_hash_jobs_checkpoint_column)
+        columns = self.__select_query(get_hashes_columns) or []
+        if "HashType" not in [column[1] for column in columns]:
+            self.__execute_query(add_hashes_hash_type_column)
+        columns = {column[1]: column[2] for column in self.__select_query(get_hash_jobs_columns) or []}
+        if columns.get("StartRange", "INTEGER").upper() != "INTEGER":
+            execute_in_transaction(self.connections, convert_hash_jobs_ranges_to_integer)
+        if not self.__select_query(check_benchmarks_table_exists):
+            self.__execute_query(create_benchmarks_table)
+        return True
+
+    def add_new_hash(self, hash_value, password="", hash_type="md5"):
+        return self.__execute_query(insert_hash, (hash_value, password, hash_type))
     
     def check_hash_exists(self, hash_value):
         result = self.__select_query(check_hash_exists, (hash_value,))
@@ -84,13 +99,17 @@ class MinionCrackerDb:
     
     def add_hash_job(self, hash_id, start_range, end_range):
         try:
-            return self.__execute_query(insert_hash_job, (int(hash_id), str(start_range), str(end_range)))
+            return self.__execute_query(insert_hash_job, (int(hash_id), int(start_range), int(end_range)))
         except (ValueError, TypeError) as e:
             print(f"Error creating hash job: {e}")
             return False
     
+    def get_hash_jobs_by_range(self, start_range, end_range, hash_type=None):
+        """(hash, status, password) of every hash searched over the range, only hashes of hash_type if given"""
+        return self.__select_query(get_hash_jobs_by_range, (int(start_range), int(end_range), hash_type)) or []
+
     def get_hash_job_by_hash_and_range(self, hash_value, start_range, end_range):
-        rows = self.__select_query(get_hash_job_by_hash_and_range, (hash_value, str(start_range), str(end_range)))
+        rows = self.__select_query(get_hash_job_by_hash_and_range, (hash_value, int(start_range), int(end_range)))
         if not rows:
             return None
         row = rows[0]
@@ -120,6 +139,15 @@ class MinionCrackerDb:
             HashValue=row[5]
         )
     
+    def update_jobs_checkpoint(self, job_ids, checkpoint):
+        try:
+            with self.transaction() as cursor:
+                cursor.executemany(update_job_checkpoint, [(int(checkpoint), job_id) for job_id in job_ids])
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving the checkpoint of jobs {job_ids}: {e}")
+            return False
+
     def delete_jobs_by_hash_id(self, hash_id):
         return self.__execute_query(delete_jobs_by_hash_id, (hash_id,))
 
@@ -134,5 +162,25 @@ class MinionCrackerDb:
             StartRange=row[2],
             EndRange=row[3],
             Status=row[4],
-            HashValue=row[5]
-        ) for row in rows]
\ No newline at end of file
+            HashValue=row[5],
+            Checkpoint=row[6],
+            HashType=row[7]
+        ) for row in rows]
+
+    def save_benchmarks(self, benchmarks):
+        """replaces the cached benchmark with rows of (hash_type, workers, chunk_size, candidates_per_second)"""
+        try:
+            with self.transaction() as cursor:
+                cursor.execute(delete_benchmarks)
+                cursor.executemany(insert_benchmark, benchmarks)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error saving benchmarks: {e}")
+            return False
+
+    def get_benchmarks(self):
+        rows = self.__select_query(get_benchmarks)
+        if not rows:
+            return []
+        return [{"HashType": row[0], "Workers": row[1], "ChunkSize": row[2],
+                 "CandidatesPerSecond": row[3], "CreationTime": row[4]} for row in rows]
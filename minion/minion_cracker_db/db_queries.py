@@ -4,6 +4,11 @@ SELECT name FROM sqlite_master
 WHERE type='table' AND name='Hashes';
 """
 
+check_benchmarks_table_exists = """
+SELECT name FROM sqlite_master 
+WHERE type='table' AND name='Benchmarks';
+"""
+
 check_hash_jobs_table_exists = """
 SELECT name FROM sqlite_master 
 WHERE type='table' AND name='HashJobs';
@@ -14,7 +19,8 @@ create_hashes_table = """
 CREATE TABLE IF NOT EXISTS Hashes (
     Id INTEGER PRIMARY KEY AUTOINCREMENT,
     Hash TEXT NOT NULL UNIQUE,
-    Password TEXT
+    Password TEXT,
+    HashType TEXT DEFAULT 'md5'
 );
 """
 
@@ -22,17 +28,59 @@ create_hash_jobs_table = """
 CREATE TABLE IF NOT EXISTS HashJobs (
     Id INTEGER PRIMARY KEY AUTOINCREMENT,
     HashId INTEGER NOT NULL,
-    StartRange TEXT NOT NULL,
-    EndRange TEXT NOT NULL,
+    StartRange INTEGER NOT NULL,
+    EndRange INTEGER NOT NULL,
     Status TEXT DEFAULT 'InProgress',
+    Checkpoint INTEGER,
     FOREIGN KEY (HashId) REFERENCES Hashes(Id)
 );
 """
 
+create_benchmarks_table = """
+CREATE TABLE IF NOT EXISTS Benchmarks (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    HashType TEXT NOT NULL,
+    Workers INTEGER NOT NULL,
+    ChunkSize INTEGER,
+    CandidatesPerSecond REAL NOT NULL,
+    CreationTime TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Table upgrade queries (for db files created by older versions)
+get_hash_jobs_columns = """
+PRAGMA table_info(HashJobs);
+"""
+
+add_hash_jobs_checkpoint_column = """
+ALTER TABLE HashJobs ADD COLUMN Checkpoint INTEGER;
+"""
+
+get_hashes_columns = """
+PRAGMA table_info(Hashes);
+"""
+
+add_hashes_hash_type_column = """
+ALTER TABLE Hashes ADD COLUMN HashType TEXT DEFAULT 'md5';
+"""
+
+# ranges used to be stored as dashed TEXT ("052-7500000"), the table is rebuilt with INTEGER ranges
+convert_hash_jobs_ranges_to_integer = (
+    "ALTER TABLE HashJobs RENAME TO HashJobsTextRanges;",
+    create_hash_jobs_table,
+    """
+    INSERT INTO HashJobs (Id, HashId, StartRange, EndRange, Status, Checkpoint)
+    SELECT Id, HashId, CAST(REPLACE(StartRange, '-', '') AS INTEGER),
+           CAST(REPLACE(EndRange, '-', '') AS INTEGER), Status, Checkpoint
+    FROM HashJobsTextRanges;
+    """,
+    "DROP TABLE HashJobsTextRanges;",
+)
+
 # Hash related queries
 insert_hash = """
-INSERT OR IGNORE INTO Hashes (Hash, Password)
-VALUES (?, ?);
+INSERT OR IGNORE INTO Hashes (Hash, Password, HashType)
+VALUES (?, ?, ?);
 """
 
 check_hash_exists = """
@@ -68,6 +116,14 @@ JOIN Hashes h ON h.Id = hj.HashId
 WHERE h.Hash = ? AND hj.StartRange = ? AND hj.EndRange = ?;
 """
 
+# every hash searched over a range (of one algorithm unless ?3 is NULL), with its password if it was found
+get_hash_jobs_by_range = """
+SELECT h.Hash, hj.Status, h.Password
+FROM HashJobs hj
+JOIN Hashes h ON h.Id = hj.HashId
+WHERE hj.StartRange = ?1 AND hj.EndRange = ?2 AND (?3 IS NULL OR h.HashType = ?3);
+"""
+
 update_hash_job_status = """
 UPDATE HashJobs
 SET Status = ?
@@ -81,8 +137,15 @@ JOIN Hashes h ON h.Id = hj.HashId
 WHERE hj.Id = ?;
 """
 
+# checkpoints are saved on the rows of the job itself, another job can have the same range (e.g. of another algorithm)
+update_job_checkpoint = """
+UPDATE HashJobs
+SET Checkpoint = ?
+WHERE Id = ? AND Status = 'InProgress';
+"""
+
 get_unfinished_jobs = """
-SELECT hj.Id, hj.HashId, hj.StartRange, hj.EndRange, hj.Status, h.Hash
+SELECT hj.Id, hj.HashId, hj.StartRange, hj.EndRange, hj.Status, h.Hash, hj.Checkpoint, h.HashType
 FROM HashJobs hj
 JOIN Hashes h ON h.Id = hj.HashId
 WHERE hj.Status = 'InProgress'
@@ -91,4 +154,19 @@ WHERE hj.Status = 'InProgress'
 delete_jobs_by_hash_id = """
 DELETE FROM HashJobs
 WHERE HashId = ?;
-"""
\ No newline at end of file
+"""
+
+# Benchmark related queries
+insert_benchmark = """
+INSERT INTO Benchmarks (HashType, Workers, ChunkSize, CandidatesPerSecond)
+VALUES (?, ?, ?, ?);
+"""
+
+get_benchmarks = """
+SELECT HashType, Workers, ChunkSize, CandidatesPerSecond, CreationTime FROM Benchmarks
+ORDER BY Id ASC;
+"""
+
+delete_benchmarks = """
+DELETE FROM Benchmarks;
+"""
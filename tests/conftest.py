@@ -0,0 +1,19 @@
+import pytest
+
+from common.keyspace import Keyspace
+from master import MasterCracker as master_module
+from master.MasterCracker import MasterCracker
+from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface
+from master.scheduler_state.SchedulerState import SchedulerState
+
+
+@pytest.fixture
+def master(tmp_path):
+    # no fleet and no scheduling threads, only the scheduling logic over its own db.
+    # the scheduler state has no writer thread, tests flush it before they read what it wrote
+    master = MasterCracker.__new__(MasterCracker)
+    master.db = MasterCrackerDbInterface(db_path=str(tmp_path / "MasterCracker.db"))
+    master.db.create_tables()
+    master.keyspace = Keyspace(master_module.PHONE_NUM_RANGES)
+    master.state = SchedulerState(master.db)
+    return master
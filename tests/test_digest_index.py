@@ -0,0 +1,60 @@
+import hashlib
+
+import pytest
+
+from common.config.HashesTypes import HashTypes
+from common.crack_objects.PhoneNumber import int_to_phone_number
+from master.digest_index.DigestIndex import DigestIndex, index_file_name, load_digest_indexes
+from master.digest_index.build_index import build_index
+
+START = 527500000
+END = START + 4999
+
+
+def _hex(hash_type: HashTypes, number: int) -> str:
+    return getattr(hashlib, hash_type.value)(int_to_phone_number(number).encode("ascii")).hexdigest()
+
+
+@pytest.fixture(scope="module", params=[HashTypes.MD5, HashTypes.SHA256])
+def index(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("indexes") / index_file_name(request.param))
+    assert build_index(request.param, START, END, path, workers=2, slice_size=1500) == END - START + 1
+    digest_index = DigestIndex(path)
+    yield digest_index
+    digest_index.close()
+
+
+def test_header_describes_the_indexed_range(index):
+    assert (index.start, index.end, index.count) == (START, END, END - START + 1)
+
+
+@pytest.mark.parametrize("number", [START, START + 1, START + 2500, END])
+def test_lookup_finds_indexed_numbers(index, number):
+    assert index.lookup(_hex(index.hash_type, number)) == int_to_phone_number(number)
+    assert index.lookup(_hex(index.hash_type, number).upper()) == int_to_phone_number(number)
+
+
+@pytest.mark.parametrize("number", [START - 1, END + 1])
+def test_lookup_misses_numbers_outside_the_range(index, number):
+    assert index.lookup(_hex(index.hash_type, number)) is None
+
+
+def test_lookup_rejects_digests_of_other_algorithms(index):
+    other = HashTypes.SHA1
+    assert index.lookup(_hex(other, START)) is None
+    assert index.lookup("not a digest") is None
+
+
+def test_load_digest_indexes(tmp_path):
+    assert load_digest_indexes(str(tmp_path / "missing")) == {}
+
+    build_index(HashTypes.MD5, START, START + 999, str(tmp_path / index_file_name(HashTypes.MD5)), workers=1)
+    (tmp_path / index_file_name(HashTypes.SHA1)).write_bytes(b"")
+
+    indexes = load_digest_indexes(str(tmp_path))
+    try:
+        assert list(indexes) == [HashTypes.MD5]
+        assert indexes[HashTypes.MD5].lookup(_hex(HashTypes.MD5, START + 999)) == int_to_phone_number(START + 999)
+    finally:
+        for digest_index in indexes.values():
+            digest_index.close()
@@ -0,0 +1,26 @@
+import hashlib
+
+from minion.cracking_engine.DigestMatcher import DigestMatcher
+
+
+def test_matches_raw_digests_of_the_targets():
+    targets = [hashlib.md5(b"050-0000001").hexdigest(), hashlib.md5(b"050-0000002").hexdigest()]
+    matcher = DigestMatcher(targets)
+
+    assert len(matcher) == 2
+    assert hashlib.md5(b"050-0000001").digest() in matcher
+    assert matcher.match(hashlib.md5(b"050-0000002").digest()) == targets[1]
+    assert matcher.match(hashlib.md5(b"050-0000003").digest()) is None
+
+
+def test_keeps_the_casing_of_the_requested_hash():
+    target = hashlib.md5(b"050-0000001").hexdigest().upper()
+    matcher = DigestMatcher([target])
+
+    assert matcher.match(hashlib.md5(b"050-0000001").digest()) == target
+
+
+def test_skips_hashes_that_are_not_hex():
+    matcher = DigestMatcher(["not-a-digest", hashlib.md5(b"x").hexdigest()])
+
+    assert len(matcher) == 1
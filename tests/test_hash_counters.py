@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from master import MasterCracker as master_module
+from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface
+
+START = 500000000
+
+
+def _counters(master):
+    return {report.hash_id: (report.total_jobs, report.completed_jobs, report.in_flight_jobs,
+                             report.covered_candidates)
+            for report in master.db.get_hash_reports(master.keyspace.size)}
+
+
+def _claim(master, position, size=100000):
+    start_range = master.keyspace.number_at(position)
+    return master.db.claim_sweep_range("md5", position, position + size, start_range, start_range + size - 1,
+                                       master.keyspace.size)
+
+
+def _sweep_with_jobs(master):
+    minion_id = master.db.register_new_minion("127.0.0.1", 6000)
+    first = master.db.add_new_hash("00" * 16)
+    master.db.start_scheduled_hashes()
+    first_job = _claim(master, 0)
+    # the second hash joins the sweep after the first job was cut
+    second = master.db.add_new_hash("11" * 16)
+    master.db.start_scheduled_hashes()
+    second_job = _claim(master, 100000)
+    return minion_id, first, second, first_job, second_job
+
+
+def test_counters_follow_the_jobs_of_a_sweep(master):
+    minion_id, first, second, first_job, second_job = _sweep_with_jobs(master)
+    assert _counters(master) == {first: (2, 0, 0, 0), second: (1, 0, 0, 0)}
+
+    for job_id in (first_job, second_job):
+        master.db.update_job_assignment(job_id, minion_id, master.keyspace.size, lease_expires_at=1000.0)
+    assert _counters(master) == {first: (2, 0, 2, 0), second: (1, 0, 1, 0)}
+
+    assert master.db.requeue_expired_job_assignments(1500.0, master.keyspace.size) == 2
+    master.db.update_job_assignment(first_job, minion_id, master.keyspace.size)
+    master.db.complete_job_assignment(master.db.get_job_assignment_by_id(first_job), master.keyspace.size)
+    assert _counters(master) == {first: (2, 1, 0, 100000), second: (1, 0, 0, 0)}
+
+
+def test_split_counts_the_rest_of_the_range(master):
+    minion_id, first, second, first_job, second_job = _sweep_with_jobs(master)
+
+    assert master.db.split_job_assignment(second_job, START + 100000, START + 149999, START + 150000,
+                                          master.keyspace.size)
+    assert _counters(master) == {first: (3, 0, 0, 0), second: (2, 0, 0, 0)}
+
+
+def test_cracked_hash_has_no_jobs_in_flight(master):
+    minion_id, first, second, first_job, second_job = _sweep_with_jobs(master)
+    master.db.update_job_assignment(second_job, minion_id, master.keyspace.size)
+
+    master.db.update_hash_with_password(second, "0500000000")
+    master.db.complete_job_assignment(master.db.get_job_assignment_by_id(second_job), master.keyspace.size)
+
+    # the cracked hash keeps the counters it had, without the job it no longer waits for
+    assert _counters(master)[second][:3] == (1, 0, 0)
+    assert _counters(master)[first] == (2, 1, 0, 100000)
+
+
+def test_rebuild_repairs_counters_that_drifted(master):
+    minion_id, first, second, first_job, second_job = _sweep_with_jobs(master)
+    master.db.update_job_assignment(first_job, minion_id, master.keyspace.size)
+    master.db.update_job_assignment(second_job, minion_id, master.keyspace.size)
+    master.db.complete_job_assignment(master.db.get_job_assignment_by_id(first_job), master.keyspace.size)
+    expected = _counters(master)
+
+    master.db.connections.connection().execute(
+        "UPDATE password_hashes SET TotalJobs = 40, InFlightJobs = -3, CoveredCandidates = 7")
+
+    assert master.db.rebuild_hash_counters(master.keyspace.size)
+    assert _counters(master) == expected
+
+
+def test_report_does_not_read_coverage_or_jobs(master):
+    master.db.add_new_hash("00" * 16)
+    master.db.start_scheduled_hashes()
+
+    # reports only read the counters of password_hashes
+    statements = []
+    master.db.connections.connection().set_trace_callback(statements.append)
+    try:
+        master.db.get_hash_reports(master.keyspace.size)
+    finally:
+        master.db.connections.connection().set_trace_callback(None)
+    assert statements and not [statement for statement in statements
+                               if "job_assignments" in statement or "Coverage" in statement]
+
+
+def test_rebuild_endpoint(master, monkeypatch, tmp_path):
+    monkeypatch.setattr(master_module, "master_cracker", master)
+    assert TestClient(master_module.app).post("/rebuild-hash-counters").json() == {"status": "success"}
+
+    master.db = MasterCrackerDbInterface(db_path=str(tmp_path / "no_tables.db"))
+    assert TestClient(master_module.app).post("/rebuild-hash-counters").status_code == 500
@@ -0,0 +1,78 @@
+import pytest
+
+from common.interval_set import IntervalSet
+
+
+def test_overlapping_intervals_are_merged():
+    intervals = IntervalSet([(10, 20), (15, 30)])
+    assert list(intervals) == [(10, 30)]
+
+
+def test_adjacent_intervals_are_merged():
+    intervals = IntervalSet([(10, 20), (21, 30)])
+    assert list(intervals) == [(10, 30)]
+    intervals.add(5, 9)
+    assert list(intervals) == [(5, 30)]
+
+
+def test_intervals_with_a_gap_are_kept_apart():
+    intervals = IntervalSet([(10, 20), (22, 30)])
+    assert list(intervals) == [(10, 20), (22, 30)]
+    assert intervals.covered() == 11 + 9
+
+
+def test_interval_filling_a_gap_merges_its_neighbours():
+    intervals = IntervalSet([(0, 4), (10, 14), (20, 24), (30, 34)])
+    intervals.add(5, 25)
+    assert list(intervals) == [(0, 25), (30, 34)]
+
+
+def test_interval_inside_another_changes_nothing():
+    intervals = IntervalSet([(0, 100)])
+    intervals.add(40, 60)
+    assert list(intervals) == [(0, 100)]
+
+
+def test_reversed_interval_is_added_in_order():
+    assert list(IntervalSet([(30, 10)])) == [(10, 30)]
+
+
+def test_single_number_intervals():
+    intervals = IntervalSet([(5, 5), (7, 7)])
+    assert list(intervals) == [(5, 5), (7, 7)]
+    intervals.add(6, 6)
+    assert list(intervals) == [(5, 7)]
+    assert intervals.covered() == 3
+
+
+@pytest.mark.parametrize("start, end, covered", [
+    (10, 30, True), (10, 10, True), (30, 30, True), (15, 25, True),
+    (9, 30, False), (10, 31, False), (35, 45, False), (25, 45, False), (0, 5, False),
+])
+def test_covers(start, end, covered):
+    assert IntervalSet([(10, 30), (40, 50)]).covers(start, end) is covered
+
+
+@pytest.mark.parametrize("intervals", [
+    [],
+    [(0, 0)],
+    [(0, 99999999)],
+    [(500000000, 599999999)],
+    [(1, 1), (3, 3), (127, 255), (256 + 200, 2 ** 40)],
+])
+def test_bytes_round_trip(intervals):
+    interval_set = IntervalSet(intervals)
+    assert IntervalSet.from_bytes(interval_set.to_bytes()) == interval_set
+
+
+def test_encoding_is_a_few_bytes_per_interval():
+    assert IntervalSet().to_bytes() == b""
+    assert IntervalSet([(0, 0)]).to_bytes() == b"\x00\x00"
+    # gap 127 and length 128 - 1 fit one byte each, 128 needs two
+    assert IntervalSet([(127, 127 + 127)]).to_bytes() == b"\x7f\x7f"
+    assert IntervalSet([(128, 128 + 128)]).to_bytes() == b"\x80\x01\x80\x01"
+
+
+def test_missing_coverage_decodes_as_empty():
+    assert len(IntervalSet.from_bytes(None)) == 0
+    assert len(IntervalSet.from_bytes(b"")) == 0
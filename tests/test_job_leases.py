@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+import requests
+from fastapi.testclient import TestClient
+
+from common.crack_objects import CrackRequest, Heartbeat
+from common.models.statuses.JobAssignmentStatus import JobAssignmentStatus
+from master import MasterCracker as master_module
+from minion.MinionCracker import MinionCracker
+
+START, END = 500000000, 500099999
+
+
+def _sent_job(master, lease_expires_at):
+    minion_id = master.db.register_new_minion("127.0.0.1", 6000)
+    hash_id = master.db.add_new_hash("00" * 16)
+    job_id = master.db.create_job_assignment(hash_id, START, END)
+    master.db.update_job_assignment(job_id, minion_id, master.keyspace.size, JobAssignmentStatus.INPROGRESS.value,
+                                    lease_expires_at=lease_expires_at)
+    return job_id
+
+
+def _status(master, job_id):
+    return master.db.get_job_assignment_by_id(job_id).Status
+
+
+def test_expired_lease_is_requeued(master, monkeypatch):
+    monkeypatch.setattr(master, "send_jobs_to_available_minions", lambda: 0)
+    live_job, expired_job = _sent_job(master, time.time() + 60), master.db.create_job_assignment(1, END + 1, END + 100000)
+    master.db.update_job_assignment(expired_job, 1, master.keyspace.size, JobAssignmentStatus.INPROGRESS.value,
+                                    lease_expires_at=time.time() - 1)
+    master.state.load()
+
+    assert master.requeue_expired_jobs() == 1
+    assert [job.Id for job in master.state.take_scheduled_jobs(limit=2)] == [expired_job]
+    assert master.state.flush()
+    assert _status(master, live_job) == JobAssignmentStatus.INPROGRESS
+    assert _status(master, expired_job) == JobAssignmentStatus.SCHEDULED
+    assert master.db.get_job_assignment_by_id(expired_job).MinionId is None
+
+
+def test_heartbeat_renews_the_jobs_the_minion_holds(master):
+    job_id = _sent_job(master, 1000)
+    master.state.load()
+
+    assert master.renew_job_leases(Heartbeat(port=6000, ranges=[(START, END), (END + 1, END + 2)]), "127.0.0.1") == 1
+    assert master.state.requeue_expired_jobs(1500, master.keyspace.size) == 0
+    master.state.flush()
+    assert master.db.requeue_expired_job_assignments(1500, master.keyspace.size) == 0
+    # a job the minion no longer reports keeps its lease until it expires
+    assert master.renew_job_leases(Heartbeat(port=6000, ranges=[]), "127.0.0.1") == 0
+
+
+def test_heartbeat_of_an_unknown_minion(master, monkeypatch):
+    monkeypatch.setattr(master_module, "master_cracker", master)
+    response = TestClient(master_module.app).post("/heartbeat", json={"port": 6001, "ip": "127.0.0.1", "ranges": []})
+    assert response.status_code == 404
+
+
+def test_minion_heartbeat_holds_its_jobs_and_unreported_results(tmp_path, monkeypatch):
+    minion = MinionCracker(db_path=str(tmp_path / "minion.db"), api_port=18999)
+    minion.db.create_tables()
+    queued = CrackRequest(hashes=[hashlib.md5(b"a").hexdigest()], start_range=START, end_range=END)
+    finished = CrackRequest(hashes=[hashlib.md5(b"b").hexdigest()], start_range=END + 1, end_range=END + 1000)
+    minion.job_queue.put_nowait((queued, None))
+
+    def unreachable(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("master is down")
+    monkeypatch.setattr(requests, "post", unreachable)
+    minion.report_crack_result_to_master({finished.hashes[0]: False}, finished)
+    assert minion.held_ranges() == [(START, END), (END + 1, END + 1000)]
+
+    sent = []
+    monkeypatch.setattr(minion, "report_crack_result_to_master", lambda results, request: sent.append(results))
+    minion.report_unreported_results()
+    assert sent == [{finished.hashes[0]: False}]
+    assert minion.held_ranges() == [(START, END)]
@@ -0,0 +1,50 @@
+import pytest
+
+from common.keyspace import Keyspace
+
+RANGES = (("050-0000000", "050-0000009"), ("052-0000100", "052-0000104"), ("051-0000000", "051-0000001"))
+
+
+@pytest.fixture
+def keyspace():
+    return Keyspace(RANGES)
+
+
+def test_size_is_the_sum_of_the_ranges(keyspace):
+    assert keyspace.size == len(keyspace) == 10 + 5 + 2
+
+
+def test_indices_continue_through_the_ranges_in_their_order(keyspace):
+    assert keyspace.number_at(0) == 500000000
+    assert keyspace.number_at(9) == 500000009
+    assert keyspace.number_at(10) == 520000100
+    assert keyspace.number_at(14) == 520000104
+    assert keyspace.number_at(15) == 510000000
+    assert keyspace.number_at(16) == 510000001
+
+
+def test_index_of_inverts_number_at(keyspace):
+    for index in range(keyspace.size):
+        assert keyspace.index_of(keyspace.number_at(index)) == index
+
+
+@pytest.mark.parametrize("index", [-1, 17])
+def test_number_at_rejects_indices_outside_the_keyspace(keyspace, index):
+    with pytest.raises(IndexError):
+        keyspace.number_at(index)
+
+
+def test_index_of_rejects_numbers_outside_the_ranges(keyspace):
+    with pytest.raises(ValueError):
+        keyspace.index_of(500000010)
+
+
+@pytest.mark.parametrize("index, end_index", [(0, 9), (9, 9), (10, 14), (14, 14), (15, 16)])
+def test_range_end_index(keyspace, index, end_index):
+    assert keyspace.range_end_index(index) == end_index
+
+
+def test_default_keyspace_covers_every_phone_number():
+    keyspace = Keyspace()
+    assert keyspace.size == 100000000
+    assert keyspace.number_at(keyspace.range_end_index(0)) == 549999999
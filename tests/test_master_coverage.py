@@ -0,0 +1,60 @@
+from common.models.statuses.HashStatus import HashStatus
+
+HASH_VALUE = "00" * 16
+
+
+def _minion(master):
+    minion_id = master.db.register_new_minion("127.0.0.1", 6000)
+    master.db.update_minion_benchmark(minion_id, 10000000, 4, 10000)
+    return next(minion for minion in master.db.get_all_available_minions() if minion.Id == minion_id)
+
+
+def _add_hash(master):
+    hash_id = master.db.add_new_hash(HASH_VALUE)
+    master.db.start_scheduled_hashes()
+    return hash_id
+
+
+def _complete(master, minion, job):
+    master.db.update_job_assignment(job.Id, minion.Id, master.keyspace.size)
+    master.db.complete_job_assignment(master.db.get_job_assignment_by_id(job.Id), master.keyspace.size)
+
+
+def _report(master):
+    (report,) = master.db.get_hash_reports(master.keyspace.size)
+    return report
+
+
+def test_completed_jobs_are_merged_into_coverage(master):
+    minion = _minion(master)
+    _add_hash(master)
+    first, second = master.cut_next_job(minion), master.cut_next_job(minion)
+
+    # out of order, the coverage doesn't depend on which job reports first
+    _complete(master, minion, second)
+    _complete(master, minion, first)
+
+    report = _report(master)
+    assert report.status == HashStatus.IN_PROGRESS.value
+    assert report.covered_candidates == second.EndRange - first.StartRange + 1
+    assert report.total_candidates == master.keyspace.size
+    assert master.db.get_job_assignment_by_id(first.Id) is None
+
+
+def test_hash_searched_through_the_whole_keyspace_is_uncracked(master):
+    minion = _minion(master)
+    hash_id = _add_hash(master)
+
+    jobs = []
+    while (job := master.cut_next_job(minion)) is not None:
+        jobs.append(job)
+    for job in jobs[:-1]:
+        _complete(master, minion, job)
+    assert _report(master).status == HashStatus.IN_PROGRESS.value
+
+    _complete(master, minion, jobs[-1])
+
+    report = _report(master)
+    assert report.status == HashStatus.UNCRACKED.value
+    assert report.covered_candidates == report.total_candidates == master.keyspace.size
+    assert master.db.get_hash_by_id(hash_id).Status == HashStatus.UNCRACKED
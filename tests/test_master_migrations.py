@@ -0,0 +1,107 @@
+import sqlite3
+
+from common.interval_set import IntervalSet
+from master.master_cracker_db.MasterCrackerDb import MasterCrackerDbInterface, SCHEMA_VERSION
+from master.master_cracker_db.migrations import Migration, run_migrations, schema_version
+
+KEYSPACE_SIZE = 100000000
+
+# the tables of the first versions, before the schema version was kept
+UNVERSIONED_TABLES = (
+    """
+    CREATE TABLE minions (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT, Ip TEXT NOT NULL, Port INTEGER NOT NULL,
+        Status TEXT DEFAULT 'Available', LastSeen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FailedHealthChecks INTEGER DEFAULT 0, UNIQUE(Ip, Port)
+    )
+    """,
+    """
+    CREATE TABLE password_hashes (
+        HashId INTEGER PRIMARY KEY AUTOINCREMENT, HashValue TEXT NOT NULL, Password TEXT NOT NULL,
+        Status TEXT DEFAULT 'Scheduled', CreationTime TIMESTAMP DEFAULT CURRENT_TIMESTAMP, CrackTime TIMESTAMP,
+        UNIQUE(HashValue, Password)
+    )
+    """,
+    """
+    CREATE TABLE job_assignments (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT, HashId INTEGER NOT NULL, MinionId INTEGER DEFAULT NULL,
+        StartRange TEXT NOT NULL, EndRange TEXT NOT NULL, Status TEXT DEFAULT 'Scheduled',
+        AssignmentTime TIMESTAMP, CompletionTime TIMESTAMP
+    )
+    """,
+    "INSERT INTO password_hashes (HashValue, Password, Status) VALUES ('" + "00" * 16 + "', '', 'InProgress')",
+    "INSERT INTO job_assignments (HashId, StartRange, EndRange, Status) "
+    "VALUES (1, '050-0000000', '050-0099999', 'Completed')",
+    "INSERT INTO job_assignments (HashId, MinionId, StartRange, EndRange, Status) "
+    "VALUES (1, 1, '050-0100000', '050-0199999', 'InProgress')",
+)
+
+
+def _indexes(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL ORDER BY name")]
+
+
+def _unversioned_db(tmp_path):
+    db_path = str(tmp_path / "MasterCracker.db")
+    with sqlite3.connect(db_path) as conn:
+        for query in UNVERSIONED_TABLES:
+            conn.execute(query)
+    return MasterCrackerDbInterface(db_path=db_path)
+
+
+def test_new_db_is_created_at_the_latest_version(master):
+    assert schema_version(master.db.connections) == SCHEMA_VERSION
+
+
+def test_unversioned_db_is_upgraded_in_place(tmp_path):
+    db = _unversioned_db(tmp_path)
+
+    assert db.migrate(KEYSPACE_SIZE, lease_expires_at=2000.0)
+
+    assert schema_version(db.connections) == SCHEMA_VERSION
+    fresh = MasterCrackerDbInterface(db_path=str(tmp_path / "fresh.db"))
+    fresh.create_tables()
+    assert _indexes(db.db_path) == _indexes(fresh.db_path)
+    # the completed job was merged into the coverage of its hash, the one in progress got a lease
+    assert db.get_job_assignment_by_id(1) is None
+    job = db.get_job_assignment_by_id(2)
+    assert (job.StartRange, job.EndRange) == (500100000, 500199999)
+    with sqlite3.connect(db.db_path) as conn:
+        coverage, = conn.execute("SELECT Coverage FROM password_hashes WHERE HashId = 1").fetchone()
+        lease, = conn.execute("SELECT LeaseExpiresAt FROM job_assignments WHERE Id = 2").fetchone()
+    assert list(IntervalSet.from_bytes(coverage)) == [(500000000, 500099999)]
+    assert lease == 2000.0
+    # the counters start from the coverage and the live jobs, the folded jobs were not counted
+    (report,) = db.get_hash_reports(KEYSPACE_SIZE)
+    assert (report.covered_candidates, report.total_jobs, report.completed_jobs, report.in_flight_jobs) == \
+        (100000, 1, 0, 1)
+
+
+def test_migrated_db_is_not_migrated_again(tmp_path):
+    db = _unversioned_db(tmp_path)
+    db.migrate(KEYSPACE_SIZE, lease_expires_at=2000.0)
+
+    assert db.migrate(KEYSPACE_SIZE, lease_expires_at=3000.0)
+    with sqlite3.connect(db.db_path) as conn:
+        lease, = conn.execute("SELECT LeaseExpiresAt FROM job_assignments WHERE Id = 2").fetchone()
+    assert lease == 2000.0
+
+
+def test_failed_migration_leaves_the_db_at_the_version_before_it(tmp_path):
+    db = MasterCrackerDbInterface(db_path=str(tmp_path / "test.db"))
+
+    def failing(cursor):
+        cursor.execute("CREATE TABLE b (Id INTEGER)")
+        cursor.execute("INSERT INTO missing VALUES (1)")
+
+    version = run_migrations(db.connections, [
+        Migration(1, "a", lambda cursor: cursor.execute("CREATE TABLE a (Id INTEGER)")),
+        Migration(2, "b", failing),
+        Migration(3, "c", lambda cursor: cursor.execute("CREATE TABLE c (Id INTEGER)")),
+    ])
+
+    assert version == schema_version(db.connections) == 1
+    with sqlite3.connect(db.db_path) as conn:
+        assert [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")] == ["a"]
@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from master.master_cracker_db import db_queries
+
+# the queries of result callbacks, dispatch rounds, heartbeats and lease checks, with arguments of their shape
+HOT_QUERIES = {
+    "get_scheduled_job_assignments": (10,),
+    "get_job_assignment": (1, 500000000, 500099999),
+    "get_sweep_job_assignment": ("md5", 500000000, 500099999),
+    "get_inprogress_minions_for_hash": (1, 100000000),
+    "renew_job_assignment_lease": (1000.0, 1, 500000000, 500099999),
+    "get_expired_job_assignments": (1000.0,),
+    "get_inprogress_job_assignments_for_minion": (1,),
+    "delete_jobs_by_hash_id": (1,),
+    "get_hash_by_value": ("00" * 16,),
+    "check_hash_exists": ("00" * 16, ""),
+    "get_scheduled_hashes": (),
+    "start_scheduled_hashes": (),
+    "get_pending_sweeps": (100000000,),
+    "get_sweep_targets": ("md5", 0, 100000000, 0),
+    "get_job_targets_coverage": (1, "md5", 0, 100000000),
+    "count_job_targets": (1, 0, None, "md5", 0, 100000000),
+    "complete_hash_job": (b"", 100000, False, 1, 1),
+}
+
+# a scan of a whole table, a scan of a partial index only reads the rows of its status
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?(job_assignments|password_hashes)$")
+
+
+@pytest.mark.parametrize("query_name", sorted(HOT_QUERIES))
+def test_hot_query_does_not_scan_a_whole_table(master, query_name):
+    query = getattr(db_queries, query_name)
+    plan = [row[3] for row in master.db.connections.connection().execute(
+        "EXPLAIN QUERY PLAN " + query, HOT_QUERIES[query_name])]
+
+    assert not [step for step in plan if FULL_SCAN.match(step)], plan
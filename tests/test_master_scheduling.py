@@ -0,0 +1,102 @@
+from common.models.Minion import Minion
+from master import MasterCracker as master_module
+
+
+def _minion(master, candidates_per_second=None, hash_rates=None):
+    minion_id = master.db.register_new_minion("127.0.0.1", 6000 + len(master.db.get_all_minions()))
+    if candidates_per_second:
+        master.db.update_minion_benchmark(minion_id, candidates_per_second, 4, 10000, hash_rates)
+    return next(minion for minion in master.db.get_all_available_minions() if minion.Id == minion_id)
+
+
+def test_job_size_follows_the_rate_of_the_algorithm(master):
+    minion = _minion(master, 100000, {"md5": 100000, "sha512": 25000})
+
+    assert master.job_size_for_minion(minion, "md5") == 100000 * master_module.JOB_TARGET_SECONDS
+    assert master.job_size_for_minion(minion, "sha512") == 25000 * master_module.JOB_TARGET_SECONDS
+    # algorithms without a rate of their own use the best configuration
+    assert master.job_size_for_minion(minion, "sha1") == 100000 * master_module.JOB_TARGET_SECONDS
+
+
+def test_job_size_of_a_minion_that_was_not_benchmarked(master):
+    assert master.job_size_for_minion(Minion(1, "127.0.0.1", 6000), "sha256") == master_module.PASSWORDS_PER_JOB
+
+
+def test_split_keeps_the_head_on_the_original_job(master):
+    minion = _minion(master)
+    hash_id = master.db.add_new_hash("00" * 16)
+    job_id = master.db.create_job_assignment(hash_id, 500000000, 500999999)
+    job_size = master.job_size_for_minion(minion, "md5")
+    master.state.load()
+
+    head = master.split_job_for_minion(minion, *master.state.take_scheduled_jobs(limit=1))
+
+    assert (head.Id, head.StartRange, head.EndRange) == (job_id, 500000000, 500000000 + job_size - 1)
+    stored_head = master.db.get_job_assignment_by_id(job_id)
+    assert (stored_head.StartRange, stored_head.EndRange) == (head.StartRange, head.EndRange)
+    (rest,) = [job for job in master.db.get_scheduled_job_assignments() if job.Id != job_id]
+    assert (rest.HashId, rest.StartRange, rest.EndRange) == (hash_id, 500000000 + job_size, 500999999)
+    # the rest is scheduled in memory too, and the head is left out of the queue for its dispatcher
+    assert [(job.Id, job.StartRange) for job in master.state.take_scheduled_jobs(limit=2)] == [(rest.Id, rest.StartRange)]
+
+
+def test_small_job_is_not_split(master):
+    minion = _minion(master)
+    hash_id = master.db.add_new_hash("00" * 16)
+    job_id = master.db.create_job_assignment(hash_id, 500000000, 500000000 + master_module.PASSWORDS_PER_JOB)
+    master.state.load()
+
+    job = master.split_job_for_minion(minion, *master.state.take_scheduled_jobs(limit=1))
+
+    assert (job.Id, job.EndRange) == (job_id, 500000000 + master_module.PASSWORDS_PER_JOB)
+    assert [job.Id for job in master.db.get_scheduled_job_assignments()] == [job_id]
+
+
+def _join(master, hash_value, hash_type="md5"):
+    master.db.add_new_hash(hash_value, hash_type=hash_type)
+    master.db.start_scheduled_hashes()
+
+
+def _run_job(master, minion, job):
+    master.db.update_job_assignment(job.Id, minion.Id, master.keyspace.size)
+    master.db.complete_job_assignment(master.db.get_job_assignment_by_id(job.Id), master.keyspace.size)
+
+
+def _index_range(master, job):
+    return master.keyspace.index_of(job.StartRange), master.keyspace.index_of(job.EndRange)
+
+
+def test_jobs_end_at_the_end_of_their_range_of_the_keyspace(master):
+    minion = _minion(master, 10000000)
+    _join(master, "00" * 16)
+    first_range_end = master.keyspace.range_end_index(0)
+
+    jobs = []
+    while not jobs or master.keyspace.index_of(jobs[-1].EndRange) < first_range_end:
+        jobs.append(master.cut_next_job(minion))
+
+    assert _index_range(master, jobs[0])[0] == 0
+    assert master.keyspace.index_of(jobs[-1].EndRange) == first_range_end
+    assert master.keyspace.index_of(master.cut_next_job(minion).StartRange) == first_range_end + 1
+
+
+def test_job_is_clipped_where_the_oldest_target_joined(master):
+    slow_minion, fast_minion = _minion(master, 1000), _minion(master, 10000000)
+    first_hash, second_hash = "00" * 16, "11" * 16
+    _join(master, first_hash)
+    first = master.cut_next_job(slow_minion)
+    _run_job(master, slow_minion, first)
+    # joins the sweep after the first job, so it still needs that range on the next lap
+    _join(master, second_hash)
+
+    while True:
+        job = master.cut_next_job(fast_minion)
+        if master.keyspace.index_of(job.StartRange) == 0:
+            break
+        assert master.job_targets(job) == [first_hash, second_hash]
+        _run_job(master, fast_minion, job)
+
+    # the first hash got the whole keyspace, the job of the second lap stops where the second hash joined
+    assert _index_range(master, job) == _index_range(master, first)
+    assert master.job_targets(job) == [second_hash]
+    assert master.cut_next_job(fast_minion) is None
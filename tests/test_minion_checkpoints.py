@@ -0,0 +1,42 @@
+import hashlib
+
+from common.crack_objects import CrackRequest
+from minion.MinionCracker import MinionCracker
+
+
+def _minion(tmp_path):
+    minion = MinionCracker(db_path=str(tmp_path / "minion.db"), api_port=18999)
+    minion.db.create_tables()
+    return minion
+
+
+def test_checkpoint_is_saved_on_the_rows_of_its_own_job(tmp_path):
+    minion = _minion(tmp_path)
+    md5_hash = hashlib.md5(b"x").hexdigest()
+    sha1_hash = hashlib.sha1(b"x").hexdigest()
+    running = CrackRequest(hashes=[md5_hash], start_range=500000000, end_range=500099999)
+    queued = CrackRequest(hashes=[sha1_hash], start_range=500000000, end_range=500099999, hash_type="sha1")
+
+    running_ids = minion.register_job(running)
+    minion.register_job(queued)
+    minion.db.update_jobs_checkpoint(running_ids, 500050000)
+
+    checkpoints = {job.HashValue: job.Checkpoint for job in minion.db.get_unfinished_jobs()}
+    assert checkpoints == {md5_hash: 500050000, sha1_hash: None}
+
+
+def test_jobs_over_the_same_range_resume_from_their_own_checkpoint(tmp_path):
+    minion = _minion(tmp_path)
+    md5_hash = hashlib.md5(b"x").hexdigest()
+    sha1_hash = hashlib.sha1(b"x").hexdigest()
+    running_ids = minion.register_job(CrackRequest(hashes=[md5_hash], start_range=500000000, end_range=500099999))
+    minion.register_job(CrackRequest(hashes=[sha1_hash], start_range=500000000, end_range=500099999, hash_type="sha1"))
+    minion.db.update_jobs_checkpoint(running_ids, 500050000)
+
+    minion.resume_unfinished_jobs(minion.db.get_unfinished_jobs())
+
+    resumed = {}
+    while not minion.job_queue.empty():
+        crack_request, scanned_up_to = minion.job_queue.get_nowait()
+        resumed[tuple(crack_request.hashes)] = scanned_up_to
+    assert resumed == {(md5_hash,): 500050000, (sha1_hash,): None}
@@ -0,0 +1,71 @@
+import hashlib
+
+from fastapi.testclient import TestClient
+
+import minion.MinionCracker as minion_module
+from common.crack_objects import CrackRequest
+from common.models.statuses.MinionStatus import MinionStatus
+from minion.MinionCracker import MinionCracker
+
+
+def _minion(tmp_path, prefetch_depth=2):
+    minion = MinionCracker(db_path=str(tmp_path / "minion.db"), api_port=18999, prefetch_depth=prefetch_depth)
+    minion.db.create_tables()
+    return minion
+
+
+def _queue(minion, crack_request):
+    minion.register_job(crack_request)
+    minion.job_queue.put_nowait((crack_request, None))
+
+
+def test_hash_cancelled_while_queued_is_dropped_and_its_row_cancelled(tmp_path):
+    minion = _minion(tmp_path)
+    kept, cancelled = hashlib.md5(b"a").hexdigest(), hashlib.md5(b"b").hexdigest()
+    crack_request = CrackRequest(hashes=[kept, cancelled], start_range=500000000, end_range=500000999)
+    _queue(minion, crack_request)
+
+    assert minion.cancel_hashes([cancelled]) is False
+
+    assert [job.HashValue for job in minion.db.get_unfinished_jobs()] == [kept]
+    assert minion.drop_cancelled_hashes(minion.job_queue.get_nowait()[0]).hashes == [kept]
+
+
+def test_job_left_without_hashes_is_reported_right_away(tmp_path, monkeypatch):
+    minion = _minion(tmp_path)
+    reports = []
+    monkeypatch.setattr(minion, "report_crack_result_to_master", lambda results, request: reports.append(results))
+    cancelled = hashlib.md5(b"b").hexdigest()
+    _queue(minion, CrackRequest(hashes=[cancelled], start_range=500000000, end_range=500000999))
+
+    minion.cancel_hashes([cancelled])
+
+    assert minion.drop_cancelled_hashes(minion.job_queue.get_nowait()[0]).hashes == []
+    assert reports == [{cancelled: False}]
+
+
+def test_cancelled_hashes_are_forgotten_once_no_queued_job_has_them(tmp_path):
+    minion = _minion(tmp_path)
+    cancelled = hashlib.md5(b"b").hexdigest()
+    _queue(minion, CrackRequest(hashes=[cancelled], start_range=500000000, end_range=500000999))
+    _queue(minion, CrackRequest(hashes=[cancelled], start_range=500001000, end_range=500001999))
+    minion.cancel_hashes([cancelled, hashlib.md5(b"not queued").hexdigest()])
+    assert minion.cancelled_hashes == {cancelled}
+
+    minion.job_queue.get_nowait()
+    minion.forget_cancelled_hashes()
+    assert minion.cancelled_hashes == {cancelled}
+
+    minion.job_queue.get_nowait()
+    minion.forget_cancelled_hashes()
+    assert minion.cancelled_hashes == set()
+
+
+def test_health_is_busy_when_the_queue_is_full(tmp_path, monkeypatch):
+    minion = _minion(tmp_path, prefetch_depth=1)
+    monkeypatch.setattr(minion_module, "minion_cracker", minion)
+    client = TestClient(minion_module.app)
+
+    assert client.get("/health").json()["status"] == MinionStatus.AVAILABLE.value
+    _queue(minion, CrackRequest(hashes=[hashlib.md5(b"a").hexdigest()], start_range=500000000, end_range=500000999))
+    assert client.get("/health").json()["status"] == MinionStatus.BUSY.value
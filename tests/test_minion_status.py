@@ -0,0 +1,55 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import minion.MinionCracker as minion_module
+from common.crack_objects import CrackRequest
+from minion.MinionCracker import MinionCracker
+
+START, END = 500000000, 500000999
+
+
+@pytest.fixture
+def minion(tmp_path, monkeypatch):
+    minion = MinionCracker(db_path=str(tmp_path / "minion.db"), api_port=18999)
+    minion.db.create_tables()
+    monkeypatch.setattr(minion_module, "minion_cracker", minion)
+    return minion
+
+
+def _finish(minion, job_ids, passwords):
+    for job_id in job_ids:
+        minion.db.update_hash_job_status(job_id, "Completed")
+    for hash_value, password in passwords.items():
+        minion.db.add_password_to_hash(minion.db.check_hash_exists(hash_value), password)
+
+
+def test_job_status_has_every_hash_of_the_range(minion):
+    cracked, uncracked = hashlib.md5(b"050-0000001").hexdigest(), hashlib.md5(b"other").hexdigest()
+    job_ids = minion.register_job(CrackRequest(hashes=[cracked, uncracked], start_range=START, end_range=END))
+    client = TestClient(minion_module.app)
+
+    assert client.get(f"/status/{START}/{END}").json() == {"status": "InProgress", "hashes": {cracked: False,
+                                                                                               uncracked: False}}
+    _finish(minion, job_ids, {cracked: "050-0000001"})
+    assert client.get(f"/status/{START}/{END}").json() == {"status": "Completed", "hashes": {cracked: "050-0000001",
+                                                                                              uncracked: False}}
+
+
+def test_job_status_of_an_unknown_range(minion):
+    minion.register_job(CrackRequest(hashes=[hashlib.md5(b"a").hexdigest()], start_range=START, end_range=END))
+
+    assert TestClient(minion_module.app).get(f"/status/{START}/{END + 1}").status_code == 404
+
+
+def test_job_status_of_one_algorithm_ignores_jobs_of_others_over_the_range(minion):
+    md5_hash, sha1_hash = hashlib.md5(b"a").hexdigest(), hashlib.sha1(b"a").hexdigest()
+    job_ids = minion.register_job(CrackRequest(hashes=[md5_hash], start_range=START, end_range=END))
+    minion.register_job(CrackRequest(hashes=[sha1_hash], start_range=START, end_range=END, hash_type="sha1"))
+    _finish(minion, job_ids, {})
+    client = TestClient(minion_module.app)
+
+    assert client.get(f"/status/{START}/{END}", params={"hash_type": "md5"}).json() == {
+        "status": "Completed", "hashes": {md5_hash: False}}
+    assert client.get(f"/status/{START}/{END}").json()["status"] == "InProgress"
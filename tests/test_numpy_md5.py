@@ -0,0 +1,51 @@
+import hashlib
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from minion.cracking_engine.numpy_md5 import md5_phone_numbers, scan_range_md5, self_check
+from minion.cracking_engine.phone_candidates import MAX_PHONE_NUMBER, MIN_PHONE_NUMBER, int_to_phone_number
+
+
+def _digests(numbers):
+    words = md5_phone_numbers(np.array(numbers, dtype=np.uint32))
+    return [b"".join(int(word[lane]).to_bytes(4, "little") for word in words) for lane in range(len(numbers))]
+
+
+@pytest.mark.parametrize("lanes", [1, 2, 3, 7, 64, 1000])
+def test_kernel_matches_hashlib(lanes):
+    rng = random.Random(lanes)
+    numbers = [rng.randint(MIN_PHONE_NUMBER, MAX_PHONE_NUMBER) for _ in range(lanes)]
+
+    expected = [hashlib.md5(int_to_phone_number(number).encode("ascii")).digest() for number in numbers]
+    assert _digests(numbers) == expected
+
+
+def test_kernel_matches_hashlib_on_keyspace_edges():
+    numbers = [MIN_PHONE_NUMBER, MIN_PHONE_NUMBER + 1, MAX_PHONE_NUMBER - 1, MAX_PHONE_NUMBER]
+
+    expected = [hashlib.md5(int_to_phone_number(number).encode("ascii")).digest() for number in numbers]
+    assert _digests(numbers) == expected
+
+
+def test_scan_finds_targets_across_batches():
+    passwords = [MIN_PHONE_NUMBER + 5, MIN_PHONE_NUMBER + 100, MIN_PHONE_NUMBER + 257]
+    targets = {hashlib.md5(int_to_phone_number(number).encode()).digest(): f"hash{number}" for number in passwords}
+
+    results = scan_range_md5(dict(targets), MIN_PHONE_NUMBER, MIN_PHONE_NUMBER + 300, batch_size=64)
+
+    assert sorted((entry.hash, entry.password) for entry in results) == sorted(
+        (f"hash{number}", int_to_phone_number(number)) for number in passwords)
+
+
+def test_scan_stops_when_asked():
+    target = {hashlib.md5(int_to_phone_number(MIN_PHONE_NUMBER + 200).encode()).digest(): "hash"}
+
+    assert scan_range_md5(target, MIN_PHONE_NUMBER, MIN_PHONE_NUMBER + 300, batch_size=64,
+                          should_stop=lambda: True) == []
+
+
+def test_self_check():
+    assert self_check(samples=256)
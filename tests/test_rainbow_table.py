@@ -0,0 +1,66 @@
+import hashlib
+import struct
+
+import pytest
+
+from common.config.HashesTypes import HashTypes
+from master.rainbow_table.RainbowTable import (
+    HEADER_FORMAT, TABLE_MAGIC, RainbowTable, candidate_at, load_rainbow_tables, reduce_digest, table_file_name
+)
+from master.rainbow_table.build_table import build_table
+
+CHAINS = 40
+CHAIN_LENGTH = 25
+
+
+def _chain_indices(keyspace, hash_type: HashTypes, start_index: int):
+    hash_func = getattr(hashlib, hash_type.value)
+    index = start_index
+    indices = []
+    for step in range(CHAIN_LENGTH):
+        indices.append(index)
+        index = reduce_digest(hash_func(candidate_at(keyspace, index)).digest(), step, keyspace.size)
+    return indices
+
+
+@pytest.fixture(scope="module", params=[HashTypes.MD5, HashTypes.SHA1])
+def table(request, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("tables") / table_file_name(request.param))
+    build_table(request.param, path, chain_count=CHAINS, chain_length=CHAIN_LENGTH, workers=1)
+    rainbow_table = RainbowTable(path)
+    yield rainbow_table
+    rainbow_table.close()
+
+
+def _hex(table: RainbowTable, candidate: bytes) -> str:
+    return getattr(hashlib, table.hash_type.value)(candidate).hexdigest()
+
+
+def test_lookup_finds_numbers_on_the_chains(table):
+    start_index = 7 * table.keyspace.size // CHAINS
+    for index in _chain_indices(table.keyspace, table.hash_type, start_index)[::6]:
+        candidate = candidate_at(table.keyspace, index)
+        assert table.lookup(_hex(table, candidate)) == candidate.decode("ascii")
+
+
+def test_lookup_misses_numbers_no_chain_covers(table):
+    covered = set()
+    for chain in range(CHAINS):
+        covered.update(_chain_indices(table.keyspace, table.hash_type, chain * table.keyspace.size // CHAINS))
+    missing = next(index for index in range(1, table.keyspace.size) if index not in covered)
+
+    assert table.lookup(_hex(table, candidate_at(table.keyspace, missing))) is None
+
+
+def test_lookup_rejects_digests_of_other_lengths(table):
+    assert table.lookup(hashlib.sha512(b"052-7500000").hexdigest()) is None
+    assert table.lookup("not a digest") is None
+
+
+def test_table_of_another_keyspace_is_not_loaded(tmp_path):
+    path = tmp_path / table_file_name(HashTypes.MD5)
+    path.write_bytes(struct.pack(HEADER_FORMAT, TABLE_MAGIC, b"md5", CHAIN_LENGTH, 0, 1000))
+
+    with pytest.raises(ValueError):
+        RainbowTable(str(path))
+    assert load_rainbow_tables(str(tmp_path)) == {}
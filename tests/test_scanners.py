@@ -0,0 +1,67 @@
+import hashlib
+
+import pytest
+
+from minion.cracking_engine import numpy_md5, scanners
+from minion.cracking_engine.phone_candidates import int_to_phone_number
+
+START = 500012345
+
+
+def _algorithms(passwords_by_type):
+    algorithms = []
+    for name, numbers in passwords_by_type.items():
+        hash_func = getattr(hashlib, name)
+        targets = {}
+        for number in numbers:
+            digest = hash_func(int_to_phone_number(number).encode("ascii"))
+            targets[digest.digest()] = digest.hexdigest()
+        algorithms.append((hash_func, targets))
+    return algorithms
+
+
+def _found(results):
+    return {entry.password for entry in results}
+
+
+@pytest.mark.parametrize("scanner", [scanners.scan_range_midstate, scanners.scan_range_numpy])
+def test_mixed_algorithms_are_found_in_one_scan(scanner):
+    numbers = {"md5": [START, START + 70000], "sha1": [START + 999, START + 140000], "sha256": [START + 140001]}
+    algorithms = _algorithms(numbers)
+
+    results = scanner(algorithms, START, START + 140001)
+
+    assert _found(results) == {int_to_phone_number(number) for found in numbers.values() for number in found}
+    assert all(not targets for _, targets in algorithms)
+
+
+def test_numpy_scan_stops_between_batches():
+    if not numpy_md5.NUMPY_AVAILABLE:
+        pytest.skip("numpy is not installed")
+    last = START + 3 * scanners.NUMPY_BATCH_SIZE
+    algorithms = _algorithms({"md5": [last], "sha1": [last]})
+
+    assert scanners.scan_range_numpy(algorithms, START, last, should_stop=lambda: True) == []
+
+
+def test_exhausted_algorithm_is_dropped_from_the_block():
+    copies = []
+
+    class CountingSha1:
+        def __init__(self, data=b""):
+            self.state = hashlib.sha1(data)
+
+        def copy(self):
+            copies.append(1)
+            return self
+
+        def update(self, data):
+            self.state.update(data)
+
+    md5 = _algorithms({"md5": [500000999]})[0]
+    results = []
+
+    scanners._midstate_block_multi([md5, (CountingSha1, {})], 500000000, results)
+
+    assert _found(results) == {int_to_phone_number(500000999)}
+    assert copies == []
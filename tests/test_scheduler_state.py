@@ -0,0 +1,95 @@
+import asyncio
+
+from common.models.statuses.JobAssignmentStatus import JobAssignmentStatus
+from common.models.statuses.MinionStatus import MinionStatus
+from master.scheduler_state.SchedulerState import SchedulerState
+
+
+class _Fleet:
+    """runs the calls of a round one after another, every minion is healthy"""
+
+    def map(self, call, items):
+        return [asyncio.run(call(item)) for item in items]
+
+
+def _master_with_minions(master, monkeypatch, count=2, accepting=True):
+    for i in range(count):
+        minion_id = master.db.register_new_minion("127.0.0.1", 6000 + i)
+        master.db.update_minion_benchmark(minion_id, 10000000, 4, 10000)
+    master.db.add_new_hash("00" * 16)
+    master.db.start_scheduled_hashes()
+    master.state.load()
+    master.fleet = _Fleet()
+
+    async def healthy(minion):
+        return MinionStatus.AVAILABLE.value
+
+    async def post_job(minion, crack_request):
+        return {"accepting": accepting}
+
+    monkeypatch.setattr(master, "_MasterCracker__minion_health", healthy)
+    monkeypatch.setattr(master, "post_job_to_minion", post_job)
+    return master
+
+
+def _in_progress(state):
+    return sorted((job.Id, job.MinionId, job.StartRange) for job in state.jobs.values()
+                  if job.Status == JobAssignmentStatus.INPROGRESS)
+
+
+def test_round_is_written_behind_and_rebuilt_after_a_restart(master, monkeypatch):
+    _master_with_minions(master, monkeypatch, accepting=False)
+
+    assert master.send_jobs_to_available_minions() == 2
+    in_progress = _in_progress(master.state)
+    assert [minion.Status for minion in master.state.get_all_minions()] == [MinionStatus.BUSY] * 2
+    # nothing of the round was written yet
+    assert all(minion.Status == MinionStatus.AVAILABLE for minion in master.db.get_all_minions())
+
+    master.state.flush()
+    restarted = SchedulerState(master.db)
+    restarted.load()
+
+    assert _in_progress(restarted) == in_progress
+    assert [minion.Status for minion in restarted.get_all_minions()] == [MinionStatus.BUSY] * 2
+
+
+def test_completed_job_frees_its_minion_and_is_merged_into_coverage(master, monkeypatch):
+    _master_with_minions(master, monkeypatch, count=1, accepting=False)
+    master.send_jobs_to_available_minions()
+    (job,) = master.state.jobs.values()
+
+    master.state.complete_job(job, master.keyspace.size)
+
+    assert master.state.get_job(job.Id) is None
+    assert master.state.get_minion(job.MinionId).Status == MinionStatus.AVAILABLE
+    master.state.flush()
+    (report,) = master.db.get_hash_reports(master.keyspace.size)
+    assert report.covered_candidates == job.EndRange - job.StartRange + 1
+    assert master.db.get_job_assignment_by_id(job.Id) is None
+
+
+def test_jobs_of_a_lost_minion_go_back_on_the_queue(master, monkeypatch):
+    _master_with_minions(master, monkeypatch, count=1)
+    master.send_jobs_to_available_minions()
+    sent_job_ids = sorted(master.state.jobs)
+    (minion,) = master.state.get_all_minions()
+
+    assert master.state.reschedule_minion_jobs(minion.Id, master.keyspace.size) == len(sent_job_ids)
+
+    assert [job.Id for job in master.state.take_scheduled_jobs(limit=len(sent_job_ids))] == sent_job_ids
+    master.state.flush()
+    assert [job.Id for job in master.db.get_scheduled_job_assignments(limit=100)] == sent_job_ids
+
+
+def test_taken_jobs_are_skipped_until_released(master):
+    master.db.add_new_hash("00" * 16)
+    job_ids = [master.db.create_job_assignment(1, start, start + 99999) for start in (500000000, 500100000)]
+    master.state.load()
+
+    (taken,) = master.state.take_scheduled_jobs(limit=1)
+    assert [job.Id for job in master.state.take_scheduled_jobs(limit=2)] == [job_ids[1]]
+    assert master.state.take_scheduled_jobs(limit=2) == []
+
+    master.state.release_job(taken.Id)
+    assert [job.Id for job in master.state.take_scheduled_jobs(limit=2)] == [job_ids[0]]
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+import pytest
+
+from common.sqlite_db import SqliteConnections, execute_in_transaction
+
+
+def _tables(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+
+
+def _values(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT Id FROM a ORDER BY Id")]
+
+
+@pytest.fixture
+def connections(tmp_path):
+    connections = SqliteConnections(str(tmp_path / "test.db"))
+    connections.connection().execute("CREATE TABLE a (Id INTEGER)")
+    yield connections
+    connections.close()
+
+
+def test_queries_are_applied_together(tmp_path):
+    db_path = str(tmp_path / "test.db")
+
+    assert execute_in_transaction(SqliteConnections(db_path), ["CREATE TABLE a (Id INTEGER)", "CREATE TABLE b (Id INTEGER)"])
+    assert _tables(db_path) == ["a", "b"]
+
+
+def test_failed_query_rolls_back_the_ones_before_it(tmp_path):
+    db_path = str(tmp_path / "test.db")
+
+    assert not execute_in_transaction(SqliteConnections(db_path), ["CREATE TABLE a (Id INTEGER)", "INSERT INTO missing VALUES (1)"])
+    assert _tables(db_path) == []
+
+
+def test_connections_are_kept_per_thread_in_wal_mode(connections):
+    other_thread_connection = []
+    thread = threading.Thread(target=lambda: other_thread_connection.append(connections.connection()))
+    thread.start()
+    thread.join()
+
+    assert connections.connection() is connections.connection()
+    assert other_thread_connection[0] is not connections.connection()
+    assert connections.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connections.connection().execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_queries_inside_a_transaction_are_committed_at_its_end(connections):
+    with connections.transaction():
+        connections.connection().execute("INSERT INTO a VALUES (1)")
+        assert _values(connections.db_path) == []  # not visible to other connections yet
+
+    assert _values(connections.db_path) == [1]
+
+
+def test_failed_transaction_is_rolled_back(connections):
+    with pytest.raises(sqlite3.Error):
+        with connections.transaction() as cursor:
+            cursor.execute("INSERT INTO a VALUES (1)")
+            cursor.execute("INSERT INTO missing VALUES (1)")
+
+    assert _values(connections.db_path) == []
+    assert not connections.connection().in_transaction
+
+
+def test_failed_inner_transaction_only_rolls_back_its_own_queries(connections):
+    with connections.transaction() as cursor:
+        cursor.execute("INSERT INTO a VALUES (1)")
+        with pytest.raises(sqlite3.Error):
+            with connections.transaction() as inner_cursor:
+                inner_cursor.execute("INSERT INTO a VALUES (2)")
+                inner_cursor.execute("INSERT INTO missing VALUES (1)")
+        cursor.execute("INSERT INTO a VALUES (3)")
+
+    assert _values(connections.db_path) == [1, 3]